@@ -0,0 +1,111 @@
+"""
+Async entry points for the hot read endpoints, used under ASGI.
+
+Django 3.2 runs the sync views of an ASGI application one at a time
+in a single shared thread, and DRF views are sync. async_view() runs
+the DRF view in a pool of ASYNC_VIEW_THREADS threads instead, so
+requests waiting on the database don't queue behind each other and
+the event loop stays free. Every pool thread keeps its own database
+connection, checked and recycled around each request as the request
+signals do for sync views (see api.connections).
+Only reads go to the pool: other methods run in the shared thread,
+exactly as Django runs a sync view.
+
+ASGIHandler is the ASGI application of api_yamdb.asgi: Django 3.2
+iterates streaming responses in the event loop, where the lazy queries
+of the export streams may not run.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers import asgi
+from rest_framework.permissions import SAFE_METHODS
+
+from .connections import prepare_connections, release_connections, stats
+from .metrics import track_queries
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_VIEW_THREADS,
+    thread_name_prefix="async-view",
+)
+# Requests handed to the pool and not finished yet; only touched
+# from the event loop thread.
+in_flight = 0
+
+
+def run_view(view, request, *args, **kwargs):
+    prepare_connections()
+    try:
+        with track_queries(request):
+            response = view(request, *args, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+        return response
+    finally:
+        release_connections()
+
+
+def async_view(view):
+    """
+    Wrap a sync view into a coroutine view running its reads
+    on the pool, keeping the attributes DRF sets on the view.
+    """
+    run = sync_to_async(run_view, thread_sensitive=False, executor=executor)
+    run_sync = sync_to_async(view, thread_sensitive=True)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        global in_flight
+        if request.method not in SAFE_METHODS:
+            return await run_sync(request, *args, **kwargs)
+        if in_flight >= settings.ASYNC_VIEW_THREADS:
+            stats.add("waited")
+        in_flight += 1
+        try:
+            return await run(view, request, *args, **kwargs)
+        finally:
+            in_flight -= 1
+
+    return wrapper
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """
+    Django's ASGI handler pulling every part of a streaming response
+    from the shared sync thread, as the request signals and sync views
+    run there too.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            await super().send_response(response, send)
+            return
+        headers = [
+            (header.encode("ascii"), value.encode("latin1"))
+            for header, value in response.items()
+        ]
+        headers.extend(
+            (b"Set-Cookie", cookie.output(header="").encode("ascii").strip())
+            for cookie in response.cookies.values()
+        )
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": headers,
+        })
+        next_part = sync_to_async(next, thread_sensitive=True)
+        parts = iter(response)
+        while True:
+            part = await next_part(parts, None)
+            if part is None:
+                break
+            for chunk, _ in self.chunk_bytes(part):
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": True,
+                })
+        await send({"type": "http.response.body"})
+        await sync_to_async(response.close, thread_sensitive=True)()
@@ -0,0 +1,133 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic, time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import ADMIN, MODERATOR, USER
+
+User = get_user_model()
+
+
+class RoleRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the role claims, which its access tokens copy.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["role"] = user.role
+        token["is_superuser"] = user.is_superuser
+        return token
+
+
+class RoleTokenUser(TokenUser):
+    """
+    Lightweight user built from token claims, with the role helpers
+    of users.User that the permission classes read.
+    """
+
+    @cached_property
+    def role(self):
+        return self.token.get("role", USER)
+
+    @property
+    def is_admin(self):
+        return self.role == ADMIN
+
+    @property
+    def is_moderator(self):
+        return self.role == MODERATOR
+
+
+class UserCache:
+    """
+    Small per-process LRU cache of users.User rows with a time to live.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, user_id):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > monotonic():
+                self.entries.move_to_end(user_id)
+                return entry[1]
+        user = User.objects.filter(pk=user_id).first()
+        with self.lock:
+            self.entries[user_id] = (monotonic() + self.ttl, user)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return user
+
+    def discard(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache(
+    max_size=settings.JWT_USER_CACHE_SIZE,
+    ttl=settings.JWT_ROLE_CLAIMS_MAX_AGE,
+)
+
+
+def get_full_user(request, fresh=False):
+    """
+    The users.User row of the request user. Stateless requests read it
+    through the per-process cache, or from the database when fresh.
+    """
+    if isinstance(request.user, User):
+        return request.user
+    if fresh:
+        return User.objects.get(pk=request.user.pk)
+    return user_cache.get(request.user.pk)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication without the per-request users.User query.
+
+    Tokens younger than JWT_ROLE_CLAIMS_MAX_AGE seconds are trusted as is
+    and give a RoleTokenUser. Role changes and deactivation therefore
+    reach them with at most that delay. Older tokens, or tokens without
+    role claims, are checked against the user row from the per-process
+    cache, which keeps it for the same time.
+    """
+
+    def get_user(self, validated_token):
+        issued_at = validated_token.get("iat", 0)
+        if (
+            "role" in validated_token
+            and time() - issued_at < settings.JWT_ROLE_CLAIMS_MAX_AGE
+        ):
+            return RoleTokenUser(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return super().get_user(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            raise AuthenticationFailed(
+                "User not found", code="user_not_found"
+            )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                "User is inactive", code="user_inactive"
+            )
+        return user
@@ -0,0 +1,461 @@
+"""
+In-process benchmark of the API routes, run by benchmark_routes.
+
+Requests go through the Django test client against the current
+database, so timings cover routing, authentication, serialization and
+SQL, but not the network or the server. The run happens in one
+transaction rolled back at its end, and every request in a savepoint
+rolled back after it: writes see the same rows on every repetition and
+the benchmark leaves the database as it was. Throttles are off during
+the run. Anonymous list reads are answered from the response cache
+after the first request, as in production.
+"""
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from collections import namedtuple
+from fnmatch import fnmatch
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from reviews.models import Categories, Comment, Genres, Review, Title
+from users.models import ADMIN
+
+from .authentication import RoleRefreshToken
+
+User = get_user_model()
+
+ANON = "anon"
+USER = "user"
+ADMIN_CLIENT = "admin"
+
+BATCH_SIZE = 10
+# Only the last titles are exported, so that the route costs the same
+# on datasets of any size.
+EXPORTED_TITLES = 1000
+TEXT = "Бенчмарк: отзыв средней длины о произведении. " * 4
+
+Scenario = namedtuple("Scenario", "name method path data client status")
+
+
+def title_batch(context):
+    return [
+        {
+            "name": f"Benchmark {number}",
+            "year": 2000,
+            "category": context["category"],
+            "genre": [context["genre"]],
+        }
+        for number in range(BATCH_SIZE)
+    ]
+
+
+def review_batch(context):
+    return [
+        {"title": title_id, "text": TEXT, "score": 7}
+        for title_id in context["batch_titles"]
+    ]
+
+
+TITLE = "/api/v1/titles/{title}/"
+REVIEWS = TITLE + "reviews/"
+REVIEW = REVIEWS + "{review}/"
+COMMENTS = REVIEW + "comments/"
+OWN_REVIEW = "/api/v1/titles/{other_title}/reviews/{own_review}/"
+
+SCENARIOS = (
+    Scenario("titles-list", "GET", "/api/v1/titles/", None, ANON, 200),
+    Scenario("titles-list-user", "GET", "/api/v1/titles/", None, USER, 200),
+    Scenario(
+        "titles-filter-category", "GET",
+        "/api/v1/titles/?category={category}", None, USER, 200,
+    ),
+    Scenario(
+        "titles-filter-genre", "GET",
+        "/api/v1/titles/?genre={genre}", None, USER, 200,
+    ),
+    Scenario(
+        "titles-filter-name", "GET",
+        "/api/v1/titles/?name={name}", None, USER, 200,
+    ),
+    Scenario(
+        "titles-filter-name-prefix", "GET",
+        "/api/v1/titles/?name={name}&name_mode=prefix", None, USER, 200,
+    ),
+    Scenario(
+        "titles-filter-year", "GET",
+        "/api/v1/titles/?year={year}", None, USER, 200,
+    ),
+    Scenario(
+        "titles-filter-year-range", "GET",
+        "/api/v1/titles/?year_min={year_min}&year_max={year}", None, USER,
+        200,
+    ),
+    Scenario("titles-detail", "GET", TITLE, None, ANON, 200),
+    Scenario("reviews-list", "GET", REVIEWS, None, ANON, 200),
+    Scenario("reviews-detail", "GET", REVIEW, None, ANON, 200),
+    Scenario("comments-list", "GET", COMMENTS, None, ANON, 200),
+    Scenario("comments-detail", "GET", COMMENTS + "{comment}/", None, ANON,
+             200),
+    Scenario("categories-list", "GET", "/api/v1/categories/", None, ANON,
+             200),
+    Scenario("genres-list", "GET", "/api/v1/genres/", None, ANON, 200),
+    Scenario("search", "GET", "/api/v1/search/?q={word}", None, ANON, 200),
+    Scenario("users-list", "GET", "/api/v1/users/", None, ADMIN_CLIENT, 200),
+    Scenario(
+        "users-detail", "GET", "/api/v1/users/{username}/", None,
+        ADMIN_CLIENT, 200,
+    ),
+    Scenario("users-me", "GET", "/api/v1/users/me/", None, USER, 200),
+    Scenario(
+        "export-titles", "GET",
+        "/api/v1/export/titles/?id_after={export_after}", None,
+        ADMIN_CLIENT, 200,
+    ),
+    Scenario(
+        "export-reviews", "GET", "/api/v1/export/reviews/?title={title}",
+        None, ADMIN_CLIENT, 200,
+    ),
+    Scenario(
+        "stats-connections", "GET", "/api/v1/stats/connections/", None,
+        ADMIN_CLIENT, 200,
+    ),
+    Scenario(
+        "auth-signup", "POST", "/api/v1/auth/signup/",
+        {"username": "benchmark_signup",
+         "email": "benchmark_signup@yamdb.fake"},
+        ANON, 200,
+    ),
+    Scenario(
+        "auth-token", "POST", "/api/v1/auth/token/",
+        {"username": "{username}", "confirmation_code": "{code}"},
+        ANON, 200,
+    ),
+    Scenario(
+        "categories-create", "POST", "/api/v1/categories/",
+        {"name": "Benchmark", "slug": "benchmark-new"}, ADMIN_CLIENT, 201,
+    ),
+    Scenario(
+        "categories-delete", "DELETE", "/api/v1/categories/{spare_category}/",
+        None, ADMIN_CLIENT, 204,
+    ),
+    Scenario(
+        "genres-create", "POST", "/api/v1/genres/",
+        {"name": "Benchmark", "slug": "benchmark-new"}, ADMIN_CLIENT, 201,
+    ),
+    Scenario(
+        "genres-delete", "DELETE", "/api/v1/genres/{spare_genre}/", None,
+        ADMIN_CLIENT, 204,
+    ),
+    Scenario(
+        "titles-create", "POST", "/api/v1/titles/",
+        {"name": "Benchmark", "year": 2000, "category": "{category}",
+         "genre": ["{genre}"]},
+        ADMIN_CLIENT, 201,
+    ),
+    Scenario(
+        "titles-update", "PATCH", TITLE, {"name": "Benchmark"},
+        ADMIN_CLIENT, 200,
+    ),
+    Scenario(
+        "titles-delete", "DELETE", "/api/v1/titles/{spare_title}/", None,
+        ADMIN_CLIENT, 204,
+    ),
+    Scenario(
+        "titles-batch", "POST", "/api/v1/titles/batch/", title_batch,
+        ADMIN_CLIENT, 201,
+    ),
+    Scenario(
+        "reviews-create", "POST", REVIEWS, {"text": TEXT, "score": 7}, USER,
+        201,
+    ),
+    Scenario("reviews-update", "PATCH", OWN_REVIEW, {"score": 3}, USER, 200),
+    Scenario("reviews-delete", "DELETE", OWN_REVIEW, None, USER, 204),
+    Scenario(
+        "reviews-batch", "POST", "/api/v1/reviews/batch/", review_batch,
+        USER, 201,
+    ),
+    Scenario(
+        "comments-create", "POST", COMMENTS, {"text": "Комментарий"}, USER,
+        201,
+    ),
+    Scenario(
+        "comments-update", "PATCH", COMMENTS + "{own_comment}/",
+        {"text": "Комментарий"}, USER, 200,
+    ),
+    Scenario(
+        "comments-delete", "DELETE", COMMENTS + "{own_comment}/", None, USER,
+        204,
+    ),
+    Scenario(
+        "users-create", "POST", "/api/v1/users/",
+        {"username": "benchmark_new", "email": "benchmark_new@yamdb.fake"},
+        ADMIN_CLIENT, 201,
+    ),
+    Scenario(
+        "users-me-update", "PATCH", "/api/v1/users/me/", {"bio": "Бенчмарк"},
+        USER, 200,
+    ),
+)
+
+# Metrics compared with a baseline: the least growth reported as
+# a regression, and whether the relative tolerance applies on top.
+COMPARED = (
+    ("p95_ms", 3.0, True),
+    ("peak_kib", 64, True),
+    ("queries", 0.01, False),
+    ("errors", 0, False),
+)
+
+
+def percentile(values, share):
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, round(share * len(values)) - 1))
+    return values[index]
+
+
+def render(value, context):
+    """Fill the {placeholders} of a scenario path or body."""
+    if callable(value):
+        return value(context)
+    if isinstance(value, str):
+        return value.format(**context)
+    if isinstance(value, list):
+        return [render(item, context) for item in value]
+    if isinstance(value, dict):
+        return {key: render(item, context) for key, item in value.items()}
+    return value
+
+
+def select_scenarios(patterns=None):
+    if not patterns:
+        return list(SCENARIOS)
+    return [
+        scenario for scenario in SCENARIOS
+        if any(fnmatch(scenario.name, pattern) for pattern in patterns)
+    ]
+
+
+def prepare_context():
+    """
+    Pick the rows the scenarios use, preferring the most reviewed title
+    and the most commented review, and create the benchmark users and
+    the rows they own. Runs inside the benchmark transaction.
+    """
+    titles = Title.objects.order_by("-score_count", "pk")
+    title, other_title = (list(titles[:2]) + [None, None])[:2]
+    if other_title is None:
+        raise ValueError(
+            "The benchmark needs at least two titles: run load_csv "
+            "or generate_dataset first."
+        )
+    admin = User.objects.create_user(
+        username="benchmark_admin", email="benchmark_admin@yamdb.fake",
+        role=ADMIN,
+    )
+    user = User.objects.create_user(
+        username="benchmark_user", email="benchmark_user@yamdb.fake"
+    )
+    category = title.category or Categories.objects.create(
+        name="Benchmark", slug="benchmark-category"
+    )
+    genre = title.genre.first() or Genres.objects.create(
+        name="Benchmark", slug="benchmark-genre"
+    )
+    review = (
+        Review.objects.filter(title=title)
+        .annotate(comment_count=Count("comments"))
+        .order_by("-comment_count", "pk").first()
+    ) or Review.objects.create(title=title, author=admin, text=TEXT, score=7)
+    comment = review.comments.order_by("pk").first()
+    own_comment = Comment.objects.create(
+        review=review, author=user, text="Комментарий"
+    )
+    own_review = Review.objects.create(
+        title=other_title, author=user, text=TEXT, score=5
+    )
+    spare_category = Categories.objects.create(
+        name="Benchmark", slug="benchmark-spare"
+    )
+    spare_genre = Genres.objects.create(
+        name="Benchmark", slug="benchmark-spare"
+    )
+    spare_title = Title.objects.create(
+        name="Benchmark", year=2000, category=category
+    )
+    spare_title.genre.add(genre)
+    words = sorted(title.name.split(), key=len, reverse=True)
+    last_title = Title.objects.aggregate(last=Max("pk"))["last"]
+    return {
+        "title": title.pk,
+        "other_title": other_title.pk,
+        "review": review.pk,
+        "comment": (comment or own_comment).pk,
+        "own_review": own_review.pk,
+        "own_comment": own_comment.pk,
+        "category": category.slug,
+        "genre": genre.slug,
+        "spare_category": spare_category.slug,
+        "spare_genre": spare_genre.slug,
+        "spare_title": spare_title.pk,
+        "name": title.name.split()[0],
+        "word": words[0],
+        "year": title.year,
+        "year_min": title.year - 10,
+        "username": user.username,
+        "code": default_token_generator.make_token(user),
+        "export_after": max(0, last_title - EXPORTED_TITLES),
+        "batch_titles": list(
+            Title.objects.exclude(pk=other_title.pk)
+            .order_by("pk").values_list("pk", flat=True)[:BATCH_SIZE]
+        ),
+        "users": {ADMIN_CLIENT: admin, USER: user},
+    }
+
+
+def make_clients(context):
+    clients = {ANON: Client()}
+    for name, user in context.pop("users").items():
+        token = RoleRefreshToken.for_user(user).access_token
+        clients[name] = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return clients
+
+
+def send(client, method, path, data):
+    """
+    Send one request in a savepoint rolled back afterwards; return
+    its duration, status and the queries it ran.
+    """
+    body = json.dumps(data) if data is not None else ""
+    # The query log is a bounded deque: keep a long run from filling it.
+    connection.queries_log.clear()
+    with transaction.atomic():
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.generic(
+                method, path, body, content_type="application/json"
+            )
+            if response.streaming:
+                b"".join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        transaction.set_rollback(True)
+    return elapsed, response.status_code, queries.captured_queries
+
+
+def measure(scenario, client, context, iterations, warmup):
+    path = render(scenario.path, context)
+    data = render(scenario.data, context)
+    for _ in range(warmup):
+        send(client, scenario.method, path, data)
+    latencies = []
+    query_count = 0
+    sql_time = 0.0
+    errors = 0
+    for _ in range(iterations):
+        elapsed, status, queries = send(client, scenario.method, path, data)
+        latencies.append(elapsed)
+        query_count += len(queries)
+        sql_time += sum(float(query["time"]) for query in queries)
+        errors += status != scenario.status
+    # Memory is traced in a separate request: tracing slows Python down
+    # too much to time the same requests.
+    tracemalloc.start()
+    try:
+        send(client, scenario.method, path, data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    latencies.sort()
+    return {
+        "method": scenario.method,
+        "path": path,
+        "status": status,
+        "errors": errors,
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "throughput_rps": round(len(latencies) / sum(latencies), 1),
+        "queries": round(query_count / iterations, 2),
+        "sql_ms": round(sql_time * 1000 / iterations, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def dataset_size():
+    return {
+        "users": User.objects.count(),
+        "titles": Title.objects.count(),
+        "reviews": Review.objects.count(),
+        "comments": Comment.objects.count(),
+    }
+
+
+def run(scenarios, iterations=30, warmup=3, progress=None):
+    """
+    Measure the scenarios; return the results as a JSON-ready dict.
+    progress is called with the name and result of every scenario.
+    """
+    rest_framework = dict(settings.REST_FRAMEWORK)
+    rest_framework["DEFAULT_THROTTLE_RATES"] = {}
+    overrides = override_settings(
+        REST_FRAMEWORK=rest_framework,
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+    )
+    routes = {}
+    with overrides, transaction.atomic():
+        size = dataset_size()
+        context = prepare_context()
+        clients = make_clients(context)
+        for scenario in scenarios:
+            result = measure(
+                scenario, clients[scenario.client], context, iterations,
+                warmup,
+            )
+            routes[scenario.name] = result
+            if progress is not None:
+                progress(scenario.name, result)
+        transaction.set_rollback(True)
+    return {
+        "meta": {
+            "created": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "iterations": iterations,
+            "dataset": size,
+        },
+        "routes": routes,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Regressions of results against baseline, as tuples of route,
+    metric, baseline value and current value. Timings and memory
+    regress when they grow by more than tolerance (a share) and more
+    than their floor in COMPARED, query and error counts on any growth.
+    """
+    regressions = []
+    for name, current in results["routes"].items():
+        previous = baseline["routes"].get(name)
+        if previous is None:
+            continue
+        for metric, floor, relative in COMPARED:
+            before, after = previous[metric], current[metric]
+            if relative:
+                floor = max(floor, before * tolerance)
+            if after - before > floor:
+                regressions.append((name, metric, before, after))
+    return regressions
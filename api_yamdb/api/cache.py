@@ -0,0 +1,119 @@
+from hashlib import md5
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+CATEGORIES = "categories"
+GENRES = "genres"
+TITLES = "titles"
+
+
+def get_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def version_key(namespace):
+    return f"catalog:version:{namespace}"
+
+
+def get_version(cache, namespace):
+    version = cache.get(version_key(namespace))
+    if version is None:
+        cache.add(version_key(namespace), uuid4().hex, None)
+        version = cache.get(version_key(namespace))
+    return version
+
+
+def bump(namespaces):
+    """
+    Give the namespaces a fresh version: cached responses stored under
+    the old one are never read again and age out of the cache.
+    """
+    cache = get_cache()
+    cache.set_many(
+        {version_key(namespace): uuid4().hex for namespace in namespaces},
+        None,
+    )
+
+
+def invalidate(*namespaces):
+    """
+    Drop cached responses of the namespaces now and once more on commit,
+    so a read racing the write can't keep the old data cached.
+    """
+    bump(namespaces)
+    transaction.on_commit(lambda: bump(namespaces))
+
+
+class CachedResponseMixin:
+    """
+    Read-through cache of list and retrieve responses.
+
+    Entries live in the CATALOG_CACHE_ALIAS cache under a version of
+    cache_namespace which model signals replace on every write,
+    see api.signals. Combined with ConditionalGetMixin the cached
+    validators answer 304 without touching the database.
+    """
+
+    cache_namespace = None
+    cache_anonymous_only = False
+
+    def should_cache(self, request):
+        return not self.cache_anonymous_only or request.user.is_anonymous
+
+    def cache_key(self, cache, request):
+        url = request.build_absolute_uri()
+        digest = md5(
+            f"{request.accepted_media_type}|{url}".encode()
+        ).hexdigest()
+        version = get_version(cache, self.cache_namespace)
+        return f"catalog:{self.cache_namespace}:{version}:{digest}"
+
+    def cached_response(self, request, build_response):
+        if not self.should_cache(request):
+            return build_response()
+        cache = get_cache()
+        key = self.cache_key(cache, request)
+        entry = cache.get(key)
+        if entry is None:
+            response = build_response()
+            if response.status_code == 200:
+                cache.set(key, {
+                    "data": response.data,
+                    "etag": response.get("ETag"),
+                    "last_modified": response.get("Last-Modified"),
+                })
+            return response
+        last_modified = parse_http_date_safe(entry["last_modified"] or "")
+        not_modified = get_conditional_response(
+            request, etag=entry["etag"], last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+        response = Response(entry["data"])
+        if entry["etag"]:
+            response["ETag"] = entry["etag"]
+        if entry["last_modified"]:
+            response["Last-Modified"] = entry["last_modified"]
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(
+            request,
+            lambda: super(CachedResponseMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            request,
+            lambda: super(CachedResponseMixin, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )
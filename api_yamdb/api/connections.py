@@ -0,0 +1,134 @@
+"""
+Persistent database connections.
+
+Django keeps one connection per thread and closes it once it is
+CONN_MAX_AGE seconds old (DB_CONN_MAX_AGE), at the start or the end of
+a request. The handlers below take over that job from Django's
+close_old_connections(): with CONN_HEALTH_CHECKS on they also mark a
+reused connection to be pinged on its first use in the request, so a
+connection dropped by the server or a proxy is reopened instead of
+failing the request, while requests served without the database (cache
+hits, 304 and 429 responses) make no round trip. They also count what
+happens to the connections of this worker process.
+"""
+import os
+import time
+from threading import Lock
+
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+
+
+class ConnectionStats:
+    """
+    Thread-safe counters of the current worker process:
+    opened - new connections;
+    reused - requests served on an open connection;
+    expired - connections closed at CONN_MAX_AGE;
+    unhealthy - broken connections closed on their first use
+    in a request;
+    waited - async view requests queued for a free pool thread,
+    that is for a free connection (see async_views).
+    """
+
+    FIELDS = ("opened", "reused", "expired", "unhealthy", "waited")
+
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counts = dict.fromkeys(self.FIELDS, 0)
+
+    def add(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {"pid": os.getpid(), **self.counts}
+
+
+stats = ConnectionStats()
+
+
+def open_connections():
+    """
+    Open connections of this thread not inside a transaction:
+    a test or a management command may run requests in one.
+    """
+    return [
+        connection for connection in connections.all()
+        if connection.connection is not None
+        and not connection.in_atomic_block
+    ]
+
+
+def close_obsolete(connection):
+    """
+    Close the connection if it is past its lifetime or left broken
+    by an error; return whether it was closed.
+    """
+    if (
+        connection.close_at is not None
+        and time.monotonic() >= connection.close_at
+    ):
+        connection.close()
+        stats.add("expired")
+        return True
+    connection.close_if_unusable_or_obsolete()
+    if connection.connection is None:
+        stats.add("unhealthy")
+        return True
+    return False
+
+
+def defer_health_check(connection):
+    """
+    Ping the connection on its first use in the request: every cursor
+    and transaction gets its connection through ensure_connection(),
+    shadowed on this connection object until then.
+    """
+
+    def ensure_connection():
+        del connection.ensure_connection
+        if (
+            connection.connection is not None
+            and not connection.in_atomic_block
+            and not connection.is_usable()
+        ):
+            connection.close()
+            stats.add("unhealthy")
+        connection.ensure_connection()
+
+    connection.ensure_connection = ensure_connection
+
+
+def prepare_connections(**kwargs):
+    for connection in open_connections():
+        if close_obsolete(connection):
+            continue
+        if connection.settings_dict.get("CONN_HEALTH_CHECKS"):
+            defer_health_check(connection)
+        stats.add("reused")
+
+
+def release_connections(**kwargs):
+    for connection in open_connections():
+        # A health check the request didn't need waits for the next one.
+        connection.__dict__.pop("ensure_connection", None)
+        close_obsolete(connection)
+
+
+def count_opened(sender, **kwargs):
+    stats.add("opened")
+
+
+def install():
+    for signal in (request_started, request_finished):
+        signal.disconnect(close_old_connections)
+    request_started.connect(prepare_connections)
+    request_finished.connect(release_connections)
+    connection_created.connect(count_opened)
@@ -0,0 +1,92 @@
+import csv
+import json
+
+from reviews.bulk import batches
+from reviews.models import GenreTitle, Review, Title
+
+NDJSON = "ndjson"
+CSV = "csv"
+CONTENT_TYPES = {
+    NDJSON: "application/x-ndjson; charset=utf-8",
+    CSV: "text/csv; charset=utf-8",
+}
+CHUNK_SIZE = 2000
+
+TITLE_COLUMNS = (
+    "id", "name", "year", "description", "category", "genre", "rating",
+    "modified",
+)
+REVIEW_COLUMNS = ("id", "title_id", "author", "text", "score", "pub_date")
+
+
+class Echo:
+    """File-like object handing csv.writer output straight back."""
+
+    def write(self, value):
+        return value
+
+
+def title_rows(since=None, id_after=0):
+    """
+    Titles ordered by id. Rows come from a server-side cursor and the
+    genres of every chunk are read with one extra query.
+    """
+    titles = Title.objects.filter(pk__gt=id_after)
+    if since is not None:
+        titles = titles.filter(modified__gte=since)
+    rows = titles.order_by("pk").values_list(
+        "id", "name", "year", "description", "category__slug",
+        "score_sum", "score_count", "modified",
+    ).iterator(chunk_size=CHUNK_SIZE)
+    for chunk in batches(rows, CHUNK_SIZE):
+        genres = {}
+        for title_id, slug in GenreTitle.objects.filter(
+            title_id__in=[row[0] for row in chunk]
+        ).order_by("genre__slug").values_list("title_id", "genre__slug"):
+            genres.setdefault(title_id, []).append(slug)
+        for (pk, name, year, description, category, score_sum,
+             score_count, modified) in chunk:
+            yield (
+                pk, name, year, description, category, genres.get(pk, []),
+                score_sum // score_count if score_count else None,
+                modified.isoformat(),
+            )
+
+
+def review_rows(title_id=None, since=None, id_after=0):
+    """
+    Reviews ordered by id, streamed from a server-side cursor.
+    since keeps reviews of titles changed since then: every review write
+    bumps the title modification time.
+    """
+    reviews = Review.objects.filter(pk__gt=id_after)
+    if title_id is not None:
+        reviews = reviews.filter(title_id=title_id)
+    if since is not None:
+        reviews = reviews.filter(title__modified__gte=since)
+    rows = reviews.order_by("pk").values_list(
+        "id", "title_id", "author__username", "text", "score", "pub_date",
+    ).iterator(chunk_size=CHUNK_SIZE)
+    for pk, title, author, text, score, pub_date in rows:
+        yield pk, title, author, text, score, pub_date.isoformat()
+
+
+def render_ndjson(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n"
+
+
+def render_csv(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(
+            ",".join(value) if isinstance(value, list) else value
+            for value in row
+        )
+
+
+def render(output, columns, rows):
+    if output == CSV:
+        return render_csv(columns, rows)
+    return render_ndjson(columns, rows)
@@ -1,23 +1,97 @@
 import django_filters as filters
-from reviews.models import Title
+from django.db.models import Count
+from reviews.models import GenreTitle, Title
+
+MATCH_EXACT = "exact"
+MATCH_CONTAINS = "contains"
+MATCH_CHOICES = (
+    (MATCH_EXACT, MATCH_EXACT),
+    (MATCH_CONTAINS, MATCH_CONTAINS),
+)
+GENRE_MODE_OR = "or"
+GENRE_MODE_AND = "and"
+GENRE_MODE_CHOICES = (
+    (GENRE_MODE_OR, GENRE_MODE_OR),
+    (GENRE_MODE_AND, GENRE_MODE_AND),
+)
+NAME_MODE_CONTAINS = "contains"
+NAME_MODE_PREFIX = "prefix"
+NAME_MODE_CHOICES = (
+    (NAME_MODE_CONTAINS, NAME_MODE_CONTAINS),
+    (NAME_MODE_PREFIX, NAME_MODE_PREFIX),
+)
+
+
+def split_slugs(value):
+    return list({slug.strip() for slug in value.split(",") if slug.strip()})
 
 
 class TitlesFilter(filters.FilterSet):
     """
     Add filters to Titles url query params for:
-    category, genre, name, year.
+    category, genre, name, year, year_min, year_max.
+
+    Category and genre take exact slugs, comma-separated for several.
+    Several genres match any of them (genre_mode=or) or all of them
+    (genre_mode=and). Name matches a case-insensitive substring;
+    name_mode=prefix matches the case-sensitive start of the name
+    instead, which the name index serves.
+    match=contains switches category, genre and year
+    to the old substring search, which can't use indexes.
     """
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
+    genre = filters.CharFilter(method="filter_genre")
+    genre_mode = filters.ChoiceFilter(
+        choices=GENRE_MODE_CHOICES,
+        method="filter_option",
     )
-    category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
+    category = filters.CharFilter(method="filter_category")
+    year = filters.NumberFilter(method="filter_year")
+    year_min = filters.NumberFilter(field_name="year", lookup_expr="gte")
+    year_max = filters.NumberFilter(field_name="year", lookup_expr="lte")
+    name = filters.CharFilter(method="filter_name")
+    name_mode = filters.ChoiceFilter(
+        choices=NAME_MODE_CHOICES,
+        method="filter_option",
     )
-    year = filters.NumberFilter(field_name='year', lookup_expr='icontains')
-    name = filters.CharFilter(field_name='name', lookup_expr='icontains')
+    match = filters.ChoiceFilter(choices=MATCH_CHOICES, method="filter_option")
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = ("genre", "category", "year", "name")
+
+    @property
+    def substring_match(self):
+        return self.form.cleaned_data.get("match") == MATCH_CONTAINS
+
+    def filter_option(self, queryset, name, value):
+        return queryset
+
+    def filter_genre(self, queryset, name, value):
+        if self.substring_match:
+            links = GenreTitle.objects.filter(genre__slug__icontains=value)
+            return queryset.filter(pk__in=links.values("title_id"))
+        slugs = split_slugs(value)
+        links = GenreTitle.objects.filter(genre__slug__in=slugs)
+        if self.form.cleaned_data.get("genre_mode") == GENRE_MODE_AND:
+            links = links.values("title_id").annotate(
+                matched=Count("genre_id", distinct=True)
+            ).filter(matched=len(slugs))
+        return queryset.filter(pk__in=links.values("title_id"))
+
+    def filter_category(self, queryset, name, value):
+        if self.substring_match:
+            return queryset.filter(category__slug__icontains=value)
+        return queryset.filter(category__slug__in=split_slugs(value))
+
+    def filter_year(self, queryset, name, value):
+        if self.substring_match:
+            return queryset.filter(year__icontains=value)
+        return queryset.filter(year=value)
+
+    def filter_name(self, queryset, name, value):
+        if (
+            self.form.cleaned_data.get("name_mode") == NAME_MODE_PREFIX
+            and not self.substring_match
+        ):
+            return queryset.filter(name__startswith=value)
+        return queryset.filter(name__icontains=value)
@@ -0,0 +1,180 @@
+"""
+Per-request timing instrumentation, enabled with INSTRUMENTATION=True.
+
+InstrumentationMiddleware times every SQL query of the request through
+execute_wrapper() and splits the request time into
+    db - SQL queries,
+    app - the view without its SQL: permissions, filters and the
+          serializers building the response data,
+    serialize - rendering the response data to JSON,
+    total - the whole middleware chain.
+The numbers go to the Server-Timing response header and to a JSON log
+line per request on the api.instrumentation.requests logger. Requests
+slower than INSTRUMENTATION_SLOW_REQUEST_MS are logged as warnings with
+their slowest queries, queries slower than INSTRUMENTATION_SLOW_QUERY_MS
+as warnings on api.instrumentation.queries with their SQL.
+
+Only queries run in the request thread are seen: under ASGI the async
+read views run their SQL on the async_views pool and report none.
+"""
+import heapq
+import json
+import logging
+from contextlib import ExitStack
+from functools import partial
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+request_logger = logging.getLogger("api.instrumentation.requests")
+query_logger = logging.getLogger("api.instrumentation.queries")
+
+# Slowest queries kept for the slow request log.
+SLOWEST_QUERIES = 5
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 3)
+
+
+class RequestTimings:
+    """
+    SQL and phase timings of one request. Called by execute_wrapper()
+    around every query.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.slow_query = settings.INSTRUMENTATION_SLOW_QUERY_MS / 1000
+        self.queries = 0
+        self.db = 0.0
+        self.slowest = []
+        self.started = perf_counter()
+        # (time, db time) marks of the phases, set as they happen.
+        self.marks = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, perf_counter() - started)
+
+    def record(self, sql, elapsed):
+        self.queries += 1
+        self.db += elapsed
+        entry = (elapsed, self.queries, sql)
+        if len(self.slowest) < SLOWEST_QUERIES:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+        if elapsed >= self.slow_query:
+            query_logger.warning(json.dumps({
+                "event": "slow_query",
+                "method": self.request.method,
+                "path": self.request.path,
+                "duration_ms": milliseconds(elapsed),
+                "sql": sql,
+            }, ensure_ascii=False))
+
+    def mark(self, name, *args):
+        """
+        Note the time and SQL time a phase starts or ends at, once.
+        Arguments after the name, such as the response given to
+        post-render callbacks, are ignored.
+        """
+        self.marks.setdefault(name, (perf_counter(), self.db))
+
+    def span(self, start, end):
+        """(seconds, SQL seconds) between two marks, None if unmarked."""
+        if start not in self.marks or end not in self.marks:
+            return None
+        (started, db_started), (ended, db_ended) = (
+            self.marks[start], self.marks[end]
+        )
+        return ended - started, db_ended - db_started
+
+    def finish(self):
+        # Responses that are not rendered end their view here.
+        self.mark("view_end")
+        self.total = perf_counter() - self.started
+
+    def phases(self):
+        """(name, seconds, description) of the measured phases."""
+        phases = [("db", self.db, f"{self.queries} queries")]
+        view = self.span("view_start", "view_end")
+        if view is not None:
+            phases.append(("app", view[0] - view[1], None))
+        render = self.span("render_start", "render_end")
+        if render is not None:
+            phases.append(("serialize", render[0] - render[1], None))
+        phases.append(("total", self.total, None))
+        return phases
+
+    def server_timing(self):
+        return ", ".join(
+            f"{name};dur={milliseconds(seconds)}"
+            + (f';desc="{description}"' if description else "")
+            for name, seconds, description in self.phases()
+        )
+
+    def as_dict(self, response):
+        match = self.request.resolver_match
+        record = {
+            "event": "request",
+            "method": self.request.method,
+            "path": self.request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "queries": self.queries,
+        }
+        for name, seconds, _ in self.phases():
+            record[f"{name}_ms"] = milliseconds(seconds)
+        return record
+
+
+class InstrumentationMiddleware:
+    """
+    Record the timings of every request, see the module docstring.
+    Goes first in MIDDLEWARE, so that total covers the other middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_request = settings.INSTRUMENTATION_SLOW_REQUEST_MS / 1000
+
+    def __call__(self, request):
+        timings = request.timings = RequestTimings(request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings))
+            response = self.get_response(request)
+        timings.finish()
+        response["Server-Timing"] = timings.server_timing()
+        self.log(timings, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timings.mark("view_start")
+
+    def process_template_response(self, request, response):
+        timings = request.timings
+        timings.mark("view_end")
+        timings.mark("render_start")
+        response.add_post_render_callback(
+            partial(timings.mark, "render_end")
+        )
+        return response
+
+    def log(self, timings, response):
+        record = timings.as_dict(response)
+        if timings.total < self.slow_request:
+            request_logger.info(json.dumps(record, ensure_ascii=False))
+            return
+        record["event"] = "slow_request"
+        record["slowest_queries"] = [
+            {"duration_ms": milliseconds(elapsed), "sql": sql}
+            for elapsed, _, sql in sorted(timings.slowest, reverse=True)
+        ]
+        request_logger.warning(json.dumps(record, ensure_ascii=False))
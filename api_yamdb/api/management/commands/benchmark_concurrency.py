@@ -0,0 +1,127 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from api.benchmark import percentile
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/1/',
+    '/api/v1/titles/1/reviews/',
+    '/api/v1/titles/1/reviews/1/comments/',
+)
+
+
+class Command(BaseCommand):
+    """
+    To compare WSGI and ASGI modes, start both servers, e.g.
+        SERVER_MODE=wsgi GUNICORN_BIND=127.0.0.1:8001 gunicorn
+        SERVER_MODE=asgi GUNICORN_BIND=127.0.0.1:8002 gunicorn
+    and run
+        python3 manage.py benchmark_concurrency \\
+            --target wsgi=http://127.0.0.1:8001 \\
+            --target asgi=http://127.0.0.1:8002
+
+    Every target gets the same number of GET requests over the paths,
+    with --concurrency requests in flight at a time. Anonymous reads are
+    throttled: pass --token or turn THROTTLE_ANON_READ_RATE off.
+    """
+    help = 'command to compare concurrent read throughput of servers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            action='append',
+            required=True,
+            help='label=base URL of a running server, repeatable.',
+        )
+        parser.add_argument(
+            '--path',
+            action='append',
+            help='Requested path, repeatable. Defaults to the titles list '
+                 'and detail, reviews list and comments list.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Number of measured requests per target.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=32,
+            help='Number of requests in flight at a time.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=50,
+            help='Number of unmeasured requests sent first.',
+        )
+        parser.add_argument(
+            '--token',
+            help='JWT access token sent with every request.',
+        )
+
+    def fetch(self, url):
+        headers = {}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        started = time.perf_counter()
+        try:
+            with urlopen(Request(url, headers=headers), timeout=30) as reply:
+                reply.read()
+                status = reply.status
+        except HTTPError as error:
+            status = error.code
+        except (URLError, OSError):
+            status = None
+        return time.perf_counter() - started, status
+
+    def run(self, base_url, paths, count, concurrency):
+        urls = [base_url.rstrip('/') + path for path in paths]
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            started = time.perf_counter()
+            results = list(pool.map(self.fetch, islice(cycle(urls), count)))
+            elapsed = time.perf_counter() - started
+        return results, elapsed
+
+    def handle(self, *args, **options):
+        self.token = options['token']
+        paths = options['path'] or DEFAULT_PATHS
+        targets = []
+        for target in options['target']:
+            label, _, url = target.partition('=')
+            if not url:
+                raise CommandError(f'Expected label=URL, got "{target}".')
+            targets.append((label, url))
+        self.stdout.write(
+            f'{options["requests"]} requests per target, '
+            f'{options["concurrency"]} concurrent, over {len(paths)} paths'
+        )
+        self.stdout.write(
+            f'{"target":<12}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}'
+            f'{"p99 ms":>10}{"errors":>8}'
+        )
+        for label, url in targets:
+            self.run(url, paths, options['warmup'], options['concurrency'])
+            results, elapsed = self.run(
+                url, paths, options['requests'], options['concurrency']
+            )
+            latencies = sorted(latency for latency, _ in results)
+            errors = sum(
+                1 for _, status in results
+                if status is None or status >= 400
+            )
+            self.stdout.write(
+                f'{label:<12}{len(results) / elapsed:>10.1f}'
+                f'{statistics.median(latencies) * 1000:>10.1f}'
+                f'{percentile(latencies, 0.95) * 1000:>10.1f}'
+                f'{percentile(latencies, 0.99) * 1000:>10.1f}'
+                f'{errors:>8}'
+            )
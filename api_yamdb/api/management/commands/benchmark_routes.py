@@ -0,0 +1,120 @@
+import json
+
+from api import benchmark
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    To benchmark every route on the current database -
+        python3 manage.py generate_dataset --truncate
+        python3 manage.py benchmark_routes --output baseline.json
+    To check a change against it -
+        python3 manage.py benchmark_routes --baseline baseline.json
+
+    Every route is requested --iterations times through the Django test
+    client, see api.benchmark; nothing is left in the database. Results
+    go to --output as JSON. With --baseline the command fails when the
+    p95 latency or peak memory of a route grows by more than
+    --tolerance, or its query or error count grows at all.
+    """
+    help = 'command to measure latency, queries and memory of API routes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=30,
+            help='Number of measured requests per route.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=3,
+            help='Number of unmeasured requests sent first.',
+        )
+        parser.add_argument(
+            '--route',
+            action='append',
+            help='Benchmarked route name or pattern such as "titles-*", '
+                 'repeatable. Defaults to every route.',
+        )
+        parser.add_argument(
+            '--output',
+            default='benchmark.json',
+            help='File the results are written to.',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Results file of an earlier run to compare with.',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Allowed relative growth of latency and memory.',
+        )
+
+    def write_result(self, name, result):
+        self.stdout.write(
+            f'{name:<30}{result["p50_ms"]:>9.1f}{result["p95_ms"]:>9.1f}'
+            f'{result["p99_ms"]:>9.1f}{result["throughput_rps"]:>9.1f}'
+            f'{result["queries"]:>8.1f}{result["sql_ms"]:>9.1f}'
+            f'{result["peak_kib"]:>10.0f}{result["errors"]:>7}'
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be positive.')
+        scenarios = benchmark.select_scenarios(options['route'])
+        if not scenarios:
+            raise CommandError('No route matches --route.')
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as file:
+                baseline = json.load(file)
+        self.stdout.write(
+            f'{"route":<30}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}'
+            f'{"req/s":>9}{"queries":>8}{"sql ms":>9}{"peak KiB":>10}'
+            f'{"errors":>7}'
+        )
+        try:
+            results = benchmark.run(
+                scenarios, options['iterations'], options['warmup'],
+                self.write_result,
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Results written to {options["output"]}')
+        failed = [
+            name for name, result in results['routes'].items()
+            if result['errors']
+        ]
+        if failed:
+            self.stderr.write(
+                f'Unexpected statuses from: {", ".join(failed)}'
+            )
+        if baseline is not None:
+            self.compare(results, baseline, options)
+
+    def compare(self, results, baseline, options):
+        if baseline['meta']['dataset'] != results['meta']['dataset']:
+            self.stderr.write(
+                'The baseline was measured on a different dataset: '
+                f'{baseline["meta"]["dataset"]}'
+            )
+        regressions = benchmark.compare(
+            results, baseline, options['tolerance']
+        )
+        for name, metric, before, after in regressions:
+            self.stderr.write(f'{name}: {metric} {before} -> {after}')
+        if regressions:
+            raise CommandError(
+                f'{len(regressions)} regressions against '
+                f'{options["baseline"]}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'No regressions against {options["baseline"]}'
+        ))
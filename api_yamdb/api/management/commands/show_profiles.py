@@ -0,0 +1,112 @@
+import io
+import json
+import os
+import pstats
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    To list the captured request profiles -
+        python3 manage.py show_profiles
+    To summarise one -
+        python3 manage.py show_profiles 20240101-120000-000000-42
+
+    Profiles are captured by api.profiling from admin requests sent with
+    the X-Profile header while PROFILING=True. The summary shows the
+    functions with the highest --sort time and, for memory profiles,
+    the lines that allocated the most.
+    """
+    help = 'command to list and summarise captured request profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'profile',
+            nargs='?',
+            help='Id of the profile to summarise, "latest" for the newest.',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Number of functions and allocation sites shown.',
+        )
+        parser.add_argument(
+            '--sort',
+            default='cumulative',
+            choices=('cumulative', 'tottime', 'ncalls'),
+            help='Order of the functions.',
+        )
+
+    def profiles(self):
+        directory = settings.PROFILING_DIR
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            name[:-5] for name in os.listdir(directory)
+            if name.endswith('.json')
+        )
+
+    def read_meta(self, profile_id):
+        path = os.path.join(settings.PROFILING_DIR, f'{profile_id}.json')
+        try:
+            with open(path, encoding='utf-8') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            raise CommandError(f'No profile {profile_id}.')
+
+    def list_profiles(self, profiles):
+        if not profiles:
+            self.stdout.write(f'No profiles in {settings.PROFILING_DIR}')
+            return
+        self.stdout.write(
+            f'{"id":<32}{"mode":<8}{"status":>7}{"ms":>10}  request'
+        )
+        for profile_id in profiles:
+            meta = self.read_meta(profile_id)
+            self.stdout.write(
+                f'{profile_id:<32}{meta["mode"]:<8}{meta["status"]:>7}'
+                f'{meta["duration_ms"]:>10.1f}  '
+                f'{meta["method"]} {meta["path"]}'
+            )
+
+    def summarise(self, profile_id, limit, sort):
+        meta = self.read_meta(profile_id)
+        self.stdout.write(
+            f'{meta["method"]} {meta["path"]} ({meta["view"]}): '
+            f'{meta["status"]} in {meta["duration_ms"]:.1f} ms, '
+            f'captured {meta["created"]}'
+        )
+        output = io.StringIO()
+        stats = pstats.Stats(
+            os.path.join(settings.PROFILING_DIR, f'{profile_id}.prof'),
+            stream=output,
+        )
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        self.stdout.write(output.getvalue())
+        if not meta['allocations']:
+            return
+        self.stdout.write(
+            f'Peak traced memory: {meta["peak_kib"]:.1f} KiB. '
+            'Top allocation sites:'
+        )
+        self.stdout.write(f'{"KiB":>10}{"blocks":>9}  line')
+        for site in meta['allocations'][:limit]:
+            self.stdout.write(
+                f'{site["size_kib"]:>10.1f}{site["count"]:>9}  '
+                f'{site["file"]}:{site["line"]}'
+            )
+
+    def handle(self, *args, **options):
+        profiles = self.profiles()
+        profile_id = options['profile']
+        if profile_id is None:
+            self.list_profiles(profiles)
+            return
+        if profile_id == 'latest':
+            if not profiles:
+                raise CommandError('No profiles captured yet.')
+            profile_id = profiles[-1]
+        self.summarise(profile_id, options['limit'], options['sort'])
@@ -0,0 +1,179 @@
+"""
+Prometheus metrics, enabled with METRICS=True.
+
+MetricsMiddleware counts requests and responses and observes latency,
+SQL query count and SQL time per request, labelled with the URL name
+of the route and the method. Queries of async views count through
+track_queries() in the pool thread running them; rows a streaming
+response reads after the view returns are not counted.
+Under gunicorn every worker writes its values to mmap files in
+PROMETHEUS_MULTIPROC_DIR (set up by gunicorn.conf.py) and
+metrics_view() adds up the files of all workers, so any worker can
+answer the scrape. Without that directory, as under
+runserver, the values of the current process are exposed.
+
+The outbox queue gauges are read from the database on every scrape.
+"""
+import ipaddress
+import os
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+from prometheus_client.core import GaugeMetricFamily
+from users.models import OutboxMessage
+
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+# Label of requests no route matched, so that scanners can't add
+# a label value per probed URL.
+UNMATCHED = "unmatched"
+LABELS = ("route", "method")
+
+REQUESTS = Counter(
+    "yamdb_http_requests", "Requests received.", LABELS
+)
+RESPONSES = Counter(
+    "yamdb_http_responses", "Responses sent, by status code.",
+    LABELS + ("status",),
+)
+LATENCY = Histogram(
+    "yamdb_http_request_duration_seconds", "Request handling time.",
+    LABELS,
+    buckets=(
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+    ),
+)
+QUERIES = Histogram(
+    "yamdb_db_queries_per_request", "SQL queries run by a request.",
+    LABELS, buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+QUERY_TIME = Histogram(
+    "yamdb_db_query_duration_seconds",
+    "Total time of the SQL queries of a request.",
+    LABELS,
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+
+class QueryCounter:
+    """execute_wrapper() counting the queries of a request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += perf_counter() - started
+
+
+def track_queries(request):
+    """
+    Context manager counting the queries of the current thread into
+    the QueryCounter MetricsMiddleware attached to the request, if any.
+    """
+    stack = ExitStack()
+    queries = getattr(request, "query_counter", None)
+    if queries is not None:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(queries))
+    return stack
+
+
+class MetricsMiddleware:
+    """
+    Record the metrics of every request. Goes first in MIDDLEWARE.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = request.query_counter = QueryCounter()
+        started = perf_counter()
+        with track_queries(request):
+            response = self.get_response(request)
+        elapsed = perf_counter() - started
+        match = request.resolver_match
+        labels = (
+            match.view_name if match else UNMATCHED,
+            request.method if request.method in METHODS else "other",
+        )
+        REQUESTS.labels(*labels).inc()
+        RESPONSES.labels(*labels, str(response.status_code)).inc()
+        LATENCY.labels(*labels).observe(elapsed)
+        QUERIES.labels(*labels).observe(queries.count)
+        QUERY_TIME.labels(*labels).observe(queries.duration)
+        return response
+
+
+class OutboxCollector:
+    """Queue depth and age of the e-mail outbox."""
+
+    def collect(self):
+        stats = OutboxMessage.objects.stats()
+        for name in ("pending", "due", "failed"):
+            yield GaugeMetricFamily(
+                f"yamdb_outbox_{name}_messages",
+                f"Outbox messages {name}.",
+                value=stats[name],
+            )
+        yield GaugeMetricFamily(
+            "yamdb_outbox_oldest_age_seconds",
+            "Age of the oldest pending outbox message.",
+            value=stats["oldest_age"],
+        )
+
+
+outbox_registry = CollectorRegistry(auto_describe=False)
+outbox_registry.register(OutboxCollector())
+
+
+def is_internal(request):
+    """
+    Whether the request came straight from an internal network.
+    Requests proxied by nginx carry X-Forwarded-For and are external.
+    """
+    if "HTTP_X_FORWARDED_FOR" in request.META:
+        return False
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network)
+        for network in settings.METRICS_ALLOWED_NETWORKS
+    )
+
+
+def worker_registry():
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request):
+    """
+    Metrics of all workers in the Prometheus text format,
+    for internal callers only.
+    """
+    if not settings.METRICS:
+        raise Http404
+    if not is_internal(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        generate_latest(worker_registry())
+        + generate_latest(outbox_registry),
+        content_type=CONTENT_TYPE_LATEST,
+    )
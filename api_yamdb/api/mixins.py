@@ -1,4 +1,9 @@
+from hashlib import md5
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import mixins, viewsets
+from rest_framework.exceptions import NotFound
 
 
 class CreateListDestroyMixinSet(
@@ -8,3 +13,96 @@ class CreateListDestroyMixinSet(
     viewsets.GenericViewSet,
 ):
     pass
+
+
+class NestedListMixin:
+    """
+    List a nested route without loading its parents first.
+
+    get_queryset() filters the rows through the parents named in the URL,
+    so a non-empty page already proves the route valid; only an empty page
+    costs one get_parent_queryset().exists() check to answer 404
+    for a missing parent.
+
+    The parent is the parent_model row matching parent_lookups, which map
+    model lookups to the URL kwargs holding their values.
+    """
+
+    parent_model = None
+    parent_lookups = {}
+
+    def get_parent_queryset(self):
+        assert self.parent_model is not None, (
+            f"'{self.__class__.__name__}' should include a `parent_model` "
+            f"attribute, or override the `get_parent_queryset()` method."
+        )
+        return self.parent_model.objects.filter(**{
+            lookup: self.kwargs.get(kwarg)
+            for lookup, kwarg in self.parent_lookups.items()
+        })
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page and not self.get_parent_queryset().exists():
+            raise NotFound
+        return page
+
+
+class ConditionalGetMixin:
+    """
+    Add ETag and Last-Modified to list and retrieve responses.
+
+    Validators come from get_list_validators() and
+    get_object_validators(), which return (etag parts, last modified
+    datetime or None) from cheap queries, or None to skip the check.
+    Matching If-None-Match/If-Modified-Since requests get 304 Not Modified
+    before the serializer runs.
+    """
+
+    def get_list_validators(self):
+        return None
+
+    def get_object_validators(self):
+        return None
+
+    def build_etag(self, parts):
+        source = "|".join(
+            [self.request.get_full_path()] + [str(part) for part in parts]
+        )
+        return quote_etag(md5(source.encode()).hexdigest())
+
+    def conditional_response(self, validators, build_response):
+        if validators is None:
+            return build_response()
+        parts, modified = validators
+        etag = self.build_etag(parts)
+        last_modified = (
+            int(modified.timestamp()) if modified is not None else None
+        )
+        not_modified = get_conditional_response(
+            self.request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+        response = build_response()
+        if response.status_code == 200:
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_list_validators(),
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            self.get_object_validators(),
+            lambda: super(ConditionalGetMixin, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )
@@ -0,0 +1,168 @@
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, LimitOffsetPagination,
+                                       _positive_int)
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on (pub_date, id), or on the two ordering
+    fields of a subclass, descending if descending is set.
+    Every page is an index range scan from the cursor position,
+    so deep pages cost the same as the first one and no COUNT(*) runs.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    max_limit = 100
+    ordering = ("pub_date", "id")
+    descending = False
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        position, reverse = self.decode_cursor(request)
+        key_field, id_field = self.ordering
+        backwards = reverse != self.descending
+        if position is not None:
+            key, pk = position
+            lookup = "lt" if backwards else "gt"
+            queryset = queryset.filter(
+                **{f"{key_field}__{lookup}e": key}
+            ).filter(
+                Q(**{f"{key_field}__{lookup}": key})
+                | Q(**{f"{id_field}__{lookup}": pk})
+            )
+        ordering = (
+            [f"-{field}" for field in self.ordering] if backwards
+            else self.ordering
+        )
+        page = list(queryset.order_by(*ordering)[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if reverse:
+            page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_limit(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.limit_query_param],
+                strict=True,
+                cutoff=self.max_limit,
+            )
+        except (KeyError, ValueError):
+            return LimitOffsetPagination.default_limit or self.max_limit
+
+    def parse_key(self, value):
+        """Value of the first ordering field from a cursor, or None."""
+        return parse_datetime(value)
+
+    def format_key(self, value):
+        return value.isoformat()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            direction, key, pk = b64decode(
+                encoded.encode("ascii"), altchars=b"-_", validate=True
+            ).decode("ascii").split("|")
+            key = self.parse_key(key)
+            pk = int(pk)
+        except (BinasciiError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if key is None or direction not in ("n", "p"):
+            raise NotFound(self.invalid_cursor_message)
+        return (key, pk), direction == "p"
+
+    def encode_cursor(self, obj, reverse):
+        key_field, id_field = self.ordering
+        position = "|".join((
+            "p" if reverse else "n",
+            self.format_key(getattr(obj, key_field)),
+            str(getattr(obj, id_field)),
+        ))
+        encoded = b64encode(position.encode("ascii"), altchars=b"-_")
+        url = remove_query_param(self.request.build_absolute_uri(), "offset")
+        return replace_query_param(
+            url, self.cursor_query_param, encoded.decode("ascii")
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class TopTitlesPagination(KeysetPagination):
+    """Leaderboard rows by weighted rating, best first."""
+
+    ordering = ("rating", "title_id")
+    descending = True
+
+    def parse_key(self, value):
+        return float(value)
+
+    def format_key(self, value):
+        return repr(value)
+
+
+class TrendingTitlesPagination(TopTitlesPagination):
+    """Leaderboard rows by review velocity, fastest first."""
+
+    ordering = ("velocity", "title_id")
+
+
+class LimitOffsetOrKeysetPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination by default.
+    Clients opt into keyset pages with ?pagination=cursor
+    and then follow the cursor links.
+    """
+
+    mode_query_param = "pagination"
+    keyset_mode = "cursor"
+    keyset_class = KeysetPagination
+
+    def uses_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == self.keyset_mode
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.uses_keyset(request):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
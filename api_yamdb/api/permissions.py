@@ -26,7 +26,7 @@ class IsAdminModeratorOwnerOrReadOnly(BasePermission):
         return (request.method in SAFE_METHODS
                 or request.user.is_admin
                 or request.user.is_moderator
-                or obj.author == request.user)
+                or obj.author_id == request.user.pk)
 
 
 class IsAdministrator(BasePermission):
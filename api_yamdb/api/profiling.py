@@ -0,0 +1,172 @@
+"""
+On-demand profiling of single requests, enabled with PROFILING=True.
+
+An admin request with the X-Profile header or the profile query
+parameter runs under cProfile; the value "memory" also traces its
+allocations with tracemalloc. The profile goes to PROFILING_DIR as
+<id>.prof (pstats) with <id>.json holding the request, its timings and
+the top allocation sites; the response names it in X-Profile-Id.
+show_profiles lists and summarises them.
+
+Without PROFILING the middleware is not installed at all. With it,
+other requests only pay for the flag check; flagged ones are profiled
+with PROFILING_SAMPLE_RATE probability, one at a time per process, and
+only the newest PROFILING_MAX_FILES profiles are kept.
+"""
+import cProfile
+import json
+import os
+import random
+import tracemalloc
+from datetime import datetime
+from threading import Lock
+from time import perf_counter
+
+from django.conf import settings
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+
+HEADER = "HTTP_X_PROFILE"
+PARAMETER = "profile"
+MEMORY = "memory"
+# Allocation sites kept in the profile metadata.
+TOP_ALLOCATIONS = 25
+
+# cProfile and tracemalloc can't profile two requests at once.
+busy = Lock()
+
+
+def requested_mode(request):
+    """None, "cpu" or "memory", from the header or query flag."""
+    value = request.META.get(HEADER, request.GET.get(PARAMETER))
+    if value is None or value.lower() in ("", "0", "false"):
+        return None
+    return MEMORY if value.lower() == MEMORY else "cpu"
+
+
+def is_admin(request):
+    """
+    Whether the request comes from an admin, by session or by the API
+    authentication, which only runs in the view otherwise.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        user = None
+        for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+            try:
+                result = authentication().authenticate(request)
+            except APIException:
+                return False
+            if result is not None:
+                user = result[0]
+                break
+    return user is not None and bool(
+        getattr(user, "is_admin", False) or user.is_superuser
+    )
+
+
+def allocation_sites(snapshot, limit):
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    return [
+        {
+            "file": statistic.traceback[0].filename,
+            "line": statistic.traceback[0].lineno,
+            "size_kib": round(statistic.size / 1024, 1),
+            "count": statistic.count,
+        }
+        for statistic in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+def prune(directory, keep):
+    """Delete all but the newest keep profiles."""
+    names = sorted(
+        name[:-5] for name in os.listdir(directory)
+        if name.endswith(".json")
+    )
+    for name in names[:-keep]:
+        for suffix in (".prof", ".json"):
+            try:
+                os.remove(os.path.join(directory, name + suffix))
+            except FileNotFoundError:
+                pass
+
+
+class ProfilingMiddleware:
+    """
+    Profile flagged admin requests, see the module docstring. Goes last
+    in MIDDLEWARE, so that request.user is set and the profile covers
+    the view and the rendering of its response.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = requested_mode(request)
+        if (
+            mode is None
+            or random.random() >= settings.PROFILING_SAMPLE_RATE
+            or not is_admin(request)
+            or not busy.acquire(blocking=False)
+        ):
+            return self.get_response(request)
+        try:
+            return self.profile(request, mode)
+        finally:
+            busy.release()
+
+    def profile(self, request, mode):
+        if mode == MEMORY and tracemalloc.is_tracing():
+            # Traced by someone else, such as benchmark_routes.
+            mode = "cpu"
+        profiler = cProfile.Profile()
+        if mode == MEMORY:
+            tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+        started = perf_counter()
+        try:
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            elapsed = perf_counter() - started
+            allocations = peak = None
+            if mode == MEMORY:
+                peak = tracemalloc.get_traced_memory()[1]
+                allocations = allocation_sites(
+                    tracemalloc.take_snapshot(), TOP_ALLOCATIONS
+                )
+        finally:
+            if mode == MEMORY:
+                tracemalloc.stop()
+        match = request.resolver_match
+        profile_id = self.save(profiler, {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "method": request.method,
+            "path": request.get_full_path(),
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "duration_ms": round(elapsed * 1000, 3),
+            "mode": mode,
+            "peak_kib": None if peak is None else round(peak / 1024, 1),
+            "allocations": allocations,
+        })
+        response["X-Profile-Id"] = profile_id
+        return response
+
+    def save(self, profiler, meta):
+        directory = settings.PROFILING_DIR
+        os.makedirs(directory, exist_ok=True)
+        profile_id = (
+            f"{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}"
+        )
+        path = os.path.join(directory, profile_id)
+        profiler.dump_stats(path + ".prof")
+        with open(path + ".json", "w", encoding="utf-8") as file:
+            json.dump(meta, file, ensure_ascii=False, indent=2)
+        prune(directory, settings.PROFILING_MAX_FILES)
+        return profile_id
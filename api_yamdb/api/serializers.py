@@ -1,9 +1,17 @@
+from abc import ABCMeta, abstractmethod
+
+from api.cache import TITLES, invalidate
+from api.export import CSV, NDJSON
 from api.validators import validate_me_username
 from django.contrib.auth import get_user_model
 from django.core.validators import RegexValidator
+from django.db import connection, transaction
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueValidator
-from reviews.models import Categories, Comment, Genres, Review, Title
+from reviews import leaderboard
+from reviews.models import (Categories, Comment, Genres, GenreTitle, Review,
+                            Title, TitleRank)
 
 User = get_user_model()
 
@@ -133,7 +141,7 @@ class TitlesSerializer(serializers.ModelSerializer):
         "category",
         "rating",
     )
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
@@ -165,6 +173,195 @@ class TitlesCreateSerializer(serializers.ModelSerializer):
         model = Title
 
 
+class BatchListSerializer(serializers.ListSerializer, metaclass=ABCMeta):
+    """
+    Validate a batch item by item, then look up everything the valid
+    items refer to with one query per model. Errors are reported by
+    position, an empty object standing for a valid item.
+    """
+
+    max_items = 1000
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list) or not data:
+            return super().to_internal_value(data)
+        if len(data) > self.max_items:
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f"Ensure this batch has no more than "
+                    f"{self.max_items} items."
+                ]
+            })
+        items, errors = [], []
+        for item in data:
+            try:
+                items.append(self.child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                items.append(None)
+                errors.append(exc.detail)
+        valid = [item for item in items if item is not None]
+        resolved = iter(self.resolve(valid))
+        for position, item in enumerate(items):
+            if item is not None:
+                errors[position] = next(resolved)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
+    @abstractmethod
+    def resolve(self, items):
+        """
+        Replace references in the valid items in place and return
+        their errors in the same order.
+        """
+
+    @staticmethod
+    def returns_bulk_ids():
+        """
+        Whether bulk_create sets the new ids (PostgreSQL). Elsewhere
+        rows are saved one by one, running save() and signals.
+        """
+        return connection.features.can_return_rows_from_bulk_insert
+
+
+class TitleBatchListSerializer(BatchListSerializer):
+
+    def resolve(self, items):
+        categories = Categories.objects.in_bulk(
+            {item["category"] for item in items}, field_name="slug"
+        )
+        genres = Genres.objects.in_bulk(
+            {slug for item in items for slug in item["genre"]},
+            field_name="slug",
+        )
+        errors = []
+        for item in items:
+            error = {}
+            category = categories.get(item["category"])
+            if category is None:
+                error["category"] = [
+                    f"Object with slug={item['category']} does not exist."
+                ]
+            missing = [slug for slug in item["genre"] if slug not in genres]
+            if missing:
+                error["genre"] = [
+                    f"Object with slug={slug} does not exist."
+                    for slug in missing
+                ]
+            item["category"] = category
+            item["genre"] = list(dict.fromkeys(
+                genres.get(slug) for slug in item["genre"]
+            ))
+            errors.append(error)
+        return errors
+
+    def create(self, validated_data):
+        titles = [
+            Title(
+                name=item["name"],
+                year=item["year"],
+                description=item.get("description"),
+                category=item["category"],
+            )
+            for item in validated_data
+        ]
+        with transaction.atomic():
+            if self.returns_bulk_ids():
+                Title.objects.bulk_create(titles)
+            else:
+                for title in titles:
+                    title.save()
+            GenreTitle.objects.bulk_create(
+                GenreTitle(title=title, genre=genre)
+                for title, item in zip(titles, validated_data)
+                for genre in item["genre"]
+            )
+            leaderboard.place_titles(title.pk for title in titles)
+            invalidate(TITLES)
+        return titles
+
+
+class TitleBatchSerializer(serializers.ModelSerializer):
+    """
+    Serialize an item of a title batch. Slugs are resolved
+    for the whole batch by TitleBatchListSerializer.
+    """
+
+    category = serializers.SlugField()
+    genre = serializers.ListField(child=serializers.SlugField())
+
+    class Meta:
+        fields = ("name", "year", "description", "genre", "category")
+        model = Title
+        list_serializer_class = TitleBatchListSerializer
+
+
+class ReviewBatchListSerializer(BatchListSerializer):
+
+    def resolve(self, items):
+        author = self.context["request"].user
+        title_ids = {item["title"] for item in items}
+        existing = set(
+            Title.objects.filter(pk__in=title_ids)
+            .values_list("pk", flat=True)
+        )
+        reviewed = set(
+            Review.objects.filter(author_id=author.pk, title_id__in=title_ids)
+            .values_list("title_id", flat=True)
+        )
+        errors = []
+        for item in items:
+            title_id = item["title"]
+            if title_id not in existing:
+                errors.append({"title": [
+                    f'Invalid pk "{title_id}" - object does not exist.'
+                ]})
+            elif title_id in reviewed:
+                errors.append({api_settings.NON_FIELD_ERRORS_KEY: [
+                    "Отзыв уже существует!"
+                ]})
+            else:
+                errors.append({})
+            reviewed.add(title_id)
+        return errors
+
+    def create(self, validated_data):
+        reviews = [
+            Review(
+                title_id=item["title"],
+                author=item["author"],
+                text=item["text"],
+                score=item["score"],
+            )
+            for item in validated_data
+        ]
+        with transaction.atomic():
+            if self.returns_bulk_ids():
+                Review.objects.bulk_create(reviews)
+                Title.objects.add_scores(
+                    {review.title_id: review.score for review in reviews}
+                )
+            else:
+                for review in reviews:
+                    review.save()
+            invalidate(TITLES)
+        return reviews
+
+
+class ReviewBatchSerializer(serializers.ModelSerializer):
+    """
+    Serialize an item of a review batch of the request user.
+    """
+
+    title = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = Review
+        fields = ("title", "text", "score")
+        list_serializer_class = ReviewBatchListSerializer
+
+
 class ReviewSerializer(serializers.ModelSerializer):
     """Serializer Review model."""
 
@@ -182,15 +379,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ("id", "text", "author", "score", "pub_date", "title")
 
-    def validate(self, data):
-        if not self.context.get("request").method == "POST":
-            return data
-        author = self.context.get("request").user
-        title_id = self.context.get("view").kwargs.get("title_id")
-        if Review.objects.filter(author=author, title=title_id).exists():
-            raise serializers.ValidationError("Отзыв уже существует!")
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
     """Serializer Comment model."""
@@ -208,3 +396,71 @@ class CommentSerializer(serializers.ModelSerializer):
             "author",
             "pub_date",
         )
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    """
+    Serialize full-text search query params.
+    """
+
+    q = serializers.CharField(max_length=200)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+    offset = serializers.IntegerField(min_value=0, default=0)
+
+
+class SearchResultSerializer(serializers.Serializer):
+    """
+    Serialize a ranked full-text search hit: a title or a review.
+    """
+
+    type = serializers.CharField()
+    id = serializers.IntegerField()
+    title_id = serializers.IntegerField()
+    name = serializers.CharField()
+    text = serializers.CharField(allow_null=True)
+    author = serializers.CharField(allow_null=True)
+    rank = serializers.FloatField()
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    """
+    Serialize leaderboard query params: a category or a genre slug.
+    """
+
+    category = serializers.SlugField(required=False)
+    genre = serializers.SlugField(required=False)
+
+    def validate(self, data):
+        if "category" in data and "genre" in data:
+            raise serializers.ValidationError(
+                "Укажите категорию или жанр, но не оба сразу."
+            )
+        return data
+
+
+class TitleRankSerializer(serializers.ModelSerializer):
+    """
+    Serialize a leaderboard row: the title, its Bayesian-weighted
+    rating and its reviews per day over the trending window.
+    """
+
+    title = TitlesSerializer(read_only=True)
+    weighted_rating = serializers.FloatField(source="rating", read_only=True)
+    reviews_per_day = serializers.FloatField(
+        source="velocity", read_only=True
+    )
+
+    class Meta:
+        model = TitleRank
+        fields = ("title", "weighted_rating", "reviews_per_day")
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    """
+    Serialize bulk export query params.
+    """
+
+    output = serializers.ChoiceField(choices=(NDJSON, CSV), default=NDJSON)
+    updated_since = serializers.DateTimeField(required=False)
+    id_after = serializers.IntegerField(min_value=0, default=0)
+    title = serializers.IntegerField(min_value=1, required=False)
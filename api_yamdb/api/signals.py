@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Categories, Genres, GenreTitle, Review, Title
+
+from .authentication import user_cache
+from .cache import CATEGORIES, GENRES, TITLES, invalidate
+
+User = get_user_model()
+
+# Cached namespaces whose responses show each model.
+CACHED_IN = {
+    Categories: (CATEGORIES, TITLES),
+    Genres: (GENRES, TITLES),
+    Title: (TITLES,),
+    GenreTitle: (TITLES,),
+    Review: (TITLES,),
+}
+
+
+def invalidate_catalog_cache(sender, **kwargs):
+    invalidate(*CACHED_IN[sender])
+
+
+for model in CACHED_IN:
+    post_save.connect(invalidate_catalog_cache, sender=model)
+    post_delete.connect(invalidate_catalog_cache, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, action, **kwargs):
+    if action.startswith("post_"):
+        invalidate(TITLES)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    user_cache.discard(instance.pk)
@@ -0,0 +1,143 @@
+from hashlib import sha1
+from time import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Sliding window counter on the THROTTLE_CACHE_ALIAS cache.
+
+    Requests are counted per fixed window with atomic cache increments;
+    the count of the previous window is weighted by how much of it still
+    overlaps the sliding window. A few cache calls decide a request, so
+    rejected requests cost no database work, and the counters are safe
+    to share between workers on a Redis or Memcached cache.
+    Rates are read from DEFAULT_THROTTLE_RATES on every request;
+    a missing or empty rate disables the throttle.
+    """
+
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def __init__(self):
+        self.cache = caches[settings.THROTTLE_CACHE_ALIAS]
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope) or None
+
+    def ident_key(self, ident):
+        """
+        Cache key of a client ident. Idents are client input, hashed
+        so that long values or whitespace never reach Memcached keys.
+        """
+        return self.cache_format % {
+            "scope": self.scope,
+            "ident": sha1(ident.encode()).hexdigest(),
+        }
+
+    def window_keys(self, now):
+        window = int(now // self.duration)
+        return f"{self.key}:{window - 1}", f"{self.key}:{window}"
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.now = time()
+        previous_key, current_key = self.window_keys(self.now)
+        counts = self.cache.get_many([previous_key, current_key])
+        self.previous = counts.get(previous_key, 0)
+        self.current = counts.get(current_key, 0)
+        if self.estimate() >= self.num_requests:
+            return self.throttle_failure()
+        self.cache.add(current_key, 0, 2 * self.duration)
+        try:
+            self.current = self.cache.incr(current_key)
+        except ValueError:
+            # The counter expired between add() and incr().
+            self.cache.set(current_key, 1, 2 * self.duration)
+            self.current = 1
+        # Concurrent requests may all have passed the first check;
+        # the incremented counter settles which of them get in.
+        if self.estimate() > self.num_requests:
+            return self.throttle_failure()
+        return self.throttle_success()
+
+    def overlap(self):
+        """Share of the previous window still inside the sliding one."""
+        return 1 - (self.now % self.duration) / self.duration
+
+    def estimate(self):
+        return self.previous * self.overlap() + self.current
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        """
+        Seconds until the weighted previous window has shrunk enough
+        to let one more request in.
+        """
+        remaining = self.duration - self.now % self.duration
+        if self.current >= self.num_requests or not self.previous:
+            return remaining
+        excess = self.estimate() - self.num_requests + 1
+        return min(remaining, excess * self.duration / self.previous)
+
+
+class IPThrottle(SlidingWindowThrottle):
+    """
+    Requests per client IP.
+    """
+
+    def get_cache_key(self, request, view):
+        return self.ident_key(self.get_ident(request))
+
+
+class UsernameThrottle(SlidingWindowThrottle):
+    """
+    Requests per username sent in the request body.
+    """
+
+    def get_cache_key(self, request, view):
+        data = request.data
+        username = data.get("username") if hasattr(data, "get") else None
+        if not isinstance(username, str) or not username:
+            return None
+        return self.ident_key(username.lower())
+
+
+class AnonReadThrottle(IPThrottle):
+    scope = "anon_read"
+
+    def get_cache_key(self, request, view):
+        if (
+            request.method not in SAFE_METHODS
+            or request.user.is_authenticated
+        ):
+            return None
+        return super().get_cache_key(request, view)
+
+
+class SignupIPThrottle(IPThrottle):
+    scope = "signup_ip"
+
+
+class SignupUsernameThrottle(UsernameThrottle):
+    scope = "signup_username"
+
+
+class TokenIPThrottle(IPThrottle):
+    scope = "token_ip"
+
+
+class TokenUsernameThrottle(UsernameThrottle):
+    scope = "token_username"
@@ -1,7 +1,11 @@
+from api.async_views import async_view
 from api.views import (CategoriesViewSet, CommentViewSet, GenresViewSet,
                        ReviewViewSet, TitleViewSet, UserViewSet,
-                       get_auth_token, signup_new_user)
-from django.urls import include, path
+                       connection_stats, create_review_batch, export_reviews,
+                       export_titles, get_auth_token, search_catalog,
+                       signup_new_user)
+from django.conf import settings
+from django.urls import URLPattern, include, path
 from rest_framework import routers
 
 router_v1 = routers.DefaultRouter()
@@ -18,9 +22,39 @@ router_v1.register(
     basename="comments",
 )
 
+# Hot read endpoints served by async views in ASGI mode, see async_views.
+ASYNC_ROUTES = (
+    "titles-list", "titles-detail", "reviews-list", "comments-list",
+)
+
+
+def async_routes(patterns):
+    return [
+        URLPattern(
+            pattern.pattern,
+            async_view(pattern.callback),
+            pattern.default_args,
+            pattern.name,
+        )
+        if isinstance(pattern, URLPattern) and pattern.name in ASYNC_ROUTES
+        else pattern
+        for pattern in patterns
+    ]
+
+
+v1_routes = router_v1.urls
+if settings.ASYNC_READ_VIEWS:
+    v1_routes = async_routes(v1_routes)
 
 urlpatterns = [
     path("v1/auth/signup/", signup_new_user, name="signup"),
     path("v1/auth/token/", get_auth_token, name="get_token"),
-    path("v1/", include(router_v1.urls)),
+    path("v1/search/", search_catalog, name="search"),
+    path("v1/export/titles/", export_titles, name="export_titles"),
+    path("v1/export/reviews/", export_reviews, name="export_reviews"),
+    path("v1/reviews/batch/", create_review_batch, name="review_batch"),
+    path(
+        "v1/stats/connections/", connection_stats, name="connection_stats"
+    ),
+    path("v1/", include(v1_routes)),
 ]
@@ -1,43 +1,108 @@
 from api.serializers import (CategoriesSerializer, CommentSerializer,
-                             GenresSerializer, GetTokenSerializer,
-                             MeSerializer, ReviewSerializer, SignupSerializer,
+                             ExportQuerySerializer, GenresSerializer,
+                             GetTokenSerializer, LeaderboardQuerySerializer,
+                             MeSerializer, ReviewBatchSerializer,
+                             ReviewSerializer, SearchQuerySerializer,
+                             SearchResultSerializer, SignupSerializer,
+                             TitleBatchSerializer, TitleRankSerializer,
                              TitlesCreateSerializer, TitlesSerializer,
                              UserSerializer)
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import EmailMessage
-from django.db.models import Avg
+from django.db import IntegrityError, connection
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import filters, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Categories, Genres, Review, Title
-
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from reviews import leaderboard, search
+from reviews.models import (Categories, Comment, Genres, Review, Title,
+                            TitleRank)
+from users.models import OutboxMessage
+
+from .authentication import RoleRefreshToken, get_full_user
+from . import connections, export
+from .cache import CATEGORIES, GENRES, TITLES, CachedResponseMixin
 from .filters import TitlesFilter
-from .mixins import CreateListDestroyMixinSet
+from .mixins import (ConditionalGetMixin, CreateListDestroyMixinSet,
+                     NestedListMixin)
+from .pagination import (LimitOffsetOrKeysetPagination, TopTitlesPagination,
+                         TrendingTitlesPagination)
 from .permissions import (IsAdministrator, IsAdminModeratorOwnerOrReadOnly,
                           IsAdminOrReadOnly)
+from .throttling import (SignupIPThrottle, SignupUsernameThrottle,
+                         TokenIPThrottle, TokenUsernameThrottle)
 
 User = get_user_model()
 
 
+def violates_constraint(error, model, name):
+    """
+    Whether an IntegrityError comes from the named unique constraint
+    of the model: PostgreSQL reports the constraint name, SQLite the
+    columns of the constraint.
+    """
+    diag = getattr(error.__cause__, "diag", None)
+    if diag is not None:
+        return diag.constraint_name == name
+    constraint = next(
+        constraint for constraint in model._meta.constraints
+        if constraint.name == name
+    )
+    table = model._meta.db_table
+    columns = ", ".join(
+        f"{table}.{model._meta.get_field(field).column}"
+        for field in constraint.fields
+    )
+    return str(error) == f"UNIQUE constraint failed: {columns}"
+
+
+def title_validators(title_id):
+    """
+    Conditional GET validators of a title and its reviews:
+    the title modification time, bumped by every review write.
+    """
+    try:
+        modified = Title.objects.filter(pk=title_id).values_list(
+            "modified", flat=True
+        ).first()
+    except (TypeError, ValueError):
+        return None
+    if modified is None:
+        return None
+    return (modified.isoformat(),), modified
+
+
+def append_only_validators(queryset):
+    """
+    Conditional GET validators of rows that are only created and deleted:
+    any change moves the row count or the last id.
+    """
+    stats = queryset.aggregate(count=Count("id"), last_id=Max("id"))
+    return (stats["count"], stats["last_id"]), None
+
+
 def send_conf_code(user) -> None:
     """
-    Send confirmation code to user.
+    Queue confirmation code e-mail to user.
+    The send_outbox command delivers it outside the request.
     """
     confirmation_code = default_token_generator.make_token(user)
-    email_with_conf_code = EmailMessage(
+    OutboxMessage.objects.create(
         subject="YaMDB: Confirm your email",
         body="To get token, POST your "
         "username and confirmation code "
         "on the 'auth/token' page.\n"
         f"Your confirmation code is: {confirmation_code}",
-        to=[user.email],
+        recipient=user.email,
     )
-    email_with_conf_code.send()
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -61,14 +126,14 @@ class UserViewSet(viewsets.ModelViewSet):
         Function for /users/ME/ endpoint.
         """
 
-        instance = request.user
-
         if request.method == "GET":
-            serializer = self.get_serializer(instance=instance)
+            serializer = self.get_serializer(
+                instance=get_full_user(request)
+            )
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         serializer = MeSerializer(
-            instance=instance,
+            instance=get_full_user(request, fresh=True),
             data=request.data,
             partial=True
         )
@@ -79,6 +144,7 @@ class UserViewSet(viewsets.ModelViewSet):
 
 @api_view(http_method_names=["POST"])
 @permission_classes(permission_classes=[AllowAny])
+@throttle_classes([SignupIPThrottle, SignupUsernameThrottle])
 def signup_new_user(request):
     """
     api_view function for signing up.
@@ -99,6 +165,7 @@ def signup_new_user(request):
 
 @api_view(http_method_names=["POST"])
 @permission_classes(permission_classes=[AllowAny])
+@throttle_classes([TokenIPThrottle, TokenUsernameThrottle])
 def get_auth_token(request):
     """
     Create view for get token endpoint. Check user and give token.
@@ -114,7 +181,7 @@ def get_auth_token(request):
     confirmation_code = serializer.validated_data.get("confirmation_code")
 
     if default_token_generator.check_token(user, confirmation_code):
-        refresh = RefreshToken.for_user(user)
+        refresh = RoleRefreshToken.for_user(user)
         return Response(
             {"token": str(refresh.access_token)}, status=status.HTTP_200_OK
         )
@@ -125,7 +192,169 @@ def get_auth_token(request):
         )
 
 
-class CategoriesViewSet(CreateListDestroyMixinSet):
+@api_view(http_method_names=["GET"])
+@permission_classes(permission_classes=[AllowAny])
+def search_catalog(request):
+    """
+    Ranked full-text search over title names, descriptions and reviews.
+    """
+
+    query_serializer = SearchQuerySerializer(data=request.query_params)
+    query_serializer.is_valid(raise_exception=True)
+    query = query_serializer.validated_data["q"]
+    limit = query_serializer.validated_data["limit"]
+    offset = query_serializer.validated_data["offset"]
+
+    hits = search.search(query, limit + 1, offset)
+    has_next = len(hits) > limit
+    hits = hits[:limit]
+    titles = Title.objects.only("name").in_bulk(
+        {title_id for _, _, title_id, _ in hits}
+    )
+    reviews = Review.objects.select_related("author").in_bulk(
+        [object_id for kind, object_id, _, _ in hits if kind == search.REVIEW]
+    )
+    results = []
+    for kind, object_id, title_id, rank in hits:
+        review = reviews.get(object_id) if kind == search.REVIEW else None
+        if title_id not in titles or (kind == search.REVIEW and not review):
+            continue
+        results.append({
+            "type": kind,
+            "id": object_id,
+            "title_id": title_id,
+            "name": titles[title_id].name,
+            "text": review.text if review else None,
+            "author": review.author.username if review else None,
+            "rank": rank,
+        })
+
+    url = request.build_absolute_uri()
+    next_url = previous_url = None
+    if has_next:
+        next_url = replace_query_param(url, "offset", offset + limit)
+    if offset:
+        previous_url = (
+            replace_query_param(url, "offset", offset - limit)
+            if offset > limit else remove_query_param(url, "offset")
+        )
+    return Response({
+        "next": next_url,
+        "previous": previous_url,
+        "results": SearchResultSerializer(results, many=True).data,
+    })
+
+
+def export_params(request):
+    query_serializer = ExportQuerySerializer(data=request.query_params)
+    query_serializer.is_valid(raise_exception=True)
+    return query_serializer.validated_data
+
+
+def export_response(name, output, columns, rows):
+    """
+    Stream rows as an NDJSON or CSV attachment.
+    """
+    response = StreamingHttpResponse(
+        export.render(output, columns, rows),
+        content_type=export.CONTENT_TYPES[output],
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{name}.{output}"'
+    )
+    return response
+
+
+@api_view(http_method_names=["GET"])
+@permission_classes(permission_classes=[IsAuthenticated, IsAdministrator])
+def export_titles(request):
+    """
+    Stream all titles by id, optionally only those modified since
+    updated_since. Clients resume from the last received id with id_after.
+    """
+
+    params = export_params(request)
+    rows = export.title_rows(
+        since=params.get("updated_since"), id_after=params["id_after"]
+    )
+    return export_response(
+        "titles", params["output"], export.TITLE_COLUMNS, rows
+    )
+
+
+@api_view(http_method_names=["GET"])
+@permission_classes(permission_classes=[IsAuthenticated, IsAdministrator])
+def export_reviews(request):
+    """
+    Stream the reviews of the whole catalog or of one title by id.
+    Clients resume from the last received id with id_after.
+    """
+
+    params = export_params(request)
+    title_id = params.get("title")
+    if title_id and not Title.objects.filter(pk=title_id).exists():
+        raise NotFound
+    rows = export.review_rows(
+        title_id=title_id,
+        since=params.get("updated_since"),
+        id_after=params["id_after"],
+    )
+    return export_response(
+        "reviews", params["output"], export.REVIEW_COLUMNS, rows
+    )
+
+
+@api_view(http_method_names=["GET"])
+@permission_classes(permission_classes=[IsAuthenticated, IsAdministrator])
+def connection_stats(request):
+    """
+    Database connection counters of the worker process
+    that served the request.
+    """
+
+    database = connection.settings_dict
+    return Response(
+        {
+            "conn_max_age": database["CONN_MAX_AGE"],
+            "health_checks": bool(database.get("CONN_HEALTH_CHECKS")),
+            **connections.stats.snapshot(),
+        }
+    )
+
+
+@api_view(http_method_names=["POST"])
+@permission_classes(permission_classes=[IsAuthenticated])
+def create_review_batch(request):
+    """
+    Create reviews of the request user for several titles
+    in one transaction. Errors are returned as a list in the order
+    of the items.
+    """
+
+    serializer = ReviewBatchSerializer(
+        data=request.data, many=True, context={"request": request}
+    )
+    serializer.is_valid(raise_exception=True)
+    try:
+        reviews = serializer.save(author=get_full_user(request))
+    except IntegrityError as error:
+        if not violates_constraint(error, Review, "unique_review"):
+            raise
+        raise ValidationError(
+            {api_settings.NON_FIELD_ERRORS_KEY: ["Отзыв уже существует!"]}
+        )
+    created = Review.objects.filter(
+        pk__in=[review.pk for review in reviews]
+    ).select_related("author", "title").order_by("pk")
+    return Response(
+        ReviewSerializer(created, many=True).data,
+        status=status.HTTP_201_CREATED,
+    )
+
+
+class CategoriesViewSet(
+    CachedResponseMixin, ConditionalGetMixin, CreateListDestroyMixinSet
+):
     """
     Получение списка всех категорий - доступно для всех пользователей
 
@@ -139,9 +368,17 @@ class CategoriesViewSet(CreateListDestroyMixinSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
     lookup_field = "slug"
+    cache_namespace = CATEGORIES
+
+    def get_list_validators(self):
+        return append_only_validators(
+            self.filter_queryset(self.get_queryset())
+        )
 
 
-class GenresViewSet(CreateListDestroyMixinSet):
+class GenresViewSet(
+    CachedResponseMixin, ConditionalGetMixin, CreateListDestroyMixinSet
+):
     """
     Получение списка всех жанров - доступно для всех пользователей
 
@@ -155,9 +392,17 @@ class GenresViewSet(CreateListDestroyMixinSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
     lookup_field = "slug"
+    cache_namespace = GENRES
 
+    def get_list_validators(self):
+        return append_only_validators(
+            self.filter_queryset(self.get_queryset())
+        )
 
-class TitleViewSet(viewsets.ModelViewSet):
+
+class TitleViewSet(
+    CachedResponseMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """
     Получение списка произведений или отдельного произведения по id -
         доступно для всех пользователей
@@ -166,47 +411,160 @@ class TitleViewSet(viewsets.ModelViewSet):
         доступно только Администратору.
     """
 
-    queryset = Title.objects.annotate(rating=Avg("reviews__score")).all()
+    queryset = Title.objects.select_related("category").prefetch_related(
+        "genre"
+    )
     serializer_class = TitlesSerializer
     pagination_class = LimitOffsetPagination
     permission_classes = (IsAdminOrReadOnly,)
     filterset_class = TitlesFilter
+    cache_namespace = TITLES
+    cache_anonymous_only = True
 
     def get_serializer_class(self):
         if self.request.method in ('POST', 'PATCH',):
             return TitlesCreateSerializer
         return TitlesSerializer
 
+    def get_list_validators(self):
+        """
+        ETag only: a deleted title, or one filtered out after a change,
+        leaves the latest modification time of the list unchanged.
+        """
+        stats = self.filter_queryset(self.get_queryset()).aggregate(
+            count=Count("id"), modified=Max("modified")
+        )
+        return (stats["count"], stats["modified"]), None
+
+    def get_object_validators(self):
+        return title_validators(self.kwargs.get(self.lookup_field))
+
+    def leaderboard_scope(self, request):
+        """Scope named by the query params, None for an unknown slug."""
+        params = LeaderboardQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        if "category" in params.validated_data:
+            category_id = Categories.objects.filter(
+                slug=params.validated_data["category"]
+            ).values_list("pk", flat=True).first()
+            return category_id and leaderboard.category_scope(category_id)
+        if "genre" in params.validated_data:
+            genre_id = Genres.objects.filter(
+                slug=params.validated_data["genre"]
+            ).values_list("pk", flat=True).first()
+            return genre_id and leaderboard.genre_scope(genre_id)
+        return leaderboard.ALL
+
+    def leaderboard(self, request, **filters):
+        scope = self.leaderboard_scope(request)
+        queryset = TitleRank.objects.none()
+        if scope is not None:
+            queryset = TitleRank.objects.filter(
+                scope=scope, **filters
+            ).select_related("title__category").prefetch_related(
+                "title__genre"
+            )
+        page = self.paginate_queryset(queryset)
+        serializer = TitleRankSerializer(
+            page, many=True, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, pagination_class=TopTitlesPagination)
+    def top(self, request):
+        """
+        Reviewed titles by Bayesian-weighted rating, overall
+        or in one category or genre.
+        """
+        return self.cached_response(
+            request,
+            lambda: self.leaderboard(request, rating__isnull=False),
+        )
+
+    @action(detail=False, pagination_class=TrendingTitlesPagination)
+    def trending(self, request):
+        """
+        Titles by reviews per day over the trending window, overall
+        or in one category or genre.
+        """
+        return self.cached_response(
+            request, lambda: self.leaderboard(request, velocity__gt=0)
+        )
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(methods=["post"], detail=False)
+    def batch(self, request):
+        """
+        Create a list of titles in one transaction.
+        Errors are returned as a list in the order of the items.
+        """
+        serializer = TitleBatchSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        titles = serializer.save()
+        created = self.get_queryset().filter(
+            pk__in=[title.pk for title in titles]
+        ).order_by("pk")
+        return Response(
+            TitlesCreateSerializer(created, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class ReviewViewSet(
+    NestedListMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """Viewset for reviews."""
 
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminModeratorOwnerOrReadOnly,)
-    pagination_class = LimitOffsetPagination
+    parent_model = Title
+    parent_lookups = {"pk": "title_id"}
+    pagination_class = LimitOffsetOrKeysetPagination
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        return title.reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get("title_id")
+        ).select_related("author", "title")
 
-    def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        serializer.save(author=self.request.user, title=title)
+    def get_list_validators(self):
+        return title_validators(self.kwargs.get("title_id"))
 
-
-class CommentViewSet(viewsets.ModelViewSet):
+    def perform_create(self, serializer):
+        """
+        Insert straight away and let the unique_review constraint
+        reject a second review, concurrent double posts included.
+        """
+        try:
+            serializer.save(
+                author=get_full_user(self.request),
+                title_id=self.kwargs.get("title_id"),
+            )
+        except Title.DoesNotExist:
+            raise NotFound
+        except IntegrityError as error:
+            if not violates_constraint(error, Review, "unique_review"):
+                raise
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ["Отзыв уже существует!"]}
+            )
+
+
+class CommentViewSet(NestedListMixin, viewsets.ModelViewSet):
     """Viewset for comments."""
 
     serializer_class = CommentSerializer
     permission_classes = (IsAdminModeratorOwnerOrReadOnly,)
-    pagination_class = LimitOffsetPagination
+    parent_model = Review
+    parent_lookups = {"pk": "review_id", "title_id": "title_id"}
+    pagination_class = LimitOffsetOrKeysetPagination
 
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
-        return review.comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get("review_id"),
+            review__title_id=self.kwargs.get("title_id"),
+        ).select_related("author")
 
     def perform_create(self, serializer):
         title_id = self.kwargs.get("title_id")
         review_id = self.kwargs.get("review_id")
         review = get_object_or_404(Review, id=review_id, title=title_id)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=get_full_user(self.request), review=review)
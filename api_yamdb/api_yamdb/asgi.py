@@ -9,8 +9,13 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+os.environ.setdefault('ASYNC_READ_VIEWS', 'True')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+from api.async_views import ASGIHandler  # noqa: E402
+
+application = ASGIHandler()
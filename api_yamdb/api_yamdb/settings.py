@@ -40,6 +40,64 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Opt-in request timings: Server-Timing headers and JSON log lines,
+# see api/instrumentation.py. Thresholds are in milliseconds.
+INSTRUMENTATION = os.getenv(
+    "INSTRUMENTATION", default="False"
+).lower() in ("true", "1")
+INSTRUMENTATION_SLOW_REQUEST_MS = float(
+    os.getenv("INSTRUMENTATION_SLOW_REQUEST_MS", default=500)
+)
+INSTRUMENTATION_SLOW_QUERY_MS = float(
+    os.getenv("INSTRUMENTATION_SLOW_QUERY_MS", default=100)
+)
+if INSTRUMENTATION:
+    MIDDLEWARE.insert(0, "api.instrumentation.InstrumentationMiddleware")
+
+# Opt-in Prometheus metrics at /metrics, see api/metrics.py. Only
+# direct requests from these networks may read them.
+METRICS = os.getenv("METRICS", default="False").lower() in ("true", "1")
+METRICS_ALLOWED_NETWORKS = os.getenv(
+    "METRICS_ALLOWED_NETWORKS",
+    default="127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16",
+).split(",")
+if METRICS:
+    MIDDLEWARE.insert(0, "api.metrics.MetricsMiddleware")
+
+# Opt-in profiling of admin requests sent with X-Profile: 1 (cProfile)
+# or X-Profile: memory (and tracemalloc), see api/profiling.py.
+PROFILING = os.getenv("PROFILING", default="False").lower() in ("true", "1")
+PROFILING_DIR = os.getenv(
+    "PROFILING_DIR", default=os.path.join(BASE_DIR, "profiles")
+)
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", default=1))
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", default=50))
+PROFILING_TRACEMALLOC_FRAMES = int(
+    os.getenv("PROFILING_TRACEMALLOC_FRAMES", default=1)
+)
+if PROFILING:
+    MIDDLEWARE.append("api.profiling.ProfilingMiddleware")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "message": {"format": "%(message)s"},
+    },
+    "handlers": {
+        "instrumentation": {
+            "class": "logging.StreamHandler",
+            "formatter": "message",
+        },
+    },
+    "loggers": {
+        "api.instrumentation": {
+            "handlers": ["instrumentation"],
+            "level": "INFO",
+        },
+    },
+}
+
 ROOT_URLCONF = "api_yamdb.urls"
 
 TEMPLATES_DIR = BASE_DIR / "templates"
@@ -71,7 +129,16 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        # Seconds a connection is kept open and reused by the requests
+        # of its thread; 0 closes it after every request, paying the
+        # TCP and auth handshake per request, as Django's default does.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        # Ping a kept connection on its first use in a request,
+        # see api/connections.py.
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'DB_CONN_HEALTH_CHECKS', default='True'
+        ).lower() in ('true', '1'),
     }
 }
 
@@ -116,17 +183,109 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Cache
+# The catalog cache keeps rendered categories, genres and titles responses.
+# LocMemCache evicts least recently used entries and suits a single worker;
+# several workers need a shared backend (FileBasedCache or a Redis one)
+# so that invalidation on writes reaches all of them.
+CATALOG_CACHE_ALIAS = "catalog"
+# Throttle counters; share them between workers the same way.
+THROTTLE_CACHE_ALIAS = "throttle"
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    CATALOG_CACHE_ALIAS: {
+        "BACKEND": os.getenv(
+            "CATALOG_CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CATALOG_CACHE_LOCATION", default="catalog"),
+        "TIMEOUT": int(os.getenv("CATALOG_CACHE_TIMEOUT", default=300)),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(
+                os.getenv("CATALOG_CACHE_MAX_ENTRIES", default=1000)
+            ),
+        },
+    },
+    THROTTLE_CACHE_ALIAS: {
+        "BACKEND": os.getenv(
+            "THROTTLE_CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("THROTTLE_CACHE_LOCATION", default="throttle"),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(
+                os.getenv("THROTTLE_CACHE_MAX_ENTRIES", default=10000)
+            ),
+        },
+    },
+}
+
+# ASGI mode: api_yamdb/asgi.py switches the hot read endpoints
+# to async views running on a pool of ASYNC_VIEW_THREADS threads.
+ASYNC_READ_VIEWS = os.getenv(
+    "ASYNC_READ_VIEWS", default="False"
+).lower() in ("true", "1")
+ASYNC_VIEW_THREADS = int(os.getenv("ASYNC_VIEW_THREADS", default=16))
+
+# Title leaderboards, see reviews/leaderboard.py. Ratings are pulled
+# towards LEADERBOARD_PRIOR_MEAN as if every title had
+# LEADERBOARD_PRIOR_REVIEWS more reviews with that score; trending counts
+# the reviews of the last LEADERBOARD_TRENDING_DAYS days.
+LEADERBOARD_PRIOR_MEAN = float(
+    os.getenv("LEADERBOARD_PRIOR_MEAN", default=5.5)
+)
+LEADERBOARD_PRIOR_REVIEWS = int(
+    os.getenv("LEADERBOARD_PRIOR_REVIEWS", default=10)
+)
+LEADERBOARD_TRENDING_DAYS = int(
+    os.getenv("LEADERBOARD_TRENDING_DAYS", default=7)
+)
+
 # Auth & permissions & pagination
+# Stateless mode trusts the role claims of tokens younger than
+# JWT_ROLE_CLAIMS_MAX_AGE seconds instead of loading the user on every
+# request, so role changes and deactivation apply with that delay.
+JWT_STATELESS_AUTH = os.getenv(
+    "JWT_STATELESS_AUTH", default="False"
+).lower() in ("true", "1")
+JWT_ROLE_CLAIMS_MAX_AGE = int(
+    os.getenv("JWT_ROLE_CLAIMS_MAX_AGE", default=300)
+)
+JWT_USER_CACHE_SIZE = int(os.getenv("JWT_USER_CACHE_SIZE", default=1024))
+
 REST_FRAMEWORK = {
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.StatelessJWTAuthentication"
+        if JWT_STATELESS_AUTH
+        else "rest_framework_simplejwt.authentication.JWTAuthentication",
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     "PAGE_SIZE": 10,
+    "DEFAULT_THROTTLE_CLASSES": ["api.throttling.AnonReadThrottle"],
+    # Proxies in front of the app: 1 behind the nginx of docker-compose,
+    # so the client IP is the address nginx appended to X-Forwarded-For;
+    # 0 when clients connect directly. Never None: DRF would then use the
+    # whole client-controlled header as the IP.
+    "NUM_PROXIES": int(os.getenv("THROTTLE_NUM_PROXIES", default=1)),
+    # "<number>/<s|m|h|d>", an empty value turns a throttle off.
+    "DEFAULT_THROTTLE_RATES": {
+        "anon_read": os.getenv("THROTTLE_ANON_READ_RATE", default="120/m"),
+        "signup_ip": os.getenv("THROTTLE_SIGNUP_IP_RATE", default="20/h"),
+        "signup_username": os.getenv(
+            "THROTTLE_SIGNUP_USERNAME_RATE", default="5/h"
+        ),
+        "token_ip": os.getenv("THROTTLE_TOKEN_IP_RATE", default="30/m"),
+        "token_username": os.getenv(
+            "THROTTLE_TOKEN_USERNAME_RATE", default="10/m"
+        ),
+    },
 }
 
 SIMPLE_JWT = {
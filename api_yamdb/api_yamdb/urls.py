@@ -14,6 +14,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from api.metrics import metrics_view
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
@@ -24,4 +25,5 @@ urlpatterns = [
     path("redoc/",
          TemplateView.as_view(template_name="redoc.html"),
          name="redoc"),
+    path("metrics", metrics_view, name="metrics"),
 ]
@@ -0,0 +1,51 @@
+"""
+Gunicorn settings, picked up from the working directory.
+
+SERVER_MODE=wsgi (default) runs sync workers: each handles one request
+at a time. SERVER_MODE=asgi runs uvicorn workers on api_yamdb.asgi,
+where the hot read endpoints are async views served by
+ASYNC_VIEW_THREADS threads per worker. Worker count comes from
+WEB_CONCURRENCY as usual.
+
+With METRICS=True the workers keep their Prometheus values in
+PROMETHEUS_MULTIPROC_DIR, emptied on start, so that /metrics adds up
+all of them.
+"""
+import os
+import shutil
+
+bind = os.getenv("GUNICORN_BIND", "0:8000")
+
+if os.getenv("SERVER_MODE", "wsgi").lower() == "asgi":
+    wsgi_app = "api_yamdb.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "api_yamdb.wsgi:application"
+
+metrics = os.getenv("METRICS", "False").lower() in ("true", "1")
+if metrics:
+    # Set before the workers import prometheus_client.
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/yamdb-metrics")
+
+
+def on_starting(server):
+    """Drop the metric files left by the previous run."""
+    if metrics:
+        directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+
+def worker_exit(server, worker):
+    """Log the database connection counters of the exiting worker."""
+    from api.connections import stats
+
+    server.log.info("Worker database connections: %s", stats.snapshot())
+
+
+def child_exit(server, worker):
+    """Stop reporting the live gauges of the exited worker."""
+    if metrics:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,219 @@
+"""
+Bulk row loading that bypasses model save() and signals.
+
+Rows are sequences of raw values read from CSV or NDJSON, in the order
+of the given fields. Every batch is converted with the model fields and
+written with COPY on PostgreSQL when the target table is known to be
+empty, otherwise with one multi-row INSERT on PostgreSQL and executemany
+on SQLite, which runs in process. bulk_create can't be used here:
+it overwrites auto_now_add dates such as pub_date with the current time.
+
+Callers must refresh what signals would have kept in sync: title
+ratings (rebuild_ratings), the leaderboards (reviews.leaderboard.rebuild),
+the SQLite search index (reviews.search.rebuild_index) and cached API
+responses.
+"""
+from io import StringIO
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import (DEFAULT_DB_ALIAS, connection, connections,
+                       transaction)
+from django.utils import timezone
+
+COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+
+def batches(rows, size):
+    """Split an iterable into lists of at most size items."""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def resolve_fields(model, names):
+    """Map column headers to concrete fields; 'author' and 'author_id'
+    both resolve to the author foreign key."""
+    fields = []
+    for name in names:
+        field = model._meta.get_field(name)
+        if not field.concrete or field.many_to_many:
+            raise ValueError(
+                f'{model._meta.label} has no column for "{name}".'
+            )
+        fields.append(field)
+    return fields
+
+
+def missing_value(field):
+    """Value of a column the input doesn't provide."""
+    if getattr(field, 'auto_now', False) or getattr(
+        field, 'auto_now_add', False
+    ):
+        return timezone.now()
+    if field.has_default():
+        return field.get_default()
+    if field.null:
+        return None
+    return ''
+
+
+def convert(field, raw, blank_as_null=True):
+    if raw is None or (blank_as_null and raw == '' and field.null):
+        return None
+    return field.to_python(raw)
+
+
+class BulkWriter:
+    """
+    Insert rows of one model in batches.
+
+    fields are the input columns in row order; the other concrete
+    columns get their default, or the current time for auto_now dates.
+    With ignore_conflicts rows clashing with existing keys are skipped,
+    which makes repeated loads idempotent; otherwise PostgreSQL uses COPY.
+    blank_as_null reads empty strings of nullable columns as NULL,
+    as CSV can't tell them apart.
+    """
+
+    def __init__(self, model, fields, ignore_conflicts=False,
+                 blank_as_null=True):
+        self.model = model
+        self.fields = fields
+        self.ignore_conflicts = ignore_conflicts
+        self.blank_as_null = blank_as_null
+        given = {field.attname for field in fields}
+        self.filled = [
+            field for field in model._meta.local_concrete_fields
+            if field.attname not in given
+        ]
+        self.columns = [field.column for field in fields + self.filled]
+        self.use_copy = (
+            connection.vendor == 'postgresql' and not ignore_conflicts
+        )
+
+    def prepare(self, rows):
+        # The thread's connection is looked up once per batch rather
+        # than through the connection proxy for every value.
+        wrapper = connections[DEFAULT_DB_ALIAS]
+        filled = [missing_value(field) for field in self.filled]
+        fields = self.fields + self.filled
+        prepared = []
+        for row in rows:
+            values = [
+                convert(field, raw, self.blank_as_null)
+                for field, raw in zip(self.fields, row)
+            ] + filled
+            prepared.append([
+                field.get_db_prep_save(value, wrapper)
+                for field, value in zip(fields, values)
+            ])
+        return prepared
+
+    def write(self, rows):
+        """Insert a batch of rows given as sequences of raw values."""
+        prepared = self.prepare(rows)
+        if not prepared:
+            return 0
+        with connection.cursor() as cursor:
+            if self.use_copy:
+                self.copy(cursor, prepared)
+            else:
+                self.insert(cursor, prepared)
+        return len(prepared)
+
+    def insert(self, cursor, prepared):
+        ops = connection.ops
+        qn = ops.quote_name
+        postgresql = connection.vendor == 'postgresql'
+        sql = '{} {} ({}) VALUES {} {}'.format(
+            ops.insert_statement(ignore_conflicts=self.ignore_conflicts),
+            qn(self.model._meta.db_table),
+            ', '.join(qn(column) for column in self.columns),
+            '%s' if postgresql else '({})'.format(
+                ', '.join(['%s'] * len(self.columns))
+            ),
+            ops.ignore_conflicts_suffix_sql(
+                ignore_conflicts=self.ignore_conflicts
+            ),
+        ).rstrip()
+        if postgresql:
+            # psycopg2 sends executemany as one statement per row.
+            from psycopg2.extras import execute_values
+            execute_values(
+                cursor.cursor, sql, prepared, page_size=len(prepared)
+            )
+        else:
+            cursor.executemany(sql, prepared)
+
+    def copy(self, cursor, prepared):
+        qn = connection.ops.quote_name
+        buffer = StringIO()
+        for values in prepared:
+            buffer.write('\t'.join(map(copy_text, values)))
+            buffer.write('\n')
+        buffer.seek(0)
+        cursor.copy_expert(
+            'COPY {} ({}) FROM STDIN'.format(
+                qn(self.model._meta.db_table),
+                ', '.join(qn(column) for column in self.columns),
+            ),
+            buffer,
+        )
+
+
+def copy_text(value):
+    """Format a value for the text format of PostgreSQL COPY."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return str(value).translate(COPY_ESCAPES)
+
+
+def load(writer, rows, batch_size, progress=None):
+    """
+    Write rows in batches in one transaction and validate their foreign
+    keys before commit. progress is called with the running row count.
+    """
+    loaded = 0
+    with transaction.atomic():
+        for batch in batches(rows, batch_size):
+            loaded += writer.write(batch)
+            if progress is not None:
+                progress(loaded)
+        check_foreign_keys([writer.model])
+    return loaded
+
+
+def truncate(models):
+    """Empty the tables of models and the tables referencing them."""
+    tables = [model._meta.db_table for model in models]
+    connection.ops.execute_sql_flush(connection.ops.sql_flush(
+        no_style(), tables, allow_cascade=True
+    ))
+
+
+def check_foreign_keys(models):
+    """Raise IntegrityError naming the first row whose deferred
+    foreign key points nowhere."""
+    connection.check_constraints(
+        table_names=[model._meta.db_table for model in models]
+    )
+
+
+def reset_sequences(models):
+    """Move primary key sequences past the explicitly inserted ids."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,97 @@
+"""
+File layout of dump_dataset and restore_dataset.
+
+Every table goes to its own <db_table>.<format>[.gz] file. NDJSON files
+hold one object per row keyed by column attname; CSV files start with
+a header row of attnames and store NULL as an empty string.
+"""
+import csv
+import gzip
+import json
+import os
+from datetime import date, datetime, time
+from itertools import chain
+
+from django.contrib.auth import get_user_model
+
+from .models import Categories, Comment, Genres, GenreTitle, Review, Title
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+FORMATS = (NDJSON, CSV)
+COMPRESSED_SUFFIX = '.gz'
+
+
+def dataset_models():
+    """Dumped models, parents before children."""
+    return (
+        get_user_model(), Categories, Genres, Title, GenreTitle, Review,
+        Comment,
+    )
+
+
+def file_name(model, fmt, compress=True):
+    name = f'{model._meta.db_table}.{fmt}'
+    return name + COMPRESSED_SUFFIX if compress else name
+
+
+def find_file(directory, model):
+    """Return (path, format) of the model's file in directory or None."""
+    for fmt in FORMATS:
+        for compress in (True, False):
+            path = os.path.join(directory, file_name(model, fmt, compress))
+            if os.path.exists(path):
+                return path, fmt
+    return None
+
+
+def open_file(path, mode):
+    if path.endswith(COMPRESSED_SUFFIX):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def to_text(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def write_rows(file, fmt, columns, rows):
+    """Write row tuples one by one; return how many were written."""
+    written = 0
+    if fmt == CSV:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(
+                '' if value is None else to_text(value) for value in row
+            )
+            written += 1
+        return written
+    for row in rows:
+        file.write(json.dumps(
+            dict(zip(columns, map(to_text, row))), ensure_ascii=False
+        ))
+        file.write('\n')
+        written += 1
+    return written
+
+
+def read_rows(file, fmt):
+    """Return the column names and a lazy iterator over row lists."""
+    if fmt == CSV:
+        reader = csv.reader(file)
+        return next(reader, []), reader
+    lines = (line for line in file if line.strip())
+    first = next(lines, None)
+    if first is None:
+        return [], iter(())
+    columns = list(json.loads(first))
+    rows = (
+        [values[column] for column in columns]
+        for values in map(json.loads, chain((first,), lines))
+    )
+    return columns, rows
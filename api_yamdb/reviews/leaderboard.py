@@ -0,0 +1,85 @@
+"""
+Precomputed title leaderboards.
+
+Every title has a TitleRank row in the ALL scope, in the scope of its
+category and in the scope of each of its genres, holding
+    rating - the Bayesian-weighted average score
+        (PRIOR_REVIEWS * PRIOR_MEAN + score_sum)
+        / (PRIOR_REVIEWS + score_count),
+        which pulls titles with few reviews towards the prior mean;
+        None while the title has no reviews,
+    velocity - reviews per day over the last LEADERBOARD_TRENDING_DAYS.
+A leaderboard page is an index range scan of one scope.
+
+Every change of the stored title score totals rescores the rows of the
+title with one UPDATE, see TitleRankQuerySet.rescore(); title, genre and
+category signals move titles between scopes. Reviews leave the trending
+window with time only, so refresh_leaderboards rescores the trending
+titles periodically.
+"""
+from django.db import transaction
+
+from .models import GenreTitle, Title, TitleRank
+
+ALL = 'all'
+
+
+def category_scope(category_id):
+    return f'category:{category_id}'
+
+
+def genre_scope(genre_id):
+    return f'genre:{genre_id}'
+
+
+def place_titles(title_ids):
+    """Recreate the rows of the titles in the scopes they are in now."""
+    title_ids = list(title_ids)
+    ranks = []
+    for title_id, category_id in Title.objects.filter(
+        pk__in=title_ids
+    ).values_list('pk', 'category_id'):
+        ranks.append(TitleRank(scope=ALL, title_id=title_id))
+        if category_id is not None:
+            ranks.append(TitleRank(
+                scope=category_scope(category_id), title_id=title_id
+            ))
+    ranks.extend(
+        TitleRank(scope=genre_scope(genre_id), title_id=title_id)
+        for title_id, genre_id in GenreTitle.objects.filter(
+            title_id__in=title_ids
+        ).values_list('title_id', 'genre_id')
+    )
+    with transaction.atomic():
+        TitleRank.objects.filter(title_id__in=title_ids).delete()
+        TitleRank.objects.bulk_create(ranks, ignore_conflicts=True)
+        TitleRank.objects.filter(title_id__in=title_ids).rescore()
+
+
+def drop_scope(scope):
+    """Forget the leaderboard of a deleted category or genre."""
+    TitleRank.objects.filter(scope=scope).delete()
+
+
+def trending_title_ids():
+    """Titles whose velocity can still drop as the window moves."""
+    return TitleRank.objects.filter(
+        scope=ALL, velocity__gt=0
+    ).values_list('title_id', flat=True)
+
+
+def rebuild(chunk_size=1000):
+    """Place every title again, chunk by chunk. Returns their number."""
+    last_id = 0
+    placed = 0
+    while True:
+        title_ids = list(
+            Title.objects.filter(pk__gt=last_id)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not title_ids:
+            return placed
+        place_titles(title_ids)
+        last_id = title_ids[-1]
+        placed += len(title_ids)
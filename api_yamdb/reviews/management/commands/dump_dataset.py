@@ -0,0 +1,76 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from reviews.dataset import (FORMATS, NDJSON, dataset_models, file_name,
+                             open_file, write_rows)
+
+
+class Command(BaseCommand):
+    """
+    To run the command - python3 manage.py dump_dataset --output-dir dump
+    To load the dump - python3 manage.py restore_dataset --input-dir dump
+
+    Tables are read through server-side cursors in one read-only
+    transaction, so memory use stays flat and the files are consistent
+    with each other.
+    """
+    help = 'command to export users and catalog data to files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            default='dataset',
+            help='Directory the files are written to.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            default=NDJSON,
+            help='File format.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Number of rows fetched from the database at a time.',
+        )
+        parser.add_argument(
+            '--no-compress',
+            action='store_true',
+            help='Write plain files instead of gzip-compressed ones.',
+        )
+
+    def dump_model(self, model, path, fmt, chunk_size):
+        columns = [
+            field.attname for field in model._meta.local_concrete_fields
+        ]
+        rows = (
+            model._base_manager.order_by('pk')
+            .values_list(*columns)
+            .iterator(chunk_size=chunk_size)
+        )
+        with open_file(path, 'w') as file:
+            written = write_rows(file, fmt, columns, rows)
+        self.stdout.write(f'{model._meta.label}: dumped {written} rows')
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        fmt = options['format']
+        os.makedirs(output_dir, exist_ok=True)
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, '
+                        'READ ONLY'
+                    )
+            for model in dataset_models():
+                path = os.path.join(
+                    output_dir,
+                    file_name(model, fmt, not options['no_compress']),
+                )
+                self.dump_model(model, path, fmt, options['chunk_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Dataset dumped to {output_dir}')
+        )
@@ -0,0 +1,158 @@
+import time
+
+from api.cache import CATEGORIES, GENRES, TITLES, invalidate
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from reviews import leaderboard, search
+from reviews.bulk import (BulkWriter, batches, check_foreign_keys, load,
+                          reset_sequences, resolve_fields, truncate)
+from reviews.models import (Categories, Comment, Genres, GenreTitle, Review,
+                            Title)
+from reviews.synthetic import (CATEGORY_FIELDS, COMMENT_FIELDS, GENRE_FIELDS,
+                               GENRE_TITLE_FIELDS, REVIEW_FIELDS,
+                               TITLE_FIELDS, USER_FIELDS, CatalogGenerator)
+
+User = get_user_model()
+
+# Generator tables with their models, parents before children.
+TABLES = (
+    ('users', User, USER_FIELDS),
+    ('categories', Categories, CATEGORY_FIELDS),
+    ('genres', Genres, GENRE_FIELDS),
+    ('titles', Title, TITLE_FIELDS),
+    ('genre_titles', GenreTitle, GENRE_TITLE_FIELDS),
+    ('reviews', Review, REVIEW_FIELDS),
+    ('comments', Comment, COMMENT_FIELDS),
+)
+
+
+class Command(BaseCommand):
+    """
+    To generate a catalog -
+        python3 manage.py generate_dataset --users 100000 --titles 100000 \\
+            --reviews 10000000
+    To replace all data with it - add --truncate
+
+    Review counts per title are Zipf distributed, review counts per user
+    follow a power law and comment thread lengths have a heavy tail, see
+    reviews.synthetic. The same --seed and sizes give the same rows.
+    Rows are streamed in batches with reviews.bulk (COPY on PostgreSQL)
+    and added after the existing ids unless --truncate is given.
+    """
+    help = 'command to generate a synthetic catalog with realistic skew'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=100000)
+        parser.add_argument(
+            '--comments-per-review',
+            type=float,
+            default=0.5,
+            help='Mean comment thread length.',
+        )
+        parser.add_argument(
+            '--title-skew',
+            type=float,
+            default=1.0,
+            help='Zipf exponent of review counts per title.',
+        )
+        parser.add_argument(
+            '--user-skew',
+            type=float,
+            default=1.0,
+            help='Zipf exponent of review counts per user.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Number of rows inserted per statement.',
+        )
+        parser.add_argument(
+            '--truncate',
+            action='store_true',
+            help='Empty the catalog and user tables before generating.',
+        )
+
+    def progress(self, label):
+        if not self.verbosity:
+            return None
+        return lambda loaded: self.stdout.write(f'{label}: {loaded} rows')
+
+    def writer(self, model, fields):
+        return BulkWriter(
+            model, resolve_fields(model, fields), blank_as_null=False
+        )
+
+    def write_table(self, rows, model, fields, batch_size):
+        label = model._meta.label
+        loaded = load(
+            self.writer(model, fields), rows, batch_size,
+            self.progress(label),
+        )
+        self.stdout.write(f'{label}: generated {loaded} rows')
+
+    def write_reviews(self, generator, batch_size):
+        """
+        Reviews and the comments of every batch of reviews,
+        in one transaction.
+        """
+        reviews = self.writer(Review, REVIEW_FIELDS)
+        comments = self.writer(Comment, COMMENT_FIELDS)
+        review_count = comment_count = 0
+        with transaction.atomic():
+            for batch in batches(generator.reviews(), batch_size):
+                review_count += reviews.write(batch)
+                for thread in batches(generator.comments(batch), batch_size):
+                    comment_count += comments.write(thread)
+                if self.verbosity:
+                    self.stdout.write(
+                        f'{review_count} reviews, {comment_count} comments'
+                    )
+            check_foreign_keys([Review, Comment])
+        self.stdout.write(
+            f'Generated {review_count} reviews and {comment_count} comments'
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        batch_size = options['batch_size']
+        models = [model for _, model, _ in TABLES]
+        if options['truncate']:
+            truncate(models)
+        started = time.monotonic()
+        generator = CatalogGenerator(
+            seed=options['seed'],
+            users=options['users'],
+            categories=options['categories'],
+            genres=options['genres'],
+            titles=options['titles'],
+            reviews=options['reviews'],
+            comments_per_review=options['comments_per_review'],
+            title_skew=options['title_skew'],
+            user_skew=options['user_skew'],
+            first_ids={
+                table: model.objects.aggregate(last=Max('pk'))['last'] or 0
+                for table, model, _ in TABLES
+            },
+        )
+        for table, model, fields in TABLES[:-2]:
+            self.write_table(
+                getattr(generator, table)(), model, fields, batch_size
+            )
+        self.write_reviews(generator, batch_size)
+        reset_sequences(models)
+        search.rebuild_index()
+        call_command('rebuild_ratings', stdout=self.stdout)
+        leaderboard.rebuild()
+        invalidate(CATEGORIES, GENRES, TITLES)
+        self.stdout.write(self.style.SUCCESS(
+            f'Dataset generated in {time.monotonic() - started:.0f}s'
+        ))
@@ -1,112 +1,109 @@
 import csv
+import os
 
+from api.cache import CATEGORIES, GENRES, TITLES, invalidate
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
-from reviews.models import Comment, Review
-from reviews.models_categories import Categories, Genres, GenreTitle, Titles
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from reviews import leaderboard, search
+from reviews.bulk import (BulkWriter, load, reset_sequences, resolve_fields,
+                          truncate)
+from reviews.models import (Categories, Comment, Genres, GenreTitle, Review,
+                            Title)
 
 from api_yamdb.settings import BASE_DIR
 
 User = get_user_model()
 
+# Parents before children, so every table is complete when the tables
+# referencing it are checked.
+FILES = (
+    ('users.csv', User),
+    ('category.csv', Categories),
+    ('genre.csv', Genres),
+    ('titles.csv', Title),
+    ('genre_title.csv', GenreTitle),
+    ('review.csv', Review),
+    ('comments.csv', Comment),
+)
+
 
 class Command(BaseCommand):
     """
     To run the command - python3 manage.py load_csv
+    To replace loaded data - python3 manage.py load_csv --truncate
     To remove database - python3 manage.py flush
+
+    Every file is streamed in batches and loaded in one transaction with
+    foreign key checks deferred to its end. Without --truncate rows whose
+    ids already exist are skipped; with it PostgreSQL loads through COPY.
     """
     help = 'command to load data from csv-files'
 
-    def load_user(self):
-        with open(f'{BASE_DIR}/static/data/users.csv',
-                  newline='', encoding='utf-8') as csv_file:
-            reader = csv.reader(csv_file)
-            for row in reader:
-                if row[0] != 'id':
-                    User.objects.get_or_create(
-                        id=row[0],
-                        username=row[1],
-                        email=row[2],
-                        role=row[3],
-                        bio=row[4],
-                        first_name=row[5],
-                        last_name=row[6]
-                    )
-
-    def load_category(self):
-        with open(f'{BASE_DIR}/static/data/category.csv',
-                  newline='', encoding='utf-8') as csv_file:
-            reader = csv.reader(csv_file)
-            for row in reader:
-                if row[0] != 'id':
-                    Categories.objects.get_or_create(
-                        id=row[0], name=row[1], slug=row[2]
-                    )
-
-    def load_genre(self):
-        with open(f'{BASE_DIR}/static/data/genre.csv',
-                  newline='', encoding='utf-8') as csv_file:
-            reader = csv.reader(csv_file)
-            for row in reader:
-                if row[0] != 'id':
-                    Genres.objects.get_or_create(
-                        id=row[0], name=row[1], slug=row[2]
-                    )
-
-    def load_titles(self):
-        with open(f'{BASE_DIR}/static/data/titles.csv',
-                  newline='', encoding='utf-8') as csv_file:
-            reader = csv.reader(csv_file)
-            for row in reader:
-                if row[0] != 'id':
-                    Titles.objects.get_or_create(
-                        id=row[0], name=row[1], year=row[2], category_id=row[3]
-                    )
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of rows inserted per statement.',
+        )
+        parser.add_argument(
+            '--truncate',
+            action='store_true',
+            help='Empty the loaded tables, and the tables referencing '
+                 'them, before loading.',
+        )
+        parser.add_argument(
+            '--data-dir',
+            default=os.path.join(BASE_DIR, 'static', 'data'),
+            help='Directory with the csv-files.',
+        )
 
-    def load_genre_title(self):
-        with open(f'{BASE_DIR}/static/data/genre_title.csv',
-                  newline='', encoding='utf-8') as csv_file:
-            reader = csv.reader(csv_file)
-            for row in reader:
-                if row[0] != 'id':
-                    GenreTitle.objects.get_or_create(
-                        id=row[0], title_id=row[1], genre_id=row[2]
-                    )
-
-    def load_review(self):
-        with open(f'{BASE_DIR}/static/data/review.csv',
-                  newline='', encoding='utf-8') as csv_file:
-            reader = csv.reader(csv_file)
-            for row in reader:
-                if row[0] != 'id':
-                    Review.objects.get_or_create(
-                        id=row[0],
-                        title_id=row[1],
-                        text=row[2],
-                        author_id=row[3],
-                        score=row[4],
-                        pub_date=row[5]
-                    )
+    def progress(self, label):
+        if not self.verbosity:
+            return None
+        return lambda loaded: self.stdout.write(f'{label}: {loaded} rows')
 
-    def load_comments(self):
-        with open(f'{BASE_DIR}/static/data/comments.csv',
-                  newline='', encoding='utf-8') as csv_file:
+    def load_file(self, path, model, batch_size, truncated):
+        label = model._meta.label
+        with open(path, newline='', encoding='utf-8') as csv_file:
             reader = csv.reader(csv_file)
-            for row in reader:
-                if row[0] != 'id':
-                    Comment.objects.get_or_create(
-                        id=row[0],
-                        review_id=row[1],
-                        text=row[2],
-                        author_id=row[3],
-                        pub_date=row[4]
-                    )
+            header = next(reader, None)
+            if header is None:
+                return 0
+            try:
+                fields = resolve_fields(model, header)
+            except (FieldDoesNotExist, ValueError) as error:
+                raise CommandError(f'{path}: {error}')
+            writer = BulkWriter(model, fields, ignore_conflicts=not truncated)
+            try:
+                loaded = load(
+                    writer, reader, batch_size, self.progress(label)
+                )
+            except IntegrityError as error:
+                raise CommandError(f'{path}: {error}')
+        self.stdout.write(f'{label}: loaded {loaded} rows')
+        return loaded
 
     def handle(self, *args, **options):
-        self.load_user()
-        self.load_category()
-        self.load_genre()
-        self.load_titles()
-        self.load_genre_title()
-        self.load_review()
-        self.load_comments()
+        self.verbosity = options['verbosity']
+        data_dir = options['data_dir']
+        models = [model for _, model in FILES]
+        if options['truncate']:
+            truncate(models)
+        for file_name, model in FILES:
+            path = os.path.join(data_dir, file_name)
+            if not os.path.exists(path):
+                self.stdout.write(f'{path} not found, skipped')
+                continue
+            self.load_file(
+                path, model, options['batch_size'], options['truncate']
+            )
+        reset_sequences(models)
+        search.rebuild_index()
+        call_command('rebuild_ratings', stdout=self.stdout)
+        leaderboard.rebuild()
+        invalidate(CATEGORIES, GENRES, TITLES)
+        self.stdout.write(self.style.SUCCESS('Data loaded'))
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from reviews.models import Review, Title, TitleRank
+
+
+class Command(BaseCommand):
+    """
+    To run the command - python3 manage.py rebuild_ratings
+    Recounts the stored review score totals of every title chunk by chunk
+    and rescores their leaderboard rows.
+    """
+    help = 'command to rebuild stored title ratings from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of titles recounted per transaction.',
+        )
+
+    def rebuild_chunk(self, title_ids):
+        with transaction.atomic():
+            list(Title.objects.select_for_update().filter(pk__in=title_ids)
+                 .values_list('pk', flat=True))
+            totals = {
+                row['title_id']: row
+                for row in Review.objects.filter(title_id__in=title_ids)
+                .order_by()
+                .values('title_id')
+                .annotate(score_sum=Sum('score'), score_count=Count('id'))
+            }
+            titles = []
+            now = timezone.now()
+            for title_id in title_ids:
+                row = totals.get(title_id, {})
+                titles.append(Title(
+                    pk=title_id,
+                    score_sum=row.get('score_sum', 0),
+                    score_count=row.get('score_count', 0),
+                    modified=now,
+                ))
+            Title.objects.bulk_update(
+                titles, ('score_sum', 'score_count', 'modified')
+            )
+            TitleRank.objects.filter(title_id__in=title_ids).rescore()
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_id = 0
+        rebuilt = 0
+        while True:
+            title_ids = list(
+                Title.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size]
+            )
+            if not title_ids:
+                break
+            self.rebuild_chunk(title_ids)
+            last_id = title_ids[-1]
+            rebuilt += len(title_ids)
+            self.stdout.write(f'Rebuilt ratings of {rebuilt} titles')
+        self.stdout.write(self.style.SUCCESS('Ratings rebuilt'))
@@ -0,0 +1,49 @@
+from api.cache import TITLES, invalidate
+from django.core.management.base import BaseCommand
+from reviews import leaderboard
+from reviews.models import TitleRank
+
+
+class Command(BaseCommand):
+    """
+    To run the command, e.g. hourly from cron -
+        python3 manage.py refresh_leaderboards
+    Rescores the trending titles, so that reviews which left the
+    trending window stop counting. Review writes keep the leaderboards
+    up to date otherwise, see reviews.leaderboard.
+    To place every title again, after changing LEADERBOARD_* settings
+    or writing titles and reviews with SQL - add --rebuild
+    """
+    help = 'command to refresh the precomputed title leaderboards'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recreate the leaderboard rows of every title.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Number of titles updated per statement.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if options['rebuild']:
+            placed = leaderboard.rebuild(chunk_size)
+            invalidate(TITLES)
+            self.stdout.write(self.style.SUCCESS(
+                f'Leaderboards rebuilt for {placed} titles'
+            ))
+            return
+        title_ids = list(leaderboard.trending_title_ids())
+        for start in range(0, len(title_ids), chunk_size):
+            TitleRank.objects.filter(
+                title_id__in=title_ids[start:start + chunk_size]
+            ).rescore()
+        invalidate(TITLES)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rescored {len(title_ids)} trending titles'
+        ))
@@ -0,0 +1,88 @@
+from api.cache import CATEGORIES, GENRES, TITLES, invalidate
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from reviews import leaderboard, search
+from reviews.bulk import (BulkWriter, load, reset_sequences, resolve_fields,
+                          truncate)
+from reviews.dataset import (CSV, dataset_models, find_file, open_file,
+                             read_rows)
+
+
+class Command(BaseCommand):
+    """
+    To run the command - python3 manage.py restore_dataset --input-dir dump
+
+    Reads the files written by dump_dataset. Every table is streamed in
+    batches and loaded in one transaction with foreign key checks
+    deferred to its end. Without --truncate rows whose ids already exist
+    are skipped; with it PostgreSQL loads through COPY.
+    """
+    help = 'command to import users and catalog data from dump_dataset files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--input-dir',
+            default='dataset',
+            help='Directory with the dump_dataset files.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of rows inserted per statement.',
+        )
+        parser.add_argument(
+            '--truncate',
+            action='store_true',
+            help='Empty the restored tables, and the tables referencing '
+                 'them, before loading.',
+        )
+
+    def progress(self, label):
+        if not self.verbosity:
+            return None
+        return lambda loaded: self.stdout.write(f'{label}: {loaded} rows')
+
+    def restore_model(self, model, path, fmt, batch_size, truncated):
+        label = model._meta.label
+        with open_file(path, 'r') as file:
+            columns, rows = read_rows(file, fmt)
+            try:
+                fields = resolve_fields(model, columns)
+            except (FieldDoesNotExist, ValueError) as error:
+                raise CommandError(f'{path}: {error}')
+            writer = BulkWriter(
+                model,
+                fields,
+                ignore_conflicts=not truncated,
+                blank_as_null=fmt == CSV,
+            )
+            try:
+                loaded = load(writer, rows, batch_size, self.progress(label))
+            except IntegrityError as error:
+                raise CommandError(f'{path}: {error}')
+        self.stdout.write(f'{label}: restored {loaded} rows')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        input_dir = options['input_dir']
+        models = dataset_models()
+        found = {model: find_file(input_dir, model) for model in models}
+        if not any(found.values()):
+            raise CommandError(f'No dump_dataset files in {input_dir}.')
+        if options['truncate']:
+            truncate(models)
+        for model in models:
+            if found[model] is None:
+                self.stdout.write(f'{model._meta.label}: no file, skipped')
+                continue
+            path, fmt = found[model]
+            self.restore_model(
+                model, path, fmt, options['batch_size'], options['truncate']
+            )
+        reset_sequences(models)
+        search.rebuild_index()
+        leaderboard.rebuild()
+        invalidate(CATEGORIES, GENRES, TITLES)
+        self.stdout.write(self.style.SUCCESS('Dataset restored'))
@@ -0,0 +1,40 @@
+# Generated by Django 3.2 on 2026-10-18 18:19
+
+from django.db import migrations, models
+
+
+def fill_score_totals(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    totals = (
+        Review.objects.order_by()
+        .values('title_id')
+        .annotate(score_sum=models.Sum('score'),
+                  score_count=models.Count('id'))
+    )
+    for row in totals.iterator():
+        Title.objects.filter(pk=row['title_id']).update(
+            score_sum=row['score_sum'],
+            score_count=row['score_count'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='score_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_score_totals, migrations.RunPython.noop),
+    ]
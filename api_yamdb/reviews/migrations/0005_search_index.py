@@ -0,0 +1,62 @@
+from django.db import migrations
+
+POSTGRESQL_FORWARD = (
+    "ALTER TABLE reviews_title ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX reviews_title_search_idx ON reviews_title "
+    "USING gin (search_vector)",
+    "ALTER TABLE reviews_review ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('russian', coalesce(text, '')), 'C')"
+    ") STORED",
+    "CREATE INDEX reviews_review_search_idx ON reviews_review "
+    "USING gin (search_vector)",
+)
+POSTGRESQL_BACKWARD = (
+    "ALTER TABLE reviews_review DROP COLUMN search_vector",
+    "ALTER TABLE reviews_title DROP COLUMN search_vector",
+)
+SQLITE_FORWARD = (
+    "CREATE VIRTUAL TABLE reviews_search USING fts5("
+    "name, body, kind UNINDEXED, object_id UNINDEXED, title_id UNINDEXED, "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+    "INSERT INTO reviews_search "
+    "(rowid, name, body, kind, object_id, title_id) "
+    "SELECT id * 2, name, COALESCE(description, ''), 'title', id, id "
+    "FROM reviews_title",
+    "INSERT INTO reviews_search "
+    "(rowid, name, body, kind, object_id, title_id) "
+    "SELECT id * 2 + 1, '', text, 'review', id, title_id "
+    "FROM reviews_review",
+)
+SQLITE_BACKWARD = (
+    "DROP TABLE reviews_search",
+)
+
+
+def run_for_vendor(postgresql, sqlite):
+    def run(apps, schema_editor):
+        statements = {
+            'postgresql': postgresql,
+            'sqlite': sqlite,
+        }.get(schema_editor.connection.vendor, ())
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(POSTGRESQL_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRESQL_BACKWARD, SQLITE_BACKWARD),
+        ),
+    ]
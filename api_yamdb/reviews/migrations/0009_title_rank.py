@@ -0,0 +1,95 @@
+# Generated by Django 3.2 on 2026-10-18 19:09
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+BATCH_SIZE = 10000
+
+
+def fill_title_ranks(apps, schema_editor):
+    """Place every title, as reviews.leaderboard.rebuild() does."""
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    Review = apps.get_model('reviews', 'Review')
+    TitleRank = apps.get_model('reviews', 'TitleRank')
+    prior_reviews = settings.LEADERBOARD_PRIOR_REVIEWS
+    prior_sum = prior_reviews * settings.LEADERBOARD_PRIOR_MEAN
+    days = settings.LEADERBOARD_TRENDING_DAYS
+    recent = dict(
+        Review.objects.filter(
+            pub_date__gte=timezone.now() - timedelta(days=days)
+        ).order_by().values('title_id').annotate(count=models.Count('id'))
+        .values_list('title_id', 'count')
+    )
+    genres = defaultdict(list)
+    for title_id, genre_id in GenreTitle.objects.values_list(
+        'title_id', 'genre_id'
+    ).iterator():
+        genres[title_id].append(genre_id)
+    ranks = []
+    for title_id, category_id, score_sum, score_count in (
+        Title.objects.values_list(
+            'pk', 'category_id', 'score_sum', 'score_count'
+        ).iterator()
+    ):
+        rating = (
+            (prior_sum + score_sum) / (prior_reviews + score_count)
+            if score_count else None
+        )
+        velocity = recent.get(title_id, 0) / days
+        scopes = ['all'] + [f'genre:{genre}' for genre in genres[title_id]]
+        if category_id is not None:
+            scopes.append(f'category:{category_id}')
+        ranks.extend(
+            TitleRank(
+                scope=scope, title_id=title_id,
+                rating=rating, velocity=velocity,
+            )
+            for scope in scopes
+        )
+        if len(ranks) >= BATCH_SIZE:
+            TitleRank.objects.bulk_create(ranks)
+            ranks = []
+    TitleRank.objects.bulk_create(ranks)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=32, verbose_name='Рейтинг')),
+                ('rating', models.FloatField(null=True, verbose_name='Взвешенная оценка')),
+                ('velocity', models.FloatField(default=0, verbose_name='Отзывов в день')),
+                ('title', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='ranks', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Места в рейтингах',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titlerank',
+            index=models.Index(fields=['scope', '-rating', '-title'], name='titlerank_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titlerank',
+            index=models.Index(fields=['scope', '-velocity', '-title'], name='titlerank_velocity_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titlerank',
+            constraint=models.UniqueConstraint(fields=('title', 'scope'), name='unique_title_rank'),
+        ),
+        migrations.RunPython(fill_title_ranks, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.validators import (MaxValueValidator, MinValueValidator,
                                     RegexValidator)
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 User = get_user_model()
@@ -58,15 +62,57 @@ class Genres(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+
+    def change_score(self, title_id, score_delta, count_delta):
+        """
+        Shift the stored review score sum and count of a title,
+        mark the title as modified and rescore its leaderboard rows.
+        """
+        updated = self.filter(pk=title_id).update(
+            score_sum=models.F('score_sum') + score_delta,
+            score_count=models.F('score_count') + count_delta,
+            modified=timezone.now(),
+        )
+        TitleRank.objects.filter(title_id=title_id).rescore()
+        return updated
+
+    def add_scores(self, scores):
+        """
+        Add one new review score per title, given as {title_id: score},
+        to the stored totals with a single UPDATE, and rescore their
+        leaderboard rows with another.
+        """
+        if not scores:
+            return 0
+        updated = self.filter(pk__in=scores).update(
+            score_sum=models.F('score_sum') + models.Case(
+                *(models.When(pk=title_id, then=models.Value(score))
+                  for title_id, score in scores.items()),
+                output_field=models.PositiveIntegerField(),
+            ),
+            score_count=models.F('score_count') + 1,
+            modified=timezone.now(),
+        )
+        TitleRank.objects.filter(title_id__in=scores).rescore()
+        return updated
+
+    def touch(self):
+        """Mark titles as modified after changes to related rows."""
+        return self.update(modified=timezone.now())
+
+
 class Title(models.Model):
     """Модель произведений."""
 
     name = models.CharField(
         max_length=256,
+        db_index=True,
         verbose_name='Название'
     )
     year = models.IntegerField(
         validators=[MaxValueValidator(timezone.now().year)],
+        db_index=True,
         verbose_name='Год выпуска'
     )
     category = models.ForeignKey(
@@ -75,7 +121,9 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория',
         null=True,
-        blank=True
+        blank=True,
+        # Served by title_category_year_idx.
+        db_index=False,
     )
     description = models.TextField(
         verbose_name='Описание',
@@ -88,25 +136,71 @@ class Title(models.Model):
         through='GenreTitle',
         verbose_name='Жанр'
     )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок'
+    )
+    score_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество оценок'
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = (
+            models.Index(
+                fields=('category', 'year'),
+                name='title_category_year_idx',
+            ),
+        )
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Average review score, None while the title has no reviews."""
+        if not self.score_count:
+            return None
+        return self.score_sum / self.score_count
+
 
 class GenreTitle(models.Model):
     title = models.ForeignKey(
         Title,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        # Served by unique_genre_title.
+        db_index=False,
     )
     genre = models.ForeignKey(
         Genres,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        # Served by genretitle_genre_title_idx.
+        db_index=False,
     )
 
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('genre', 'title'),
+                name='genretitle_genre_title_idx',
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'genre'),
+                name='unique_genre_title',
+            ),
+        )
+
     def __str__(self) -> str:
         return self.genre
 
@@ -119,6 +213,8 @@ class Review(models.Model):
         verbose_name='Произведение',
         on_delete=models.CASCADE,
         related_name='reviews',
+        # Served by review_title_pub_date_idx.
+        db_index=False,
     )
     text = models.TextField(
         verbose_name='Текст',
@@ -151,7 +247,13 @@ class Review(models.Model):
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
-        ordering = ('pub_date',)
+        ordering = ('pub_date', 'id')
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx',
+            ),
+        )
         constraints = (
             models.UniqueConstraint(
                 fields=('title', 'author',),
@@ -159,6 +261,36 @@ class Review(models.Model):
             ),
         )
 
+    def save(self, *args, **kwargs):
+        """
+        Save the review and move its score into the stored title
+        totals within the same transaction.
+        Raises Title.DoesNotExist, rolling the insert back, when the
+        title is gone: foreign keys are only checked on commit.
+        """
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None:
+                previous = Review.objects.select_for_update().filter(
+                    pk=self.pk
+                ).values_list('title_id', 'score').first()
+            super().save(*args, **kwargs)
+            score = int(self.score)
+            if previous is None:
+                if not Title.objects.change_score(self.title_id, score, 1):
+                    raise Title.DoesNotExist(
+                        f'Title {self.title_id} does not exist.'
+                    )
+                return
+            previous_title_id, previous_score = previous
+            if previous_title_id == self.title_id:
+                Title.objects.change_score(
+                    self.title_id, score - previous_score, 0
+                )
+                return
+            Title.objects.change_score(previous_title_id, -previous_score, -1)
+            Title.objects.change_score(self.title_id, score, 1)
+
 
 class Comment(models.Model):
     """Model of comments."""
@@ -168,6 +300,8 @@ class Comment(models.Model):
         verbose_name='Отзыв',
         on_delete=models.CASCADE,
         related_name='comments',
+        # Served by comment_review_pub_date_idx.
+        db_index=False,
     )
     text = models.TextField(
         verbose_name='Текст комментария',
@@ -188,4 +322,96 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
-        ordering = ('pub_date',)
+        ordering = ('pub_date', 'id')
+        indexes = (
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx',
+            ),
+        )
+
+
+class TitleRankQuerySet(models.QuerySet):
+
+    def rescore(self, now=None):
+        """
+        Recompute the rows from the stored title totals and the reviews
+        of the trending window with one UPDATE, see reviews.leaderboard.
+        """
+        prior_reviews = float(settings.LEADERBOARD_PRIOR_REVIEWS)
+        rating = Title.objects.filter(
+            pk=models.OuterRef('title_id')
+        ).annotate(weighted=models.Case(
+            models.When(score_count=0, then=models.Value(None)),
+            default=(
+                models.Value(prior_reviews * settings.LEADERBOARD_PRIOR_MEAN)
+                + models.F('score_sum')
+            ) / (models.Value(prior_reviews) + models.F('score_count')),
+            output_field=models.FloatField(),
+        )).values('weighted')
+        days = settings.LEADERBOARD_TRENDING_DAYS
+        recent = Review.objects.filter(
+            title_id=models.OuterRef('title_id'),
+            pub_date__gte=(now or timezone.now()) - timedelta(days=days),
+        ).order_by().values('title_id').annotate(
+            count=models.Count('pk')
+        ).values('count')
+        return self.update(
+            rating=models.Subquery(rating, output_field=models.FloatField()),
+            velocity=models.ExpressionWrapper(
+                Coalesce(models.Subquery(
+                    recent, output_field=models.IntegerField()
+                ), 0) / models.Value(float(days)),
+                output_field=models.FloatField(),
+            ),
+        )
+
+
+class TitleRank(models.Model):
+    """
+    Place of a title in one leaderboard scope: the whole catalog,
+    a category or a genre. Kept up to date by reviews.leaderboard.
+    """
+
+    scope = models.CharField(
+        max_length=32,
+        verbose_name='Рейтинг',
+    )
+    title = models.ForeignKey(
+        Title,
+        verbose_name='Произведение',
+        on_delete=models.CASCADE,
+        related_name='ranks',
+        # Served by unique_title_rank.
+        db_index=False,
+    )
+    rating = models.FloatField(
+        null=True,
+        verbose_name='Взвешенная оценка',
+    )
+    velocity = models.FloatField(
+        default=0,
+        verbose_name='Отзывов в день',
+    )
+
+    objects = TitleRankQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Места в рейтингах'
+        indexes = (
+            models.Index(
+                fields=('scope', '-rating', '-title'),
+                name='titlerank_rating_idx',
+            ),
+            models.Index(
+                fields=('scope', '-velocity', '-title'),
+                name='titlerank_velocity_idx',
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'scope'),
+                name='unique_title_rank',
+            ),
+        )
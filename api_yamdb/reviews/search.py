@@ -0,0 +1,141 @@
+"""
+Ranked full-text search over titles and reviews.
+
+PostgreSQL keeps a stored, GIN-indexed ``search_vector`` column on
+reviews_title and reviews_review, generated from the text columns, so
+it never goes stale. SQLite keeps an FTS5 shadow table which is
+synchronised from model signals.
+"""
+from django.db import NotSupportedError, connection
+
+SEARCH_CONFIG = 'russian'
+SQLITE_TABLE = 'reviews_search'
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+
+TITLE = 'title'
+REVIEW = 'review'
+
+POSTGRESQL_SEARCH = f"""
+    WITH query AS (SELECT websearch_to_tsquery('{SEARCH_CONFIG}', %s) AS q)
+    SELECT 'title', t.id, t.id, ts_rank(t.search_vector, query.q) AS rank
+    FROM reviews_title t, query
+    WHERE t.search_vector @@ query.q
+    UNION ALL
+    SELECT 'review', r.id, r.title_id, ts_rank(r.search_vector, query.q)
+    FROM reviews_review r, query
+    WHERE r.search_vector @@ query.q
+    ORDER BY 4 DESC, 2
+    LIMIT %s OFFSET %s
+"""
+SQLITE_SEARCH = f"""
+    SELECT kind, object_id, title_id,
+           -bm25({SQLITE_TABLE}, {TITLE_WEIGHT}, {TEXT_WEIGHT}) AS rank
+    FROM {SQLITE_TABLE}
+    WHERE {SQLITE_TABLE} MATCH %s
+    ORDER BY rank DESC, object_id
+    LIMIT %s OFFSET %s
+"""
+
+
+def _sqlite_rowid(kind, object_id):
+    """Titles and reviews share the FTS5 table, so interleave their ids."""
+    return object_id * 2 + (kind == REVIEW)
+
+
+def _sqlite_match(query):
+    """Quote every term so user input can't use the FTS5 query syntax."""
+    terms = ('"{}"'.format(term.replace('"', '""')) for term in query.split())
+    return ' '.join(terms)
+
+
+def _uses_shadow_table():
+    return connection.vendor == 'sqlite'
+
+
+def _sqlite_store(kind, object_id, title_id, name, body, created):
+    rowid = _sqlite_rowid(kind, object_id)
+    with connection.cursor() as cursor:
+        if not created:
+            cursor.execute(
+                f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s', [rowid]
+            )
+        cursor.execute(
+            f'INSERT INTO {SQLITE_TABLE} '
+            '(rowid, name, body, kind, object_id, title_id) '
+            'VALUES (%s, %s, %s, %s, %s, %s)',
+            [rowid, name, body or '', kind, object_id, title_id],
+        )
+
+
+def _sqlite_remove(kind, object_id):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s',
+            [_sqlite_rowid(kind, object_id)],
+        )
+
+
+def index_title(title, created=False):
+    if _uses_shadow_table():
+        _sqlite_store(TITLE, title.pk, title.pk, title.name,
+                      title.description, created)
+
+
+def remove_title(title_id):
+    if _uses_shadow_table():
+        _sqlite_remove(TITLE, title_id)
+
+
+def index_review(review, created=False):
+    if _uses_shadow_table():
+        _sqlite_store(REVIEW, review.pk, review.title_id, '', review.text,
+                      created)
+
+
+def remove_review(review_id):
+    if _uses_shadow_table():
+        _sqlite_remove(REVIEW, review_id)
+
+
+def rebuild_index():
+    """Refill the SQLite shadow table after writes that skip signals."""
+    if not _uses_shadow_table():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SQLITE_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {SQLITE_TABLE} '
+            '(rowid, name, body, kind, object_id, title_id) '
+            "SELECT id * 2, name, COALESCE(description, ''), %s, id, id "
+            'FROM reviews_title',
+            [TITLE],
+        )
+        cursor.execute(
+            f'INSERT INTO {SQLITE_TABLE} '
+            '(rowid, name, body, kind, object_id, title_id) '
+            "SELECT id * 2 + 1, '', text, %s, id, title_id "
+            'FROM reviews_review',
+            [REVIEW],
+        )
+
+
+def search(query, limit, offset=0):
+    """
+    Return hits as (kind, object_id, title_id, rank) tuples,
+    best ranked first.
+    """
+    if connection.vendor == 'postgresql':
+        sql, params = POSTGRESQL_SEARCH, [query, limit, offset]
+    elif _uses_shadow_table():
+        match = _sqlite_match(query)
+        if not match:
+            return []
+        sql, params = SQLITE_SEARCH, [match, limit, offset]
+    else:
+        raise NotSupportedError(
+            f'Full-text search is not available on {connection.vendor}.'
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
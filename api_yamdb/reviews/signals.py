@@ -0,0 +1,81 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from reviews import leaderboard, search
+from reviews.models import Categories, Genres, Review, Title
+
+
+@receiver(post_delete, sender=Review)
+def withdraw_review_score(sender, instance, **kwargs):
+    """
+    Remove a deleted review from the stored title totals.
+    Runs inside the deletion transaction, cascades included.
+    """
+    Title.objects.change_score(instance.title_id, -instance.score, -1)
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, created, **kwargs):
+    search.index_title(instance, created)
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, **kwargs):
+    search.remove_title(instance.pk)
+
+
+@receiver(post_save, sender=Review)
+def index_review(sender, instance, created, **kwargs):
+    search.index_review(instance, created)
+
+
+@receiver(post_delete, sender=Review)
+def unindex_review(sender, instance, **kwargs):
+    search.remove_review(instance.pk)
+
+
+@receiver(pre_delete, sender=Categories)
+def touch_category_titles(sender, instance, **kwargs):
+    Title.objects.filter(category=instance).touch()
+
+
+@receiver(pre_delete, sender=Genres)
+def touch_genre_titles(sender, instance, **kwargs):
+    Title.objects.filter(genre=instance).touch()
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_regenred_titles(sender, instance, action, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, Title):
+        Title.objects.filter(pk=instance.pk).touch()
+    elif pk_set:
+        Title.objects.filter(pk__in=pk_set).touch()
+
+
+@receiver(post_save, sender=Title)
+def place_title(sender, instance, **kwargs):
+    leaderboard.place_titles([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def place_regenred_titles(sender, instance, action, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, Title):
+        leaderboard.place_titles([instance.pk])
+    elif action == 'post_clear':
+        leaderboard.drop_scope(leaderboard.genre_scope(instance.pk))
+    elif pk_set:
+        leaderboard.place_titles(pk_set)
+
+
+@receiver(post_delete, sender=Categories)
+def drop_category_leaderboard(sender, instance, **kwargs):
+    leaderboard.drop_scope(leaderboard.category_scope(instance.pk))
+
+
+@receiver(post_delete, sender=Genres)
+def drop_genre_leaderboard(sender, instance, **kwargs):
+    leaderboard.drop_scope(leaderboard.genre_scope(instance.pk))
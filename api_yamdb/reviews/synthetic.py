@@ -0,0 +1,246 @@
+"""
+Synthetic catalog with the skew of a real review site.
+
+Review counts per title follow a Zipf law: the title of popularity rank
+r gets a share of the reviews proportional to 1 / r ** title_skew.
+Review authors are drawn with weights 1 / r ** user_skew, so review
+counts per user follow a power law too, and nobody reviews a title
+twice. Every review opens a comment thread whose length has a Pareto
+tail: most reviews get no comments, a few get long discussions.
+Comment has no parent comment, so a thread is the list of comments of
+its review in date order, often answered by the review author.
+
+Each table is drawn from its own random.Random seeded with the seed and
+the table name, so the same arguments always give the same rows. Rows
+are generated lazily, with explicit ids, in the column order of the
+*_FIELDS constants, ready for reviews.bulk.BulkWriter.
+"""
+import random
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from users.models import USER
+
+USER_FIELDS = ('id', 'username', 'email', 'password', 'role', 'date_joined')
+CATEGORY_FIELDS = ('id', 'name', 'slug')
+GENRE_FIELDS = ('id', 'name', 'slug')
+TITLE_FIELDS = ('id', 'name', 'year', 'category', 'description')
+GENRE_TITLE_FIELDS = ('id', 'title', 'genre')
+REVIEW_FIELDS = ('id', 'title', 'author', 'text', 'score', 'pub_date')
+COMMENT_FIELDS = ('id', 'review', 'author', 'text', 'pub_date')
+
+# Fixed, so that dates don't depend on the day of generation.
+END = datetime(2024, 1, 1, tzinfo=timezone.utc)
+HISTORY = timedelta(days=3 * 365)
+FIRST_YEAR = 1950
+MAX_GENRES = 3
+MAX_THREAD = 500
+# Pareto shape of thread lengths; the mean of paretovariate(a) - 1
+# is 1 / (a - 1).
+THREAD_SHAPE = 1.5
+REPLY_SHARE = 0.3
+SENTENCES = 1000
+
+WORDS = (
+    'фильм', 'книга', 'песня', 'сюжет', 'герой', 'финал', 'автор', 'актёр',
+    'музыка', 'сцена', 'глава', 'голос', 'история', 'мир', 'время', 'жизнь',
+    'любовь', 'дорога', 'город', 'ночь', 'смысл', 'идея', 'ритм', 'образ',
+    'очень', 'слишком', 'совсем', 'снова', 'всегда', 'почти', 'вполне',
+    'хороший', 'странный', 'скучный', 'яркий', 'тёмный', 'живой', 'честный',
+    'долгий', 'лёгкий', 'новый', 'старый', 'лучший', 'главный', 'простой',
+    'нравится', 'удивляет', 'держит', 'цепляет', 'раздражает', 'тянется',
+    'звучит', 'выглядит', 'помню', 'советую', 'пересмотрю', 'жду', 'и',
+    'но', 'как', 'не', 'в', 'на', 'про', 'без', 'для',
+)
+
+
+def zipf_counts(total, size, exponent, cap, rng):
+    """
+    Split total into size counts proportional to 1 / rank ** exponent,
+    none above cap. Every count takes its share of what is left, so
+    the excess of capped counts goes to the following ones.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    rest = sum(weights)
+    counts = []
+    for weight in weights:
+        share = total * weight / rest if rest > 0 else 0
+        count = min(cap, total, int(share + rng.random()))
+        counts.append(count)
+        total -= count
+        rest -= weight
+    return counts
+
+
+class CatalogGenerator:
+    """
+    Rows of every table of a synthetic catalog. Ids start after the
+    given first ids, so the rows can be added to a non-empty database.
+    """
+
+    def __init__(self, seed=0, users=1000, categories=10, genres=30,
+                 titles=1000, reviews=100000, comments_per_review=0.5,
+                 title_skew=1.0, user_skew=1.0, first_ids=None):
+        self.seed = seed
+        self.sizes = {
+            'users': users,
+            'categories': categories,
+            'genres': genres,
+            'titles': titles,
+        }
+        self.review_total = reviews
+        self.comments_per_review = comments_per_review
+        self.title_skew = title_skew
+        self.user_skew = user_skew
+        self.first_ids = dict.fromkeys(
+            ('users', 'categories', 'genres', 'titles', 'genre_titles',
+             'reviews', 'comments'), 0
+        )
+        self.first_ids.update(first_ids or {})
+        self.next_comment_id = self.first_ids['comments'] + 1
+        self.comment_rng = self.random('comments')
+        self.sentences = self.make_sentences(self.random('sentences'))
+        ranked_users = self.ids('users')
+        self.random('user ranks').shuffle(ranked_users)
+        self.ranked_users = ranked_users
+        self.user_weights = list(accumulate(
+            1 / rank ** user_skew for rank in range(1, users + 1)
+        ))
+
+    def random(self, table):
+        return random.Random(f'{self.seed}:{table}')
+
+    def ids(self, table):
+        first = self.first_ids[table] + 1
+        return list(range(first, first + self.sizes[table]))
+
+    @staticmethod
+    def make_sentences(rng):
+        sentences = []
+        for _ in range(SENTENCES):
+            words = rng.choices(WORDS, k=rng.randint(3, 12))
+            sentences.append(' '.join(words).capitalize() + '.')
+        return sentences
+
+    def text(self, rng, sentences):
+        return ' '.join(rng.choices(self.sentences, k=sentences))
+
+    def date(self, rng):
+        return END - HISTORY * rng.random()
+
+    def users(self):
+        rng = self.random('users')
+        for pk in self.ids('users'):
+            username = f'reader{pk}'
+            yield (
+                pk, username, f'{username}@yamdb.fake',
+                UNUSABLE_PASSWORD_PREFIX, USER, self.date(rng),
+            )
+
+    def categories(self):
+        for pk in self.ids('categories'):
+            yield pk, f'Категория {pk}', f'category-{pk}'
+
+    def genres(self):
+        for pk in self.ids('genres'):
+            yield pk, f'Жанр {pk}', f'genre-{pk}'
+
+    def titles(self):
+        rng = self.random('titles')
+        category_ids = self.ids('categories')
+        for pk in self.ids('titles'):
+            name = ' '.join(rng.choices(WORDS[:45], k=rng.randint(1, 3)))
+            yield (
+                pk, f'{name.capitalize()} {pk}',
+                rng.randint(FIRST_YEAR, END.year),
+                rng.choice(category_ids) if category_ids else None,
+                self.text(rng, rng.randint(1, 3)),
+            )
+
+    def genre_titles(self):
+        rng = self.random('genre_titles')
+        genre_ids = self.ids('genres')
+        pk = self.first_ids['genre_titles']
+        for title_id in self.ids('titles'):
+            count = min(len(genre_ids), rng.randint(1, MAX_GENRES))
+            for genre_id in sorted(rng.sample(genre_ids, count)):
+                pk += 1
+                yield pk, title_id, genre_id
+
+    def review_counts(self, rng):
+        """(title id, number of reviews) in title id order."""
+        title_ids = self.ids('titles')
+        rng.shuffle(title_ids)
+        counts = zipf_counts(
+            self.review_total, len(title_ids), self.title_skew,
+            self.sizes['users'], rng,
+        )
+        return sorted(zip(title_ids, counts))
+
+    def pick_authors(self, rng, count):
+        """count distinct users drawn by activity weight."""
+        picked = {}
+        for _ in range(10):
+            missing = count - len(picked)
+            if not missing:
+                break
+            for pk in rng.choices(
+                self.ranked_users, cum_weights=self.user_weights,
+                k=2 * missing,
+            ):
+                picked[pk] = None
+                if len(picked) == count:
+                    break
+        if len(picked) < count:
+            # Titles reviewed by almost everyone: the rarely drawn
+            # users are added uniformly.
+            rest = [pk for pk in self.ranked_users if pk not in picked]
+            picked.update(
+                dict.fromkeys(rng.sample(rest, count - len(picked)))
+            )
+        return sorted(picked)
+
+    def reviews(self):
+        rng = self.random('reviews')
+        pk = self.first_ids['reviews']
+        for title_id, count in self.review_counts(rng):
+            quality = rng.gauss(7, 1.5)
+            for author_id in self.pick_authors(rng, count):
+                pk += 1
+                score = min(10, max(1, round(rng.gauss(quality, 2))))
+                yield (
+                    pk, title_id, author_id,
+                    self.text(rng, rng.randint(1, 4)), score,
+                    self.date(rng),
+                )
+
+    def thread_length(self, rng):
+        scale = self.comments_per_review * (THREAD_SHAPE - 1)
+        length = (rng.paretovariate(THREAD_SHAPE) - 1) * scale
+        return min(MAX_THREAD, int(length + rng.random()))
+
+    def comments(self, reviews):
+        """
+        Comment threads of a batch of review rows. Threads depend only
+        on the reviews before them, whatever the batch size.
+        """
+        rng = self.comment_rng
+        rows = []
+        for review_id, _, review_author, _, _, pub_date in reviews:
+            for _ in range(self.thread_length(rng)):
+                if rng.random() < REPLY_SHARE:
+                    author_id = review_author
+                else:
+                    author_id = self.ranked_users[bisect_left(
+                        self.user_weights,
+                        rng.random() * self.user_weights[-1],
+                    )]
+                pub_date += timedelta(hours=rng.expovariate(1 / 12))
+                rows.append((
+                    self.next_comment_id, review_id, author_id,
+                    rng.choice(self.sentences), pub_date,
+                ))
+                self.next_comment_id += 1
+        return rows
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutboxMessage, User
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -33,3 +33,24 @@ class UserAdmin(admin.ModelAdmin):
 
 
 admin.site.register(User, UserAdmin)
+
+
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """
+    Creating ModelAdmin for OutboxMessage model.
+    """
+
+    list_display = (
+        "id",
+        "recipient",
+        "subject",
+        "created",
+        "attempts",
+        "next_attempt",
+    )
+    readonly_fields = ("created", "attempts", "last_error")
+    search_fields = ("recipient",)
+    empty_value_display = "-пусто-"
+
+
+admin.site.register(OutboxMessage, OutboxMessageAdmin)
@@ -0,0 +1,121 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from users.models import OutboxMessage
+
+
+class Command(BaseCommand):
+    """
+    To send queued e-mails once - python3 manage.py send_outbox
+    To keep sending them - python3 manage.py send_outbox --loop
+
+    Due messages are locked in batches (SKIP LOCKED, so several workers
+    can run side by side) and sent over one mail backend connection per
+    batch. Sent messages are deleted, failed ones are retried after
+    retry-delay, 2 * retry-delay, 4 * retry-delay... seconds until
+    max-attempts is reached.
+    """
+    help = 'command to send e-mails queued in the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of messages sent over one connection.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=5,
+            help='Attempts before a message is left as failed.',
+        )
+        parser.add_argument(
+            '--retry-delay',
+            type=int,
+            default=60,
+            help='Seconds before the first retry, doubled on every retry.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the outbox instead of exiting once it '
+                 'has no due messages.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds between polls of an empty outbox with --loop.',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Print the queue depth and age and exit.',
+        )
+
+    def send_batch(self, batch_size, retry_delay, max_attempts):
+        """
+        Send one batch of due messages; return how many were taken.
+        """
+        with transaction.atomic():
+            messages = list(
+                OutboxMessage.objects.due()
+                .select_for_update(skip_locked=True)
+                .order_by('next_attempt', 'id')[:batch_size]
+            )
+            if not messages:
+                return 0
+            sent, failed = [], []
+            connection = get_connection()
+            try:
+                connection.open()
+            except Exception as error:
+                for message in messages:
+                    message.fail(error, retry_delay, max_attempts)
+                failed = messages
+            else:
+                try:
+                    for message in messages:
+                        try:
+                            message.as_email(connection).send()
+                        except Exception as error:
+                            message.fail(error, retry_delay, max_attempts)
+                            failed.append(message)
+                        else:
+                            sent.append(message.pk)
+                finally:
+                    connection.close()
+            OutboxMessage.objects.filter(pk__in=sent).delete()
+            OutboxMessage.objects.bulk_update(
+                failed, ('attempts', 'last_error', 'next_attempt')
+            )
+        self.stdout.write(f'Sent {len(sent)}, failed {len(failed)}')
+        return len(messages)
+
+    def write_stats(self):
+        stats = OutboxMessage.objects.stats()
+        self.stdout.write(
+            'Outbox: {pending} pending, {due} due, {failed} failed, '
+            'oldest {oldest_age:.0f}s'.format(**stats)
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.write_stats()
+            return
+        batch_size = options['batch_size']
+        while True:
+            taken = self.send_batch(
+                batch_size, options['retry_delay'], options['max_attempts']
+            )
+            if taken == batch_size:
+                continue
+            if not options['loop']:
+                break
+            if taken:
+                self.write_stats()
+            time.sleep(options['interval'])
+        self.write_stats()
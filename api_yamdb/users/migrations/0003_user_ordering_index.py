@@ -0,0 +1,17 @@
+# Generated by Django 3.2 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['last_login', 'username', 'is_active'], name='user_ordering_idx'),
+        ),
+    ]
@@ -1,6 +1,10 @@
+from datetime import timedelta
+
 from django.contrib.auth.models import AbstractUser
+from django.core.mail import EmailMessage
 from django.core.validators import RegexValidator
 from django.db import models
+from django.utils import timezone
 
 ADMIN = "admin"
 MODERATOR = "moderator"
@@ -81,6 +85,12 @@ class User(AbstractUser):
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
         ordering = ("last_login", "username", "is_active")
+        indexes = [
+            models.Index(
+                fields=("last_login", "username", "is_active"),
+                name="user_ordering_idx",
+            )
+        ]
 
         constraints = [
             models.CheckConstraint(
@@ -94,3 +104,114 @@ class User(AbstractUser):
         String method for User model.
         """
         return str(self.username)
+
+
+class OutboxQuerySet(models.QuerySet):
+
+    def pending(self):
+        """
+        Messages still to be sent.
+        """
+        return self.filter(next_attempt__isnull=False)
+
+    def due(self, now=None):
+        """
+        Pending messages whose next attempt has come.
+        """
+        return self.filter(next_attempt__lte=now or timezone.now())
+
+    def stats(self):
+        """
+        Queue depth and age: pending, due and failed message counts
+        and the age of the oldest pending message in seconds.
+        """
+        now = timezone.now()
+        pending = self.pending().aggregate(
+            count=models.Count("id"), oldest=models.Min("created")
+        )
+        return {
+            "pending": pending["count"],
+            "due": self.due(now).count(),
+            "failed": self.filter(next_attempt__isnull=True).count(),
+            "oldest_age": (
+                (now - pending["oldest"]).total_seconds()
+                if pending["oldest"] else 0
+            ),
+        }
+
+
+class OutboxMessage(models.Model):
+    """
+    E-mail queued by a request and sent by the send_outbox command.
+    Sent messages are deleted; next_attempt is cleared once a message
+    has run out of attempts.
+    """
+
+    subject: str = models.CharField(verbose_name="Тема", max_length=255)
+    body: str = models.TextField(verbose_name="Текст")
+    recipient: str = models.EmailField(verbose_name="Получатель")
+    created = models.DateTimeField(
+        verbose_name="Дата создания",
+        auto_now_add=True,
+    )
+    attempts: int = models.PositiveSmallIntegerField(
+        verbose_name="Попытки отправки",
+        default=0,
+    )
+    next_attempt = models.DateTimeField(
+        verbose_name="Следующая попытка",
+        default=timezone.now,
+        null=True,
+        blank=True,
+    )
+    last_error: str = models.TextField(
+        verbose_name="Последняя ошибка",
+        blank=True,
+    )
+
+    objects = OutboxQuerySet.as_manager()
+
+    class Meta:
+        """
+        Meta class of OutboxMessage model.
+        """
+
+        verbose_name = "Письмо в очереди"
+        verbose_name_plural = "Очередь писем"
+        indexes = (
+            models.Index(
+                fields=("next_attempt", "id"),
+                name="outbox_next_attempt_idx",
+            ),
+        )
+
+    def __str__(self) -> str:
+        """
+        String method for OutboxMessage model.
+        """
+        return f"{self.recipient}: {self.subject}"
+
+    def as_email(self, connection=None) -> EmailMessage:
+        """
+        Build the message to send.
+        """
+        return EmailMessage(
+            subject=self.subject,
+            body=self.body,
+            to=[self.recipient],
+            connection=connection,
+        )
+
+    def fail(self, error, retry_delay, max_attempts) -> None:
+        """
+        Record a failed attempt and schedule the next one
+        after an exponentially growing delay.
+        """
+        self.attempts += 1
+        self.last_error = str(error)
+        if self.attempts >= max_attempts:
+            self.next_attempt = None
+        else:
+            self.next_attempt = timezone.now() + timedelta(
+                seconds=retry_delay * 2 ** (self.attempts - 1)
+            )
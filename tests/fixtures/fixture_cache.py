@@ -0,0 +1,10 @@
+import pytest
+from api.authentication import user_cache
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+    user_cache.clear()
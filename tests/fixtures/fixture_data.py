@@ -0,0 +1,46 @@
+import pytest
+from reviews.models import Categories, Genres, Review, Title
+
+
+@pytest.fixture
+def categories():
+    return [
+        Categories.objects.create(name='Фильм', slug='movie'),
+        Categories.objects.create(name='Книга', slug='book'),
+    ]
+
+
+@pytest.fixture
+def genres():
+    return [
+        Genres.objects.create(name='Драма', slug='drama'),
+        Genres.objects.create(name='Комедия', slug='comedy'),
+        Genres.objects.create(name='Рок', slug='rock'),
+    ]
+
+
+@pytest.fixture
+def make_title(categories, genres):
+    def _make_title(name='Побег из Шоушенка', year=1994, category=0,
+                    genre=(0,), description=None):
+        title = Title.objects.create(
+            name=name,
+            year=year,
+            category=categories[category] if category is not None else None,
+            description=description,
+        )
+        title.genre.set([genres[index] for index in genre])
+        return title
+    return _make_title
+
+
+@pytest.fixture
+def title(make_title):
+    return make_title()
+
+
+@pytest.fixture
+def review(title, user):
+    return Review.objects.create(
+        title=title, author=user, text='Отличный фильм', score=8
+    )
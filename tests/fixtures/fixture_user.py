@@ -0,0 +1,52 @@
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def make_client(user=None):
+    client = APIClient()
+    if user is not None:
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin', email='testadmin@yamdb.fake', role='admin'
+    )
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake'
+    )
+
+
+@pytest.fixture
+def another_user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUserAnother', email='testuseranother@yamdb.fake'
+    )
+
+
+@pytest.fixture
+def guest_client():
+    return make_client()
+
+
+@pytest.fixture
+def admin_client(admin):
+    return make_client(admin)
+
+
+@pytest.fixture
+def user_client(user):
+    return make_client(user)
+
+
+@pytest.fixture
+def another_user_client(another_user):
+    return make_client(another_user)
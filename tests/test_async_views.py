@@ -0,0 +1,104 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from api.async_views import ASGIHandler, async_view
+from api.urls import ASYNC_ROUTES, async_routes, router_v1
+from api.views import ReviewViewSet, TitleViewSet
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def test_async_routes_wrap_hot_reads():
+    routes = {
+        pattern.name: pattern for pattern in async_routes(router_v1.urls)
+    }
+    for name, pattern in routes.items():
+        assert asyncio.iscoroutinefunction(pattern.callback) == (
+            name in ASYNC_ROUTES
+        ), f'Проверьте, что асинхронным сделан только маршрут {name}'
+
+
+def asgi_get(path, user):
+    """Status and body of a GET served by the ASGI application."""
+    token = RefreshToken.for_user(user).access_token
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': b'',
+        'headers': [
+            (b'host', b'testserver'),
+            (b'authorization', f'Bearer {token}'.encode()),
+        ],
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(ASGIHandler()(scope, receive, send))
+    return messages[0]['status'], b''.join(
+        message.get('body', b'') for message in messages[1:]
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncViews:
+
+    def test_list_and_detail(self, title, review):
+        factory = APIRequestFactory()
+        titles = async_view(TitleViewSet.as_view({'get': 'list'}))
+        detail = async_view(TitleViewSet.as_view({'get': 'retrieve'}))
+        reviews = async_view(ReviewViewSet.as_view({'get': 'list'}))
+
+        async def fetch_all():
+            return await asyncio.gather(
+                titles(factory.get('/api/v1/titles/')),
+                detail(factory.get(f'/api/v1/titles/{title.id}/'),
+                       pk=str(title.id)),
+                reviews(factory.get(f'/api/v1/titles/{title.id}/reviews/'),
+                        title_id=str(title.id)),
+            )
+
+        responses = asyncio.run(fetch_all())
+        assert [response.status_code for response in responses] == [
+            200, 200, 200
+        ]
+        listed, shown, reviewed = (
+            json.loads(response.content) for response in responses
+        )
+        assert listed['results'][0]['id'] == title.id
+        assert shown['rating'] == review.score
+        assert reviewed['results'][0]['id'] == review.id
+
+    def test_writes_skip_the_pool(self):
+        threads = {}
+
+        def view(request):
+            threads[request.method] = threading.current_thread().name
+            return None
+
+        view.cls = TitleViewSet
+        wrapper = async_view(view)
+        factory = APIRequestFactory()
+        for request in (factory.get('/'), factory.post('/')):
+            asyncio.run(wrapper(request))
+        assert threads['GET'].startswith('async-view')
+        assert not threads['POST'].startswith('async-view'), (
+            'Проверьте, что изменяющие запросы не выполняются в пуле потоков '
+            'асинхронных представлений'
+        )
+        assert wrapper.cls is TitleViewSet
+
+    def test_asgi_export_streams(self, admin, review):
+        for path in ('/api/v1/export/titles/', '/api/v1/export/reviews/'):
+            status, body = asgi_get(path, admin)
+            assert status == 200
+            assert json.loads(body.decode().splitlines()[0])['id'] in (
+                review.id, review.title_id
+            ), f'Проверьте, что выгрузка {path} работает в режиме ASGI'
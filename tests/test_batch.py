@@ -0,0 +1,125 @@
+import pytest
+from api.serializers import BatchListSerializer, ReviewBatchSerializer
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import GenreTitle, Review, Title
+
+
+@pytest.mark.django_db
+class TestTitleBatch:
+    url = '/api/v1/titles/batch/'
+
+    def test_create(self, admin_client, categories, genres):
+        batch = [
+            {'name': f'Фильм {number}', 'year': 2000 + number,
+             'category': 'movie', 'genre': ['drama', 'comedy']}
+            for number in range(10)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.url, batch, format='json')
+        assert response.status_code == 201, response.json()
+        queries = [query['sql'] for query in context.captured_queries]
+        slug_lookups = [
+            sql for sql in queries
+            if sql.startswith('SELECT') and 'reviews_genretitle' not in sql
+            and 'reviews_title' not in sql
+            and ('"reviews_genres"' in sql or '"reviews_categories"' in sql)
+        ]
+        assert len(slug_lookups) == 2, (
+            'Проверьте, что slug категорий и жанров пакета '
+            'ищутся одним запросом на таблицу'
+        )
+        assert len([
+            sql for sql in queries if sql.startswith(
+                'INSERT INTO "reviews_genretitle"'
+            )
+        ]) == 1, 'Проверьте, что связи с жанрами вставляются одним запросом'
+        data = response.json()
+        assert [item['name'] for item in data] == [
+            item['name'] for item in batch
+        ]
+        assert sorted(data[0]['genre']) == ['comedy', 'drama']
+        assert Title.objects.count() == 10
+        assert GenreTitle.objects.count() == 20
+
+    def test_errors_by_position(self, admin_client, categories, genres):
+        batch = [
+            {'name': 'Хороший', 'year': 2000, 'category': 'movie',
+             'genre': ['drama']},
+            {'name': 'Плохой', 'year': 2000, 'category': 'music',
+             'genre': ['drama', 'jazz']},
+            {'name': 'Без года', 'category': 'movie', 'genre': []},
+        ]
+        response = admin_client.post(self.url, batch, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert set(errors[1]) == {'category', 'genre'}
+        assert set(errors[2]) == {'year'}
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке в одном элементе '
+            'пакет не сохраняется целиком'
+        )
+
+    def test_admin_only(self, user_client, categories, genres):
+        response = user_client.post(self.url, [], format='json')
+        assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestReviewBatch:
+    url = '/api/v1/reviews/batch/'
+
+    def test_create(self, user_client, make_title):
+        titles = [make_title(name=f'Фильм {number}') for number in range(3)]
+        batch = [
+            {'title': title.id, 'text': 'Отзыв', 'score': index + 5}
+            for index, title in enumerate(titles)
+        ]
+        response = user_client.post(self.url, batch, format='json')
+        assert response.status_code == 201, response.json()
+        assert [item['score'] for item in response.json()] == [5, 6, 7]
+        for index, title in enumerate(titles):
+            title.refresh_from_db()
+            assert (title.score_sum, title.score_count) == (index + 5, 1), (
+                'Проверьте, что пакет отзывов обновляет рейтинги произведений'
+            )
+
+    def test_errors_by_position(self, user_client, review, make_title):
+        other = make_title(name='Другой')
+        batch = [
+            {'title': other.id, 'text': 'Отзыв', 'score': 5},
+            {'title': review.title_id, 'text': 'Повтор', 'score': 5},
+            {'title': other.id, 'text': 'Дубль', 'score': 5},
+            {'title': 999, 'text': 'Нет такого', 'score': 5},
+            {'title': other.id, 'text': 'Оценка', 'score': 11},
+        ]
+        response = user_client.post(self.url, batch, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert 'non_field_errors' in errors[1]
+        assert 'non_field_errors' in errors[2]
+        assert 'title' in errors[3]
+        assert 'score' in errors[4]
+        assert Review.objects.count() == 1
+
+    def test_requires_auth(self, guest_client):
+        assert guest_client.post(self.url, [], format='json').status_code == 401
+
+    def test_add_scores(self, make_title):
+        first, second = make_title(), make_title(name='Другой')
+        Title.objects.filter(pk=first.pk).update(score_sum=4, score_count=1)
+        assert Title.objects.add_scores({first.pk: 10, second.pk: 3}) == 2
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.score_sum, first.score_count) == (14, 2)
+        assert (second.score_sum, second.score_count) == (3, 1)
+
+
+def test_batch_list_requires_resolve():
+    class Unresolved(BatchListSerializer):
+        pass
+
+    with pytest.raises(TypeError):
+        Unresolved(child=ReviewBatchSerializer())
@@ -0,0 +1,62 @@
+import json
+from io import StringIO
+
+import pytest
+from api import benchmark
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from reviews.models import Review
+
+
+def benchmark_routes(*args):
+    call_command(
+        'benchmark_routes', '--iterations', '2', '--warmup', '0', *args,
+        stdout=StringIO(), stderr=StringIO(),
+    )
+
+
+@pytest.mark.django_db
+class TestBenchmarkRoutes:
+
+    @pytest.fixture(autouse=True)
+    def dataset(self):
+        call_command(
+            'generate_dataset', '--users', '20', '--titles', '15',
+            '--reviews', '100', '--comments-per-review', '2',
+            stdout=StringIO(),
+        )
+
+    def test_every_route_succeeds(self, tmp_path):
+        reviews = Review.objects.count()
+        output = tmp_path / 'benchmark.json'
+        benchmark_routes('--output', str(output))
+        results = json.loads(output.read_text(encoding='utf-8'))
+        assert set(results['routes']) == {
+            scenario.name for scenario in benchmark.SCENARIOS
+        }
+        for name, result in results['routes'].items():
+            assert not result['errors'], (
+                f'Проверьте, что запрос {name} выполняется успешно: '
+                f'статус {result["status"]}'
+            )
+            assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+        assert results['routes']['reviews-create']['queries'] > 0
+        assert Review.objects.count() == reviews, (
+            'Проверьте, что бенчмарк не оставляет изменений в базе'
+        )
+
+    def test_baseline_comparison(self, tmp_path):
+        baseline = tmp_path / 'baseline.json'
+        benchmark_routes('--route', 'reviews-*', '--output', str(baseline))
+        results = json.loads(baseline.read_text(encoding='utf-8'))
+        for result in results['routes'].values():
+            # Only the query count is compared: timings are noisy.
+            result['p95_ms'] = result['peak_kib'] = 10 ** 6
+        results['routes']['reviews-list']['queries'] -= 1
+        baseline.write_text(json.dumps(results), encoding='utf-8')
+        output = str(tmp_path / 'current.json')
+        with pytest.raises(CommandError, match='1 regressions'):
+            benchmark_routes(
+                '--route', 'reviews-*', '--output', output,
+                '--baseline', str(baseline),
+            )
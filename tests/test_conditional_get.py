@@ -0,0 +1,68 @@
+import pytest
+from reviews.models import Review
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def revalidate(client, url, response, **params):
+    return client.get(
+        url, params, HTTP_IF_NONE_MATCH=response['ETag']
+    )
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    @pytest.mark.parametrize('url', (
+        TITLES_URL, '/api/v1/categories/', '/api/v1/genres/'
+    ))
+    def test_lists_answer_not_modified(self, guest_client, title, url):
+        response = guest_client.get(url)
+        assert response.status_code == 200 and response.has_header('ETag')
+        assert revalidate(guest_client, url, response).status_code == 304, (
+            'Проверьте, что неизменившийся список отдаёт 304 Not Modified'
+        )
+
+    def test_not_modified_skips_serialization(
+            self, guest_client, title, django_assert_max_num_queries):
+        url = f'{TITLES_URL}{title.id}/'
+        response = guest_client.get(url)
+        assert response.has_header('Last-Modified')
+        with django_assert_max_num_queries(1):
+            assert revalidate(guest_client, url, response).status_code == 304
+
+    def test_review_write_changes_validators(self, guest_client, title, user):
+        urls = (
+            TITLES_URL,
+            f'{TITLES_URL}{title.id}/',
+            f'{TITLES_URL}{title.id}/reviews/',
+        )
+        responses = [guest_client.get(url) for url in urls]
+        Review.objects.create(title=title, author=user, text='text', score=7)
+        for url, response in zip(urls, responses):
+            assert revalidate(guest_client, url, response).status_code == 200, (
+                f'Проверьте, что новый отзыв меняет ETag для {url}'
+            )
+
+    def test_title_delete_with_if_modified_since(self, guest_client,
+                                                 make_title):
+        make_title(name='Первое', year=2000)
+        deleted = make_title(name='Второе', year=2001)
+        response = guest_client.get(TITLES_URL)
+        assert not response.has_header('Last-Modified')
+        deleted.delete()
+        response = guest_client.get(
+            TITLES_URL, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT'
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что удаление произведения не даёт устаревший 304 '
+            'по If-Modified-Since'
+        )
+        assert response.json()['count'] == 1
+
+    def test_genre_delete_changes_validators(self, guest_client, title,
+                                             genres):
+        url = f'{TITLES_URL}{title.id}/'
+        response = guest_client.get(url)
+        genres[0].delete()
+        assert revalidate(guest_client, url, response).status_code == 200
@@ -0,0 +1,126 @@
+import time
+
+import pytest
+from api import connections
+
+
+class FakeConnection:
+    """Open database connection as seen by the request handlers."""
+
+    def __init__(self, age_left=60, usable=True, health_checks=True):
+        self.connection = object()
+        self.close_at = time.monotonic() + age_left
+        self.in_atomic_block = False
+        self.usable = usable
+        self.pings = 0
+        self.settings_dict = {'CONN_HEALTH_CHECKS': health_checks}
+
+    def ensure_connection(self):
+        if self.connection is None:
+            self.connection = object()
+            self.usable = True
+
+    def close(self):
+        self.connection = None
+
+    def close_if_unusable_or_obsolete(self):
+        pass
+
+    def is_usable(self):
+        self.pings += 1
+        return self.usable
+
+
+@pytest.fixture
+def fake_connections(monkeypatch):
+    def _fake_connections(*fakes):
+        monkeypatch.setattr(
+            connections, 'connections',
+            type('Handler', (), {'all': lambda self: list(fakes)})()
+        )
+        connections.stats.reset()
+        return fakes
+    yield _fake_connections
+    connections.stats.reset()
+
+
+class TestConnectionHandlers:
+
+    def test_reuse_expire_and_health_check(self, fake_connections):
+        healthy, expired, broken, unchecked, in_transaction = (
+            fake_connections(
+                FakeConnection(),
+                FakeConnection(age_left=-1),
+                FakeConnection(usable=False),
+                FakeConnection(usable=False, health_checks=False),
+                FakeConnection(age_left=-1),
+            )
+        )
+        in_transaction.in_atomic_block = True
+        connections.prepare_connections()
+        assert healthy.connection is not None
+        assert expired.connection is None, (
+            'Проверьте, что соединение старше CONN_MAX_AGE закрывается'
+        )
+        assert healthy.pings == broken.pings == 0, (
+            'Проверьте, что соединение проверяется только при обращении '
+            'к базе'
+        )
+        for fake in (healthy, broken, unchecked, broken):
+            fake.ensure_connection()
+        assert healthy.pings == broken.pings == 1
+        assert broken.connection is not None and broken.usable, (
+            'Проверьте, что сломанное соединение открывается заново '
+            'при первом обращении'
+        )
+        assert unchecked.pings == 0
+        assert in_transaction.connection is not None, (
+            'Проверьте, что соединение внутри транзакции не закрывается'
+        )
+        stats = connections.stats.snapshot()
+        assert (
+            stats['reused'], stats['expired'], stats['unhealthy']
+        ) == (3, 1, 1)
+
+    def test_release_closes_expired_only(self, fake_connections):
+        healthy, expired = fake_connections(
+            FakeConnection(usable=False), FakeConnection(age_left=-1)
+        )
+        connections.release_connections()
+        assert healthy.connection is not None
+        assert expired.connection is None
+        assert connections.stats.snapshot()['expired'] == 1
+
+    def test_unused_health_check_dropped(self, fake_connections):
+        unused, = fake_connections(FakeConnection())
+        connections.prepare_connections()
+        connections.release_connections()
+        unused.ensure_connection()
+        assert unused.pings == 0, (
+            'Проверьте, что проверка соединения не переходит за пределы '
+            'запроса'
+        )
+
+    @pytest.mark.django_db
+    def test_cached_response_no_ping(self, fake_connections, guest_client,
+                                     title):
+        guest_client.get('/api/v1/titles/')
+        fake, = fake_connections(FakeConnection())
+        assert guest_client.get('/api/v1/titles/').status_code == 200
+        assert fake.pings == 0, (
+            'Проверьте, что ответ из кэша не проверяет соединение с базой'
+        )
+        assert connections.stats.snapshot()['reused'] == 1
+
+
+@pytest.mark.django_db
+class TestConnectionStats:
+
+    def test_admin_only(self, user_client, admin_client):
+        url = '/api/v1/stats/connections/'
+        assert user_client.get(url).status_code == 403
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        assert set(connections.ConnectionStats.FIELDS) | {
+            'pid', 'conn_max_age', 'health_checks'
+        } <= set(response.json())
@@ -0,0 +1,42 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+
+def snapshot():
+    return {
+        model: list(model.objects.order_by('pk').values())
+        for model in (User, Title, Review, Comment)
+    }
+
+
+@pytest.mark.django_db
+class TestDataset:
+
+    @pytest.mark.parametrize('fmt', ('ndjson', 'csv'))
+    def test_dump_and_restore(self, tmp_path, fmt, review, another_user):
+        Comment.objects.create(review=review, author=another_user, text='Да')
+        before = snapshot()
+        call_command(
+            'dump_dataset', '--output-dir', str(tmp_path), '--format', fmt,
+            '--chunk-size', '2', stdout=StringIO(),
+        )
+        assert (tmp_path / f'reviews_review.{fmt}.gz').exists()
+        call_command(
+            'restore_dataset', '--input-dir', str(tmp_path), '--truncate',
+            '--batch-size', '2', stdout=StringIO(),
+        )
+        assert snapshot() == before, (
+            'Проверьте, что restore_dataset восстанавливает данные '
+            'из dump_dataset без изменений'
+        )
+
+    def test_restore_skips_existing_rows(self, tmp_path, review):
+        call_command('dump_dataset', '--output-dir', str(tmp_path),
+                     stdout=StringIO())
+        call_command('restore_dataset', '--input-dir', str(tmp_path),
+                     stdout=StringIO())
+        assert Review.objects.count() == 1
@@ -0,0 +1,66 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from reviews.models import Review
+
+
+def read_ndjson(response):
+    body = b''.join(response.streaming_content).decode()
+    return [json.loads(line) for line in body.splitlines()]
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_admin_only(self, guest_client, user_client):
+        for client, status in ((guest_client, 401), (user_client, 403)):
+            for url in ('/api/v1/export/titles/', '/api/v1/export/reviews/'):
+                assert client.get(url).status_code == status, (
+                    'Проверьте, что выгрузка доступна только администратору'
+                )
+
+    def test_titles_ndjson(self, admin_client, review, make_title):
+        second = make_title(name='Крестный отец', genre=(0, 1))
+        response = admin_client.get('/api/v1/export/titles/')
+        assert response.status_code == 200
+        assert response.streaming
+        rows = read_ndjson(response)
+        assert [row['id'] for row in rows] == [review.title_id, second.id]
+        assert rows[0]['rating'] == 8
+        assert rows[1]['genre'] == ['comedy', 'drama']
+        assert rows[1]['category'] == 'movie'
+
+        response = admin_client.get(
+            '/api/v1/export/titles/', {'id_after': review.title_id}
+        )
+        assert [row['id'] for row in read_ndjson(response)] == [second.id], (
+            'Проверьте, что id_after продолжает выгрузку после указанного id'
+        )
+
+    def test_titles_updated_since(self, admin_client, title, make_title):
+        second = make_title(name='Крестный отец')
+        response = admin_client.get(
+            '/api/v1/export/titles/',
+            {'updated_since': second.modified.isoformat()},
+        )
+        assert [row['id'] for row in read_ndjson(response)] == [second.id]
+
+    def test_reviews_csv(self, admin_client, review, another_user):
+        other = Review.objects.create(
+            title=review.title, author=another_user, text='Скучно', score=3
+        )
+        response = admin_client.get(
+            '/api/v1/export/reviews/',
+            {'output': 'csv', 'title': review.title_id},
+        )
+        assert response['Content-Type'].startswith('text/csv')
+        body = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(body)))
+        assert [row['id'] for row in rows] == [str(review.id), str(other.id)]
+        assert rows[1]['author'] == another_user.username
+
+    def test_reviews_of_missing_title(self, admin_client):
+        response = admin_client.get('/api/v1/export/reviews/', {'title': 999})
+        assert response.status_code == 404
@@ -0,0 +1,78 @@
+import random
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F
+from reviews.models import Comment, Review, Title
+from reviews.synthetic import zipf_counts
+
+SIZES = (
+    '--users', '60', '--titles', '40', '--reviews', '600',
+    '--comments-per-review', '2', '--batch-size', '50',
+)
+
+
+def generate_dataset(*args):
+    call_command('generate_dataset', *SIZES, *args, stdout=StringIO())
+
+
+def snapshot():
+    return (
+        list(Review.objects.order_by('pk').values_list(
+            'title_id', 'author_id', 'score', 'text', 'pub_date'
+        )),
+        list(Comment.objects.order_by('pk').values_list(
+            'review_id', 'author_id', 'text', 'pub_date'
+        )),
+    )
+
+
+def test_zipf_counts():
+    counts = zipf_counts(1000, 10, 1.0, 200, random.Random(0))
+    assert sum(counts) == 1000
+    assert counts[0] == 200, 'Проверьте, что число отзывов ограничено'
+    assert counts == sorted(counts, reverse=True)
+
+
+@pytest.mark.django_db
+class TestGenerateDataset:
+
+    def test_skewed_catalog(self):
+        generate_dataset('--truncate')
+        assert Review.objects.count() == 600
+        per_title = sorted(
+            Title.objects.annotate(count=Count('reviews'))
+            .values_list('count', flat=True)
+        )
+        assert per_title[-1] >= 4 * per_title[len(per_title) // 2], (
+            'Проверьте, что число отзывов на произведение распределено '
+            'по закону Ципфа'
+        )
+        per_user = sorted(
+            Review.objects.order_by().values('author')
+            .annotate(count=Count('id'))
+            .values_list('count', flat=True)
+        )
+        assert per_user[-1] >= 4 * per_user[len(per_user) // 2]
+        assert Comment.objects.exists()
+        assert not Comment.objects.filter(
+            pub_date__lt=F('review__pub_date')
+        ).exists(), 'Проверьте, что комментарии идут после отзыва'
+        title = Title.objects.order_by('-score_count').first()
+        assert title.score_count == per_title[-1], (
+            'Проверьте, что после генерации пересчитываются рейтинги'
+        )
+
+    def test_same_seed_same_rows(self):
+        generate_dataset('--truncate', '--seed', '7')
+        first = snapshot()
+        generate_dataset('--truncate', '--seed', '7')
+        assert snapshot() == first
+        generate_dataset('--truncate', '--seed', '8')
+        assert snapshot() != first
+
+    def test_adds_after_existing_rows(self, review):
+        generate_dataset()
+        assert Review.objects.count() == 601
+        assert Review.objects.filter(pk=review.pk).exists()
@@ -0,0 +1,75 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from reviews.models import Comment, GenreTitle, Review, Title
+
+User = get_user_model()
+
+
+def index_name(model, name):
+    """
+    Database name of a model index or constraint: SQLite names the
+    index of a unique constraint sqlite_autoindex_<table>_<n>.
+    """
+    if connection.vendor != 'sqlite':
+        return name
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        constraint = connection.introspection.get_constraints(
+            cursor, table
+        )[name]
+        if constraint['index']:
+            return name
+        for row in cursor.execute(f'PRAGMA index_list({table})').fetchall():
+            columns = [
+                info[2] for info in
+                cursor.execute(f'PRAGMA index_info({row[1]})').fetchall()
+            ]
+            if columns == constraint['columns']:
+                return row[1]
+    return name
+
+
+def query_plan(queryset):
+    if connection.vendor == 'postgresql':
+        # Tiny test tables are cheaper to scan whole.
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    return queryset.explain()
+
+
+@pytest.mark.django_db
+class TestIndexes:
+
+    def test_hot_queries_use_indexes(self, title, review, user):
+        genre = title.genre.first()
+        queries = (
+            (
+                Review.objects.filter(title=title)[:10],
+                Review, 'review_title_pub_date_idx',
+            ),
+            (
+                Comment.objects.filter(review=review)[:10],
+                Comment, 'comment_review_pub_date_idx',
+            ),
+            (
+                GenreTitle.objects.filter(genre=genre).values('title_id'),
+                GenreTitle, 'genretitle_genre_title_idx',
+            ),
+            (
+                GenreTitle.objects.filter(title=title).values('genre_id'),
+                GenreTitle, 'unique_genre_title',
+            ),
+            (
+                Title.objects.filter(
+                    category=title.category_id, year__gte=1990
+                ),
+                Title, 'title_category_year_idx',
+            ),
+            (User.objects.all()[:10], User, 'user_ordering_idx'),
+        )
+        for queryset, model, name in queries:
+            plan = query_plan(queryset)
+            assert index_name(model, name) in plan, (
+                f'Проверьте, что запрос использует индекс {name}: {plan}'
+            )
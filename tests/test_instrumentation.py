@@ -0,0 +1,72 @@
+import json
+import logging
+
+import pytest
+from django.conf import settings as django_settings
+
+MIDDLEWARE = 'api.instrumentation.InstrumentationMiddleware'
+
+
+@pytest.fixture
+def instrumented(settings):
+    settings.MIDDLEWARE = [MIDDLEWARE, *django_settings.MIDDLEWARE]
+    return settings
+
+
+def server_timing(response):
+    return {
+        part.split(';')[0]: part for part in
+        response['Server-Timing'].split(', ')
+    }
+
+
+def log_records(caplog, event):
+    return [
+        json.loads(record.getMessage()) for record in caplog.records
+        if record.name.startswith('api.instrumentation')
+        and f'"event": "{event}"' in record.getMessage()
+    ]
+
+
+@pytest.mark.django_db
+class TestInstrumentation:
+
+    def test_off_by_default(self, guest_client, title):
+        assert MIDDLEWARE not in django_settings.MIDDLEWARE
+        response = guest_client.get(f'/api/v1/titles/{title.id}/')
+        assert 'Server-Timing' not in response
+
+    def test_server_timing_and_log(self, instrumented, user_client, title,
+                                   review, caplog,
+                                   django_assert_max_num_queries):
+        caplog.set_level(logging.INFO, logger='api.instrumentation')
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with django_assert_max_num_queries(10) as captured:
+            response = user_client.get(url)
+        assert response.status_code == 200
+        timing = server_timing(response)
+        assert set(timing) == {'db', 'app', 'serialize', 'total'}, (
+            'Проверьте, что заголовок Server-Timing содержит время SQL, '
+            'представления, сериализации и всего запроса'
+        )
+        assert f'desc="{len(captured)} queries"' in timing['db']
+        (record,) = log_records(caplog, 'request')
+        assert record['view'] == 'reviews-list'
+        assert record['path'] == url
+        assert record['status'] == 200
+        assert record['queries'] == len(captured)
+        for phase in ('db_ms', 'app_ms', 'serialize_ms'):
+            assert 0 <= record[phase] <= record['total_ms']
+
+    def test_slow_request_and_query_logs(self, instrumented, guest_client,
+                                         title, caplog):
+        instrumented.INSTRUMENTATION_SLOW_REQUEST_MS = 0
+        instrumented.INSTRUMENTATION_SLOW_QUERY_MS = 0
+        guest_client.get(f'/api/v1/titles/{title.id}/')
+        (request,) = log_records(caplog, 'slow_request')
+        assert request['slowest_queries'], (
+            'Проверьте, что медленный запрос логируется с его SQL'
+        )
+        queries = log_records(caplog, 'slow_query')
+        assert len(queries) == request['queries']
+        assert 'reviews_title' in queries[0]['sql']
@@ -0,0 +1,65 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from reviews.models import Review
+
+
+@pytest.fixture
+def many_reviews(title, django_user_model):
+    reviews = []
+    for number in range(25):
+        author = django_user_model.objects.create_user(
+            username=f'reviewer{number}', email=f'reviewer{number}@yamdb.fake'
+        )
+        reviews.append(Review.objects.create(
+            title=title, author=author, text=f'Отзыв {number}', score=5
+        ))
+    # Half of the reviews share a timestamp to exercise the id tie-break.
+    Review.objects.filter(
+        pk__in=[review.pk for review in reviews[5:18]]
+    ).update(pub_date=timezone.now())
+    return reviews
+
+
+def reviews_url(title_id):
+    return f'/api/v1/titles/{title_id}/reviews/'
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_walk_forward_and_back(self, guest_client, many_reviews):
+        url = reviews_url(many_reviews[0].title_id)
+        data = guest_client.get(
+            url, {'pagination': 'cursor', 'limit': 10}
+        ).json()
+        assert 'count' not in data and data['previous'] is None
+        pages = [data]
+        while data['next']:
+            data = guest_client.get(data['next']).json()
+            pages.append(data)
+        forward = [review['id'] for page in pages for review in page['results']]
+        expected = list(Review.objects.order_by('pub_date', 'id')
+                        .values_list('id', flat=True))
+        assert forward == expected, (
+            'Проверьте, что курсорная пагинация проходит все отзывы '
+            'без пропусков и повторов'
+        )
+        previous = guest_client.get(pages[-1]['previous']).json()
+        assert previous['results'] == pages[-2]['results']
+        with CaptureQueriesContext(connection) as queries:
+            guest_client.get(pages[1]['next'])
+        assert not any('COUNT(' in query['sql'] for query in queries), (
+            'Проверьте, что курсорная пагинация не выполняет COUNT(*)'
+        )
+
+    def test_limit_offset_still_default(self, guest_client, many_reviews):
+        data = guest_client.get(
+            reviews_url(many_reviews[0].title_id), {'limit': 5, 'offset': 20}
+        ).json()
+        assert data['count'] == 25 and len(data['results']) == 5
+
+    def test_invalid_cursor(self, guest_client, title):
+        response = guest_client.get(reviews_url(title.id), {'cursor': 'junk'})
+        assert response.status_code == 404
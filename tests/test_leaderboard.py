@@ -0,0 +1,153 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from reviews.models import Review, TitleRank
+
+TOP_URL = '/api/v1/titles/top/'
+TRENDING_URL = '/api/v1/titles/trending/'
+
+
+@pytest.fixture
+def reviewers(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'reviewer{index}', email=f'reviewer{index}@yamdb.fake'
+        )
+        for index in range(10)
+    ]
+
+
+@pytest.fixture
+def make_reviews(reviewers):
+    def _make_reviews(title, *scores):
+        return [
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+            for author, score in zip(reviewers, scores)
+        ]
+    return _make_reviews
+
+
+@pytest.fixture
+def ranked_titles(make_title, make_reviews):
+    """One perfect review, many good ones, mixed ones and none."""
+    single = make_title(name='Один отзыв', category=0, genre=(0,))
+    make_reviews(single, 10)
+    popular = make_title(name='Много отзывов', category=1, genre=(0, 1))
+    make_reviews(popular, *[9] * 10)
+    mixed = make_title(name='Разные отзывы', category=0, genre=(1,))
+    make_reviews(mixed, 3, 4, 5)
+    unreviewed = make_title(name='Без отзывов', category=0, genre=(2,))
+    return single, popular, mixed, unreviewed
+
+
+def result_ids(response):
+    assert response.status_code == 200
+    return [row['title']['id'] for row in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestLeaderboard:
+
+    def test_top_is_bayesian(self, guest_client, ranked_titles):
+        single, popular, mixed, _ = ranked_titles
+        response = guest_client.get(TOP_URL)
+        assert result_ids(response) == [popular.id, single.id, mixed.id], (
+            'Проверьте, что /titles/top/ упорядочен по взвешенной оценке '
+            'и не содержит произведений без отзывов'
+        )
+        row = response.json()['results'][0]
+        assert row['weighted_rating'] == pytest.approx(
+            (10 * 5.5 + 90) / (10 + 10)
+        )
+        assert row['title']['name'] == 'Много отзывов'
+
+    def test_scopes(self, guest_client, ranked_titles):
+        single, popular, mixed, _ = ranked_titles
+        assert result_ids(
+            guest_client.get(TOP_URL, {'category': 'movie'})
+        ) == [single.id, mixed.id]
+        assert result_ids(
+            guest_client.get(TOP_URL, {'genre': 'comedy'})
+        ) == [popular.id, mixed.id]
+        assert result_ids(guest_client.get(TOP_URL, {'genre': 'none'})) == []
+        response = guest_client.get(
+            TOP_URL, {'genre': 'drama', 'category': 'movie'}
+        )
+        assert response.status_code == 400
+
+    def test_keyset_pages(self, guest_client, ranked_titles,
+                          django_assert_num_queries):
+        single, popular, mixed, _ = ranked_titles
+        # Leaderboard rows with their titles and categories, then genres.
+        with django_assert_num_queries(2):
+            response = guest_client.get(TOP_URL, {'limit': 2})
+        assert result_ids(response) == [popular.id, single.id]
+        next_url = response.json()['next']
+        response = guest_client.get(next_url)
+        assert result_ids(response) == [mixed.id], (
+            'Проверьте, что страницы рейтинга продолжаются по курсору'
+        )
+        assert response.json()['next'] is None
+        previous = guest_client.get(response.json()['previous'])
+        assert result_ids(previous) == [popular.id, single.id]
+
+    def test_rescored_on_review_changes(self, guest_client, ranked_titles,
+                                        reviewers):
+        single, popular, mixed, _ = ranked_titles
+        Review.objects.filter(title=popular).delete()
+        for author in reviewers[3:]:
+            Review.objects.create(
+                title=mixed, author=author, text='Отзыв', score=10
+            )
+        assert result_ids(guest_client.get(TOP_URL)) == [
+            mixed.id, single.id
+        ], 'Проверьте, что рейтинг пересчитывается при изменении отзывов'
+
+    def test_moves_between_scopes(self, guest_client, ranked_titles,
+                                  categories, genres):
+        single, popular, mixed, _ = ranked_titles
+        single.refresh_from_db()
+        single.category = categories[1]
+        single.save()
+        single.genre.set([genres[1]])
+        assert result_ids(
+            guest_client.get(TOP_URL, {'category': 'book'})
+        ) == [popular.id, single.id]
+        assert result_ids(
+            guest_client.get(TOP_URL, {'genre': 'drama'})
+        ) == [popular.id]
+        genres[1].delete()
+        assert not TitleRank.objects.filter(
+            scope=f'genre:{genres[1].pk}'
+        ).exists()
+
+    def test_trending_window(self, guest_client, ranked_titles):
+        single, popular, mixed, _ = ranked_titles
+        response = guest_client.get(TRENDING_URL)
+        assert result_ids(response) == [popular.id, mixed.id, single.id]
+        assert response.json()['results'][0]['reviews_per_day'] == (
+            pytest.approx(10 / 7)
+        )
+        Review.objects.filter(title=popular).update(
+            pub_date=timezone.now() - timedelta(days=8)
+        )
+        call_command('refresh_leaderboards', stdout=StringIO())
+        assert result_ids(guest_client.get(TRENDING_URL)) == [
+            mixed.id, single.id
+        ], 'Проверьте, что старые отзывы выпадают из окна популярности'
+
+    def test_rebuild(self, guest_client, ranked_titles):
+        TitleRank.objects.all().delete()
+        output = StringIO()
+        call_command('refresh_leaderboards', '--rebuild', stdout=output)
+        assert 'rebuilt for 4 titles' in output.getvalue()
+        single, popular, mixed, unreviewed = ranked_titles
+        assert result_ids(guest_client.get(TOP_URL)) == [
+            popular.id, single.id, mixed.id
+        ]
+        assert TitleRank.objects.filter(title=unreviewed).count() == 3
@@ -0,0 +1,63 @@
+import os
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from reviews.models import Comment, GenreTitle, Review, Title
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static', 'data')
+
+
+def load_csv(*args):
+    call_command('load_csv', *args, stdout=StringIO())
+
+
+@pytest.mark.django_db
+class TestLoadCsv:
+
+    def test_loads_bundled_data(self):
+        load_csv('--batch-size', '7')
+        assert Title.objects.count() == 32
+        assert GenreTitle.objects.count() == 42
+        assert Comment.objects.count() == 3
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что загрузчик сохраняет дату публикации из файла'
+        )
+        title = Title.objects.get(pk=review.title_id)
+        assert title.score_count == title.reviews.count(), (
+            'Проверьте, что после загрузки пересчитываются рейтинги'
+        )
+
+    def test_reload_is_idempotent(self):
+        load_csv()
+        reviews = Review.objects.count()
+        load_csv()
+        assert Review.objects.count() == reviews
+        load_csv('--truncate')
+        assert Review.objects.count() == reviews
+
+    def test_new_rows_get_free_ids(self, admin):
+        load_csv()
+        review = Review.objects.create(
+            title_id=1, author=admin, text='Новый отзыв', score=5
+        )
+        assert review.pk > Review.objects.exclude(pk=review.pk).latest(
+            'pk'
+        ).pk
+
+    def test_dangling_foreign_key(self, tmp_path):
+        for name in ('category.csv', 'titles.csv'):
+            with open(os.path.join(DATA_DIR, name), encoding='utf-8') as src:
+                (tmp_path / name).write_text(src.read(), encoding='utf-8')
+        (tmp_path / 'genre_title.csv').write_text(
+            'id,title_id,genre_id\n1,1,999\n', encoding='utf-8'
+        )
+        with pytest.raises(CommandError):
+            load_csv('--data-dir', str(tmp_path))
+        assert not GenreTitle.objects.exists(), (
+            'Проверьте, что файл с битыми внешними ключами не загружается'
+        )
+        assert Title.objects.count() == 32
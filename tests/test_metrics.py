@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from api.async_views import async_view
+from api.metrics import QueryCounter
+from api.views import TitleViewSet
+from django.conf import settings as django_settings
+from prometheus_client import REGISTRY
+from rest_framework.test import APIRequestFactory
+
+MIDDLEWARE = 'api.metrics.MetricsMiddleware'
+
+
+@pytest.fixture
+def metrics(settings, monkeypatch):
+    monkeypatch.delenv('PROMETHEUS_MULTIPROC_DIR', raising=False)
+    settings.METRICS = True
+    settings.MIDDLEWARE = [MIDDLEWARE, *django_settings.MIDDLEWARE]
+    return settings
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_off_by_default(self, guest_client):
+        assert MIDDLEWARE not in django_settings.MIDDLEWARE
+        response = guest_client.get('/metrics')
+        assert response.status_code == 404, (
+            'Проверьте, что без METRICS=True метрики не отдаются'
+        )
+
+    def test_route_metrics(self, metrics, guest_client, title):
+        labels = {'route': 'titles-detail', 'method': 'GET'}
+        before = {
+            'requests': sample('yamdb_http_requests_total', **labels),
+            'ok': sample(
+                'yamdb_http_responses_total', status='200', **labels
+            ),
+            'latency': sample(
+                'yamdb_http_request_duration_seconds_count', **labels
+            ),
+            'queries': sample('yamdb_db_queries_per_request_sum', **labels),
+        }
+        guest_client.get(f'/api/v1/titles/{title.id}/')
+        guest_client.get('/api/v1/titles/0/')
+        assert sample(
+            'yamdb_http_requests_total', **labels
+        ) == before['requests'] + 2, (
+            'Проверьте, что запросы считаются по имени маршрута и методу'
+        )
+        assert sample(
+            'yamdb_http_responses_total', status='200', **labels
+        ) == before['ok'] + 1
+        assert sample(
+            'yamdb_http_responses_total', status='404', **labels
+        ) >= 1
+        assert sample(
+            'yamdb_http_request_duration_seconds_count', **labels
+        ) == before['latency'] + 2
+        assert sample(
+            'yamdb_db_queries_per_request_sum', **labels
+        ) > before['queries']
+
+    def test_unmatched_route(self, metrics, guest_client):
+        labels = {'route': 'unmatched', 'method': 'GET'}
+        before = sample('yamdb_http_requests_total', **labels)
+        guest_client.get('/no/such/page/')
+        assert sample('yamdb_http_requests_total', **labels) == before + 1, (
+            'Проверьте, что неизвестные адреса не создают новых меток'
+        )
+
+    def test_exposition(self, metrics, guest_client, title):
+        guest_client.get(f'/api/v1/titles/{title.id}/')
+        response = guest_client.get('/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        body = response.content.decode()
+        assert 'yamdb_http_requests_total{' in body
+        assert 'yamdb_outbox_pending_messages 0.0' in body, (
+            'Проверьте, что метрики содержат состояние очереди писем'
+        )
+
+    @pytest.mark.parametrize('meta', [
+        {'HTTP_X_FORWARDED_FOR': '8.8.8.8'},
+        {'REMOTE_ADDR': '8.8.8.8'},
+    ])
+    def test_external_callers_forbidden(self, metrics, guest_client, meta):
+        response = guest_client.get('/metrics', **meta)
+        assert response.status_code == 403, (
+            'Проверьте, что метрики доступны только из внутренней сети'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_view_queries_counted(title):
+    request = APIRequestFactory().get('/api/v1/titles/')
+    request.query_counter = QueryCounter()
+    view = async_view(TitleViewSet.as_view({'get': 'list'}))
+    assert asyncio.run(view(request)).status_code == 200
+    assert request.query_counter.count > 0, (
+        'Проверьте, что запросы асинхронных представлений попадают '
+        'в метрики'
+    )
@@ -0,0 +1,96 @@
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+from users.models import OutboxMessage
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise OSError('Mail server is down')
+
+
+def send_outbox(*args):
+    out = StringIO()
+    call_command('send_outbox', *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def test_signup_queues_code(self, guest_client):
+        response = guest_client.post(
+            '/api/v1/auth/signup/',
+            {'email': 'new@yamdb.fake', 'username': 'newbie'},
+        )
+        assert response.status_code == 200
+        assert not mail.outbox, (
+            'Проверьте, что регистрация не отправляет письмо в запросе'
+        )
+        message = OutboxMessage.objects.get()
+        assert message.recipient == 'new@yamdb.fake'
+        assert 'confirmation code' in message.body
+
+    def test_batches_share_connection(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.CountingBackend'
+        CountingBackend.opened = 0
+        for number in range(5):
+            OutboxMessage.objects.create(
+                subject='Код', body='123', recipient=f'u{number}@yamdb.fake'
+            )
+        send_outbox('--batch-size', '2')
+        assert len(mail.outbox) == 5
+        assert CountingBackend.opened == 3, (
+            'Проверьте, что пачка писем отправляется через одно соединение'
+        )
+        assert not OutboxMessage.objects.exists()
+
+    def test_retry_with_backoff(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_outbox.FailingBackend'
+        message = OutboxMessage.objects.create(
+            subject='Код', body='123', recipient='u@yamdb.fake'
+        )
+        send_outbox('--retry-delay', '10', '--max-attempts', '2')
+        message.refresh_from_db()
+        assert message.attempts == 1
+        assert 'down' in message.last_error
+        assert message.next_attempt > timezone.now()
+
+        send_outbox()
+        message.refresh_from_db()
+        assert message.attempts == 1, (
+            'Проверьте, что письмо не отправляется повторно до истечения '
+            'задержки'
+        )
+
+        OutboxMessage.objects.update(next_attempt=timezone.now())
+        send_outbox('--max-attempts', '2')
+        message.refresh_from_db()
+        assert message.attempts == 2 and message.next_attempt is None
+
+    def test_stats(self):
+        OutboxMessage.objects.create(
+            subject='Код', body='123', recipient='u@yamdb.fake'
+        )
+        OutboxMessage.objects.create(
+            subject='Код', body='123', recipient='v@yamdb.fake',
+            next_attempt=None,
+        )
+        stats = OutboxMessage.objects.stats()
+        assert (stats['pending'], stats['due'], stats['failed']) == (1, 1, 1)
+        assert stats['oldest_age'] >= 0
+        assert '1 pending' in send_outbox('--stats')
@@ -0,0 +1,92 @@
+import json
+from io import StringIO
+
+import pytest
+from django.conf import settings as django_settings
+from django.core.management import call_command
+
+MIDDLEWARE = 'api.profiling.ProfilingMiddleware'
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.MIDDLEWARE = [*django_settings.MIDDLEWARE, MIDDLEWARE]
+    settings.PROFILING_DIR = str(tmp_path)
+    return settings
+
+
+def show_profiles(*args):
+    output = StringIO()
+    call_command('show_profiles', *args, stdout=output)
+    return output.getvalue()
+
+
+@pytest.mark.django_db
+class TestProfiling:
+
+    def test_off_by_default(self, admin_client, title):
+        assert MIDDLEWARE not in django_settings.MIDDLEWARE
+        response = admin_client.get(
+            f'/api/v1/titles/{title.id}/', HTTP_X_PROFILE='1'
+        )
+        assert 'X-Profile-Id' not in response
+
+    def test_admin_request_profiled(self, profiling, admin_client, title,
+                                    tmp_path):
+        response = admin_client.get(
+            f'/api/v1/titles/{title.id}/', HTTP_X_PROFILE='1'
+        )
+        assert response.status_code == 200
+        profile_id = response['X-Profile-Id']
+        assert (tmp_path / f'{profile_id}.prof').exists(), (
+            'Проверьте, что профиль запроса администратора сохраняется'
+        )
+        meta = json.loads((tmp_path / f'{profile_id}.json').read_text())
+        assert meta['view'] == 'titles-detail'
+        assert meta['mode'] == 'cpu'
+        assert meta['allocations'] is None
+        output = show_profiles()
+        assert profile_id in output
+        summary = show_profiles('latest', '--limit', '5')
+        assert 'titles-detail' in summary
+        assert 'function calls' in summary
+
+    def test_memory_profile(self, profiling, admin_client, title, tmp_path):
+        response = admin_client.get('/api/v1/titles/?profile=memory')
+        profile_id = response['X-Profile-Id']
+        meta = json.loads((tmp_path / f'{profile_id}.json').read_text())
+        assert meta['mode'] == 'memory'
+        assert meta['allocations'] and meta['peak_kib'] > 0, (
+            'Проверьте, что профиль памяти содержит места выделений'
+        )
+        assert 'Top allocation sites' in show_profiles(profile_id)
+
+    def test_not_profiled(self, profiling, user_client, guest_client,
+                          admin_client, title, tmp_path):
+        url = f'/api/v1/titles/{title.id}/'
+        for client in (user_client, guest_client):
+            response = client.get(url, HTTP_X_PROFILE='1')
+            assert response.status_code == 200
+            assert 'X-Profile-Id' not in response, (
+                'Проверьте, что профилировать запросы может только '
+                'администратор'
+            )
+        assert 'X-Profile-Id' not in admin_client.get(url)
+        profiling.PROFILING_SAMPLE_RATE = 0
+        assert 'X-Profile-Id' not in admin_client.get(
+            url, HTTP_X_PROFILE='1'
+        )
+        assert not list(tmp_path.iterdir())
+
+    def test_max_files(self, profiling, admin_client, title, tmp_path):
+        profiling.PROFILING_MAX_FILES = 2
+        profile_ids = [
+            admin_client.get(
+                f'/api/v1/titles/{title.id}/', HTTP_X_PROFILE='1'
+            )['X-Profile-Id']
+            for _ in range(3)
+        ]
+        assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+            f'{profile_id}{suffix}' for profile_id in profile_ids[1:]
+            for suffix in ('.json', '.prof')
+        ), 'Проверьте, что хранятся только последние профили'
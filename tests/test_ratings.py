@@ -0,0 +1,51 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_review_writes(self, title, user, another_user):
+        review = Review.objects.create(
+            title=title, author=user, text='text', score=10
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='text', score=5
+        )
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count) == (15, 2), (
+            'Проверьте, что создание отзыва обновляет сумму и число оценок'
+        )
+        review.score = 4
+        review.save()
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count) == (9, 2), (
+            'Проверьте, что изменение оценки обновляет сумму оценок'
+        )
+        review.delete()
+        another_user.delete()
+        title.refresh_from_db()
+        assert (title.score_sum, title.score_count) == (0, 0), (
+            'Проверьте, что удаление отзыва (в том числе каскадное) '
+            'обновляет сумму и число оценок'
+        )
+        assert title.rating is None
+
+    def test_titles_endpoint_reads_stored_rating(self, guest_client, review):
+        response = guest_client.get(f'/api/v1/titles/{review.title_id}/')
+        assert response.status_code == 200
+        assert response.json()['rating'] == 8
+
+    def test_rebuild_ratings(self, review, another_user):
+        Review.objects.create(
+            title=review.title, author=another_user, text='text', score=3
+        )
+        Title.objects.update(score_sum=0, score_count=0)
+        call_command('rebuild_ratings', chunk_size=1, stdout=StringIO())
+        title = Title.objects.get(pk=review.title_id)
+        assert (title.score_sum, title.score_count) == (11, 2), (
+            'Проверьте, что команда rebuild_ratings пересчитывает оценки'
+        )
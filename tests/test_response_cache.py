@@ -0,0 +1,47 @@
+import pytest
+from reviews.models import Categories, Review
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    @pytest.mark.parametrize('url', (
+        TITLES_URL, '/api/v1/categories/', '/api/v1/genres/'
+    ))
+    def test_repeated_read_skips_database(self, guest_client, title, url,
+                                          django_assert_num_queries):
+        first = guest_client.get(url)
+        with django_assert_num_queries(0):
+            second = guest_client.get(url)
+        assert second.status_code == 200
+        assert second.json() == first.json(), (
+            'Проверьте, что повторный запрос отдаётся из кэша'
+        )
+
+    def test_review_write_invalidates_titles(self, guest_client, title, user):
+        url = f'{TITLES_URL}{title.id}/'
+        assert guest_client.get(url).json()['rating'] is None
+        Review.objects.create(title=title, author=user, text='text', score=6)
+        assert guest_client.get(url).json()['rating'] == 6, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведений'
+        )
+
+    def test_category_write_invalidates_lists(self, guest_client, title):
+        guest_client.get('/api/v1/categories/')
+        guest_client.get(TITLES_URL)
+        Categories.objects.filter(slug='movie').delete()
+        slugs = [
+            category['slug'] for category in
+            guest_client.get('/api/v1/categories/').json()['results']
+        ]
+        assert slugs == ['book']
+        assert guest_client.get(TITLES_URL).json()['results'][0][
+            'category'] is None
+
+    def test_authenticated_titles_bypass_cache(self, user_client, title,
+                                               django_assert_num_queries):
+        user_client.get(TITLES_URL)
+        with django_assert_num_queries(5):
+            user_client.get(TITLES_URL)
@@ -0,0 +1,56 @@
+import pytest
+from django.db import IntegrityError, connection
+from reviews.models import Review, Title
+
+# User, savepoint, insert, title totals, leaderboard rows, release and
+# the title name for the response; SQLite also fills its full-text
+# search table.
+CREATE_QUERIES = 7 + (connection.vendor == 'sqlite')
+
+
+def reviews_url(title_id):
+    return f'/api/v1/titles/{title_id}/reviews/'
+
+
+@pytest.mark.django_db
+class TestReviewCreate:
+
+    def test_second_review_is_rejected(self, user_client, title):
+        data = {'text': 'Отличный фильм', 'score': 9}
+        assert user_client.post(reviews_url(title.id), data).status_code == 201
+        response = user_client.post(reviews_url(title.id), data)
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв на произведение возвращает 400'
+        )
+        assert response.json() == {
+            'non_field_errors': ['Отзыв уже существует!']
+        }
+        title = Title.objects.get(pk=title.pk)
+        assert (title.score_sum, title.score_count) == (9, 1)
+        assert Review.objects.count() == 1
+
+    def test_other_integrity_errors_not_duplicates(self, user_client,
+                                                   title, monkeypatch):
+        def save(review, *args, **kwargs):
+            raise IntegrityError('FOREIGN KEY constraint failed')
+
+        monkeypatch.setattr(Review, 'save', save)
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                reviews_url(title.id), {'text': 'text', 'score': 5}
+            )
+
+    def test_missing_title(self, user_client):
+        response = user_client.post(
+            reviews_url(9999), {'text': 'text', 'score': 5}
+        )
+        assert response.status_code == 404
+        assert not Review.objects.exists()
+
+    def test_create_queries(self, user_client, title,
+                            django_assert_num_queries):
+        with django_assert_num_queries(CREATE_QUERIES):
+            response = user_client.post(
+                reviews_url(title.id), {'text': 'text', 'score': 5}
+            )
+        assert response.status_code == 201
@@ -0,0 +1,72 @@
+import pytest
+from reviews.models import Comment, Review
+
+# Count, page and the conditional GET validators of the title.
+REVIEW_LIST_QUERIES = 3
+# Count and page.
+COMMENT_LIST_QUERIES = 2
+
+
+@pytest.fixture
+def make_reviews(django_user_model):
+    def _make_reviews(title, count):
+        reviews = []
+        for number in range(count):
+            author = django_user_model.objects.create_user(
+                username=f'author{title.id}_{number}',
+                email=f'author{title.id}_{number}@yamdb.fake',
+            )
+            review = Review.objects.create(
+                title=title, author=author, text='text', score=5
+            )
+            Comment.objects.create(review=review, author=author, text='text')
+            Comment.objects.create(review=review, author=author, text='text')
+            reviews.append(review)
+        return reviews
+    return _make_reviews
+
+
+@pytest.mark.django_db
+class TestReviewsQueryCount:
+
+    @pytest.mark.parametrize('count', (1, 10))
+    def test_review_list(self, guest_client, title, make_reviews, count,
+                         django_assert_num_queries):
+        make_reviews(title, count)
+        with django_assert_num_queries(REVIEW_LIST_QUERIES):
+            response = guest_client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert len(response.json()['results']) == count
+        assert response.json()['results'][0]['author'].startswith('author')
+
+    @pytest.mark.parametrize('count', (1, 10))
+    def test_comment_list(self, guest_client, title, make_reviews, count,
+                          django_assert_num_queries, django_user_model):
+        review = make_reviews(title, 1)[0]
+        for number in range(count):
+            author = django_user_model.objects.create_user(
+                username=f'commenter{number}',
+                email=f'commenter{number}@yamdb.fake',
+            )
+            Comment.objects.create(review=review, author=author, text='text')
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        with django_assert_num_queries(COMMENT_LIST_QUERIES):
+            response = guest_client.get(url)
+        assert response.json()['count'] == count + 2
+
+    def test_nested_route_is_validated(self, guest_client, make_title,
+                                       make_reviews):
+        title = make_title()
+        other = make_title(name='Другое')
+        review = make_reviews(title, 1)[0]
+        assert guest_client.get(
+            f'/api/v1/titles/{other.id}/reviews/{review.id}/comments/'
+        ).status_code == 404, (
+            'Проверьте, что комментарии отзыва не отдаются '
+            'по адресу чужого произведения'
+        )
+        assert guest_client.get(
+            f'/api/v1/titles/{other.id}/reviews/'
+        ).status_code == 200
+        assert guest_client.get(
+            '/api/v1/titles/9999/reviews/'
+        ).status_code == 404
@@ -0,0 +1,50 @@
+import pytest
+from reviews.models import Review
+
+SEARCH_URL = '/api/v1/search/'
+
+
+@pytest.mark.django_db
+class TestSearch:
+
+    def test_search_ranks_titles_and_reviews(self, guest_client, make_title,
+                                             user):
+        title = make_title(
+            name='Побег из Шоушенка', description='Тюремная драма'
+        )
+        other = make_title(name='Крестный отец', description='Про мафию')
+        review = Review.objects.create(
+            title=other, author=user, text='Лучше, чем Побег', score=9
+        )
+        response = guest_client.get(SEARCH_URL, {'q': 'Побег'})
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [(hit['type'], hit['id']) for hit in results] == [
+            ('title', title.id), ('review', review.id)
+        ], 'Проверьте, что совпадение в названии ранжируется выше отзыва'
+        assert results[1]['author'] == user.username
+        assert results[1]['name'] == 'Крестный отец'
+
+    def test_index_follows_writes(self, guest_client, title, user):
+        review = Review.objects.create(
+            title=title, author=user, text='Неожиданный финал', score=9
+        )
+        assert len(guest_client.get(
+            SEARCH_URL, {'q': 'финал'}).json()['results']) == 1
+        review.text = 'Скучно'
+        review.save()
+        assert guest_client.get(
+            SEARCH_URL, {'q': 'финал'}).json()['results'] == [], (
+            'Проверьте, что индекс обновляется при изменении отзыва'
+        )
+        title.delete()
+        assert guest_client.get(
+            SEARCH_URL, {'q': 'Шоушенка'}).json()['results'] == []
+
+    def test_pagination_and_validation(self, guest_client, make_title):
+        for number in range(3):
+            make_title(name=f'Матрица {number}')
+        response = guest_client.get(SEARCH_URL, {'q': 'Матрица', 'limit': 2})
+        assert len(response.json()['results']) == 2
+        assert 'offset=2' in response.json()['next']
+        assert guest_client.get(SEARCH_URL).status_code == 400
@@ -0,0 +1,68 @@
+import pytest
+from api.authentication import RoleRefreshToken, StatelessJWTAuthentication
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+
+def stateless_client(user):
+    client = APIClient()
+    token = RoleRefreshToken.for_user(user).access_token
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(
+        APIView, 'authentication_classes', [StatelessJWTAuthentication]
+    )
+
+
+@pytest.mark.django_db
+class TestStatelessAuth:
+
+    def test_token_carries_role_claims(self, guest_client, admin):
+        token = RoleRefreshToken.for_user(admin).access_token
+        assert token['role'] == 'admin'
+        assert token['is_superuser'] is False
+
+    def test_fresh_token_skips_user_query(self, stateless, admin, categories,
+                                          django_assert_num_queries):
+        client = stateless_client(admin)
+        # Slug uniqueness check and insert: the role comes from the token.
+        with django_assert_num_queries(2):
+            response = client.post(
+                '/api/v1/genres/', {'name': 'Джаз', 'slug': 'jazz'}
+            )
+        assert response.status_code == 201
+
+    def test_permissions_follow_claims(self, stateless, user, review):
+        client = stateless_client(user)
+        response = client.patch(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/',
+            {'text': 'Изменённый текст'},
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что автор может изменять свой отзыв в режиме '
+            'без запроса пользователя'
+        )
+        assert stateless_client(user).post(
+            '/api/v1/genres/', {'name': 'Джаз', 'slug': 'jazz'}
+        ).status_code == 403
+
+    def test_stale_token_rechecks_user(self, stateless, user, settings):
+        client = stateless_client(user)
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/users/me/').status_code == 200
+        settings.JWT_ROLE_CLAIMS_MAX_AGE = 0
+        assert client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что по истечении окна устаревания '
+            'деактивированный пользователь не проходит аутентификацию'
+        )
+
+    def test_me_reads_full_user(self, stateless, user):
+        client = stateless_client(user)
+        response = client.patch('/api/v1/users/me/', {'bio': 'Киноман'})
+        assert response.status_code == 200
+        assert client.get('/api/v1/users/me/').json()['bio'] == 'Киноман'
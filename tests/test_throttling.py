@@ -0,0 +1,114 @@
+import warnings
+
+import pytest
+from api import throttling
+from django.core.cache import CacheKeyWarning
+from django.conf import settings as django_settings
+from rest_framework.test import APIRequestFactory
+
+
+@pytest.fixture
+def rates(settings):
+    def _rates(**scopes):
+        rest_framework = dict(django_settings.REST_FRAMEWORK)
+        rest_framework['DEFAULT_THROTTLE_RATES'] = {
+            **rest_framework['DEFAULT_THROTTLE_RATES'], **scopes
+        }
+        settings.REST_FRAMEWORK = rest_framework
+    return _rates
+
+
+@pytest.mark.django_db
+class TestThrottling:
+
+    def test_token_per_username(self, rates, guest_client, user,
+                                django_assert_num_queries):
+        rates(token_username='2/m', token_ip='100/m')
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        for _ in range(2):
+            assert guest_client.post(
+                '/api/v1/auth/token/', data
+            ).status_code == 400
+        with django_assert_num_queries(0):
+            response = guest_client.post('/api/v1/auth/token/', data)
+        assert response.status_code == 429, (
+            'Проверьте, что подбор кода для одного пользователя '
+            'ограничивается до запросов к базе'
+        )
+        assert 'Retry-After' in response
+        other = {'username': 'someone', 'confirmation_code': 'wrong'}
+        assert guest_client.post(
+            '/api/v1/auth/token/', other
+        ).status_code == 404
+
+    def test_signup_per_ip(self, rates, guest_client):
+        rates(signup_ip='2/h')
+        statuses = [
+            guest_client.post('/api/v1/auth/signup/', {
+                'email': f'user{number}@yamdb.fake',
+                'username': f'user{number}',
+            }).status_code
+            for number in range(3)
+        ]
+        assert statuses == [200, 200, 429]
+
+    def test_anonymous_reads(self, rates, guest_client, user_client):
+        rates(anon_read='3/m')
+        statuses = [
+            guest_client.get('/api/v1/titles/').status_code
+            for _ in range(4)
+        ]
+        assert statuses == [200, 200, 200, 429]
+        assert user_client.get('/api/v1/titles/').status_code == 200, (
+            'Проверьте, что ограничение касается только анонимных запросов'
+        )
+
+    def test_forwarded_for_rotation(self, rates, guest_client):
+        rates(token_ip='3/m', token_username='')
+        statuses = [
+            guest_client.post(
+                '/api/v1/auth/token/',
+                {'username': f'user{number}', 'confirmation_code': 'wrong'},
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{number}, 203.0.113.7',
+                REMOTE_ADDR='172.18.0.5',
+            ).status_code
+            for number in range(5)
+        ]
+        assert statuses == [404, 404, 404, 429, 429], (
+            'Проверьте, что присланный клиентом X-Forwarded-For не даёт '
+            'обойти ограничение по IP'
+        )
+
+    def test_keys_safe_for_memcached(self, rates, guest_client):
+        rates(signup_username='5/h')
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            for username in ('a b', 'x' * 300):
+                response = guest_client.post('/api/v1/auth/signup/', {
+                    'email': 'user@yamdb.fake', 'username': username,
+                })
+                assert response.status_code == 400
+
+    def test_empty_rate_disables(self, rates, guest_client):
+        rates(anon_read='')
+        for _ in range(5):
+            assert guest_client.get('/api/v1/categories/').status_code == 200
+
+
+class TestSlidingWindow:
+
+    def test_previous_window_is_weighted(self, rates, monkeypatch):
+        rates(anon_read='10/m')
+        request = APIRequestFactory().get('/api/v1/titles/')
+        request.user = type('Anonymous', (), {'is_authenticated': False})
+        now = 6000.0
+        monkeypatch.setattr(throttling, 'time', lambda: now)
+
+        def allowed():
+            throttle = throttling.AnonReadThrottle()
+            return throttle.allow_request(request, None)
+
+        assert [allowed() for _ in range(11)] == [True] * 10 + [False]
+        # Half way into the next window half of the old requests count.
+        now += 90
+        assert [allowed() for _ in range(6)] == [True] * 5 + [False]
@@ -0,0 +1,79 @@
+import pytest
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def catalog(make_title):
+    return [
+        make_title(name='Побег из Шоушенка', year=1994, category=0,
+                   genre=(0,)),
+        make_title(name='Крестный отец', year=1972, category=0,
+                   genre=(0, 1)),
+        make_title(name='Bohemian Rhapsody', year=1975, category=1,
+                   genre=(2,)),
+    ]
+
+
+def names(response):
+    assert response.status_code == 200, response.content
+    return sorted(title['name'] for title in response.json()['results'])
+
+
+@pytest.mark.django_db
+class TestTitlesFilter:
+
+    def test_exact_slugs(self, guest_client, catalog):
+        assert names(guest_client.get(TITLES_URL, {'genre': 'dram'})) == [], (
+            'Проверьте, что по умолчанию слаг жанра сравнивается точно'
+        )
+        assert names(guest_client.get(TITLES_URL, {'category': 'book'})) == [
+            'Bohemian Rhapsody'
+        ]
+        assert names(
+            guest_client.get(TITLES_URL, {'category': 'book,movie'})
+        ) == ['Bohemian Rhapsody', 'Крестный отец', 'Побег из Шоушенка']
+
+    def test_genre_modes(self, guest_client, catalog):
+        assert names(
+            guest_client.get(TITLES_URL, {'genre': 'drama,rock'})
+        ) == ['Bohemian Rhapsody', 'Крестный отец', 'Побег из Шоушенка']
+        assert names(guest_client.get(
+            TITLES_URL, {'genre': 'drama,comedy', 'genre_mode': 'and'}
+        )) == ['Крестный отец'], (
+            'Проверьте, что genre_mode=and требует наличия всех жанров'
+        )
+
+    def test_year_range(self, guest_client, catalog):
+        assert names(guest_client.get(
+            TITLES_URL, {'year_min': 1973, 'year_max': 1994}
+        )) == ['Bohemian Rhapsody', 'Побег из Шоушенка']
+        assert names(guest_client.get(TITLES_URL, {'year': 1972})) == [
+            'Крестный отец'
+        ]
+
+    def test_substring_mode(self, guest_client, catalog):
+        assert names(guest_client.get(
+            TITLES_URL, {'genre': 'dram', 'match': 'contains'}
+        )) == ['Крестный отец', 'Побег из Шоушенка']
+        assert names(guest_client.get(
+            TITLES_URL, {'name': 'отец', 'match': 'contains'}
+        )) == ['Крестный отец']
+        assert names(guest_client.get(TITLES_URL, {'name': 'отец'})) == [
+            'Крестный отец'
+        ]
+        assert names(guest_client.get(TITLES_URL, {'name': 'rhapsody'})) == [
+            'Bohemian Rhapsody'
+        ], 'Проверьте, что название ищется без учёта регистра'
+
+    def test_name_prefix_mode(self, guest_client, catalog):
+        assert names(guest_client.get(
+            TITLES_URL, {'name': 'Крест', 'name_mode': 'prefix'}
+        )) == ['Крестный отец']
+        assert names(guest_client.get(
+            TITLES_URL, {'name': 'отец', 'name_mode': 'prefix'}
+        )) == []
+
+    def test_invalid_mode(self, guest_client, catalog):
+        response = guest_client.get(TITLES_URL, {'match': 'regex'})
+        assert response.status_code == 400
@@ -0,0 +1,30 @@
+import pytest
+
+TITLES_URL = '/api/v1/titles/'
+# One of the queries computes the conditional GET validators.
+LIST_QUERIES = 4
+DETAIL_QUERIES = 3
+
+
+@pytest.mark.django_db
+class TestTitlesQueryCount:
+
+    @pytest.mark.parametrize('titles_count', (1, 5, 20))
+    def test_list_query_count(self, guest_client, make_title,
+                              django_assert_num_queries, titles_count):
+        for number in range(titles_count):
+            make_title(name=f'Произведение {number}', genre=(0, 1, 2))
+        with django_assert_num_queries(LIST_QUERIES):
+            response = guest_client.get(TITLES_URL, {'limit': titles_count})
+        assert response.status_code == 200
+        assert len(response.json()['results']) == titles_count, (
+            'Проверьте, что список произведений не зависит от числа запросов'
+        )
+
+    def test_detail_query_count(self, guest_client, make_title,
+                                django_assert_num_queries):
+        title = make_title(genre=(0, 1, 2))
+        with django_assert_num_queries(DETAIL_QUERIES):
+            response = guest_client.get(f'{TITLES_URL}{title.id}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 3